@@ -0,0 +1,4 @@
+"""
+Functionality shared by the models of the library. This folder does not contain a model
+itself (folders starting with an underscore are skipped by the model loader of Brian2Lava).
+"""
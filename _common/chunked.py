@@ -0,0 +1,95 @@
+"""
+Chunked execution of the neuron updates on a thread pool.
+
+For very large populations, the flat neuron arrays are split into contiguous chunks that
+are small enough to stay in the cache while all operations of a timestep are applied to
+them. The chunks are processed by a pool of threads, which run in parallel since NumPy
+(and the JIT-compiled kernels, see `jit`) release the GIL. Every neuron is updated by the
+same operations as without chunks and the chunks are disjoint, so the results do not
+depend on the number of threads or on the order in which the chunks are processed.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Default number of neurons per chunk. With about ten 4- or 8-byte values per neuron
+# (state, parameters and scratch buffers), a chunk fits into a typical L2 cache.
+DEFAULT_CHUNK_SIZE = 2**14
+
+
+class ChunkedExecutor:
+    """
+    Applies a function to contiguous chunks of the neurons of a population.
+
+    Parameters
+    ----------
+    shape : tuple(int)
+        Shape of the neuron population.
+    num_threads : int, optional
+        Number of threads that process the chunks. If 1, the chunks are processed
+        one after the other in the calling thread.
+    chunk_size : int, optional
+        Number of neurons per chunk.
+    """
+
+    def __init__(self, shape, num_threads: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.size = int(np.prod(shape))
+        self.chunks = [slice(start, min(start + chunk_size, self.size))
+                       for start in range(0, self.size, max(int(chunk_size), 1))]
+        self.executor = ThreadPoolExecutor(max_workers=num_threads) if num_threads > 1 else None
+
+    def chunk(self, x, neurons: slice):
+        """
+        Get the part of a variable that belongs to a chunk of neurons.
+
+        Parameters
+        ----------
+        x : int, float, numpy.ndarray
+            The variable. Arrays with one value per neuron have to be contiguous.
+        neurons : slice
+            The chunk, as slice of the flat neuron indices.
+
+        Returns
+        -------
+        int, float, numpy.ndarray
+            For arrays with one value per neuron, a flat view of the values of the
+            chunk. Otherwise (scalars and arrays that are broadcast to all neurons),
+            `x` itself.
+        """
+        if np.ndim(x) > 0 and np.size(x) == self.size:
+            return x.reshape(-1)[neurons]
+        return x
+
+    def map(self, func, *args):
+        """
+        Call `func(neurons, *args)` for all chunks `neurons` and wait until all calls
+        have finished. Exceptions raised by `func` are propagated.
+
+        Parameters
+        ----------
+        func : callable
+            The function, which must only write the values of the neurons in its chunk.
+        *args
+            Further arguments passed to `func`.
+        """
+        if self.executor is None:
+            for neurons in self.chunks:
+                func(neurons, *args)
+            return
+        futures = [self.executor.submit(func, neurons, *args) for neurons in self.chunks]
+        for future in futures:
+            future.result()
+
+    def map_kernel(self, kernel, *args):
+        """
+        Call `kernel` for all chunks, with the arrays among `args` that hold one value
+        per neuron replaced by the values of the chunk (see `chunk()`).
+
+        Parameters
+        ----------
+        kernel : callable
+            The kernel (e.g., from `lif_kernels`), operating on flat arrays.
+        *args
+            The arguments of the kernel.
+        """
+        self.map(lambda neurons: kernel(*(self.chunk(x, neurons) for x in args)))
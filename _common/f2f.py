@@ -0,0 +1,108 @@
+"""
+Vectorized helpers for the F2F scaling of many populations at once, as used by the
+`batch_*_scaling_params()` methods of the model scalers (see e.g. `lif/lif_f2f.py`).
+
+The variable ranges of `n` populations are given as a dictionary that maps the variable
+names to arrays of shape `(n, 2)`, holding the (min, max) ranges of the variable in each
+population. A range of `(0, 0)` marks a variable that is not defined in a population
+(e.g., `w` for a population without synapses), like a missing entry in the dictionary
+of a single population.
+"""
+import numpy as np
+
+
+def stack_variable_ranges(populations):
+    """
+    Stack the variable ranges of single populations into batched ranges.
+
+    Parameters
+    ----------
+    populations : list(dict)
+        For each population, the dictionary that maps variable names to (min, max)
+        tuples, as passed to the `*_scaling_params()` methods.
+
+    Returns
+    -------
+    dict
+        The batched ranges, with `(0, 0)` for variables that are not defined in a
+        population.
+    """
+    names = {name for variables in populations for name in variables}
+    return {name: np.array([variables.get(name, (0, 0)) for variables in populations], dtype=float)
+            for name in names}
+
+
+def batch_ranges(variables):
+    """
+    Convert batched ranges to float arrays of shape `(n, 2)`.
+
+    Parameters
+    ----------
+    variables : dict
+        Maps variable names to array-likes of (min, max) ranges.
+
+    Returns
+    -------
+    dict
+        Maps variable names to float arrays of shape `(n, 2)`.
+    """
+    return {name: np.asarray(var_range, dtype=float).reshape(-1, 2) for name, var_range in variables.items()}
+
+
+def divide_nonzero(numerator, denominator: np.ndarray, fill: float):
+    """
+    Divide elementwise, with `fill` where the denominator is zero.
+
+    Parameters
+    ----------
+    numerator : float, numpy.ndarray
+        The numerator(s).
+    denominator : numpy.ndarray
+        The denominators.
+    fill : float
+        The result for zero denominators.
+
+    Returns
+    -------
+    numpy.ndarray
+        The quotients.
+    """
+    out = np.full(np.shape(denominator), fill, dtype=float)
+    return np.divide(numerator, denominator, out=out, where=denominator != 0)
+
+
+def max_of_quotients(terms):
+    """
+    Get the maximum of the quotients `numerator / denominator` over the given terms,
+    skipping zero denominators.
+
+    Parameters
+    ----------
+    terms : list(tuple)
+        Pairs of numerators (floats or arrays) and denominators (arrays).
+
+    Returns
+    -------
+    numpy.ndarray
+        The maxima, which are NaN for populations in which all denominators are zero.
+    """
+    result = np.maximum.reduce([divide_nonzero(numerator, denominator, -np.inf)
+                                for numerator, denominator in terms])
+    result[result == -np.inf] = np.nan
+    return result
+
+
+def check_feasible(max_A: np.ndarray, min_A: np.ndarray):
+    """
+    Check that the maximum scaling parameters are not smaller than the minimum ones.
+
+    Parameters
+    ----------
+    max_A : numpy.ndarray
+        The maximum scaling parameters `A` of the populations.
+    min_A : numpy.ndarray
+        The minimum scaling parameters `A` of the populations.
+    """
+    infeasible = np.flatnonzero(~(max_A >= min_A))
+    assert infeasible.size == 0, \
+        f"Parameter ranges not compatible for F2F conversion (populations {infeasible.tolist()})."
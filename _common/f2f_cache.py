@@ -0,0 +1,248 @@
+"""
+Memoization of the F2F scaling parameters computed by the model scalers (see e.g.
+`lif/lif_f2f.py`), such that re-compiling an unchanged network, or a parameter sweep
+that only changes a few populations, does not recompute the scaling of the other
+populations.
+
+The results are keyed by everything they depend on: the scaler (its `process_class`,
+source files and assumptions like `max_input_rate`), the variable ranges, the sets of
+MSB-aligned, variable and constant names, and `LOIHI2_SPECS`. They are kept in memory and,
+only if the environment variable `BRIAN2LAVA_F2F_CACHE_DIR` is set to a directory (e.g.
+`~/.cache/brian2lava/f2f_scaling`), persisted to a local on-disk store, a JSON file in
+that directory. The store is read on the first cache miss and new results are written back
+at exit (or by `ScalingCache.flush()`).
+"""
+import atexit
+import functools
+import hashlib
+import json
+import os
+
+from brian2lava.utils.const import LOIHI2_SPECS
+
+CACHE_DIR_ENV = "BRIAN2LAVA_F2F_CACHE_DIR"
+STORE_FILE = "scaling_params.json"
+# Class attributes of scalers that parametrize their assumptions (see e.g. `atrlif/atrlif_f2f.py`),
+# which can be changed at runtime
+SCALER_ASSUMPTIONS = ("max_input_rate", "undecayed_steps")
+
+
+def fingerprint(key: tuple):
+    """SHA-256 digest of a key, which identifies a result in the on-disk store."""
+    return hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+class ScalingCache:
+    """
+    Store of scaling parameters, in memory and (optionally) on disk.
+
+    Parameters
+    ----------
+    cache_dir : str, optional
+        Directory of the on-disk store. If `None`, the results are only kept in memory.
+    """
+
+    def __init__(self, cache_dir: str = None):
+        self.cache_dir = cache_dir
+        # Results by key, and results read from the on-disk store by fingerprint
+        self.memory = {}
+        self.stored = None
+        # Keys of the results that are not yet in the on-disk store
+        self.new_keys = set()
+
+    @property
+    def path(self):
+        """The file of the on-disk store."""
+        return os.path.join(self.cache_dir, STORE_FILE)
+
+    def read_store(self):
+        """
+        Read the results in the on-disk store. A missing or corrupt store is treated
+        as empty.
+
+        Returns
+        -------
+        dict
+            The results by fingerprint.
+        """
+        if self.cache_dir is None:
+            return {}
+        try:
+            with open(self.path) as f:
+                store = json.load(f)
+            return store if isinstance(store, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, key: tuple):
+        """
+        Get a result.
+
+        Parameters
+        ----------
+        key : tuple
+            Key of the result (see `scaling_key()`).
+
+        Returns
+        -------
+        dict
+            A copy of the result, or `None` if there is none for `key`.
+        """
+        result = self.memory.get(key)
+        if result is None:
+            if self.stored is None:
+                self.stored = self.read_store()
+            result = self.stored.get(fingerprint(key)) if self.stored else None
+            if result is None:
+                return None
+            self.memory[key] = result
+        return dict(result)
+
+    def put(self, key: tuple, result: dict):
+        """
+        Store a result.
+
+        Parameters
+        ----------
+        key : tuple
+            Key of the result (see `scaling_key()`).
+        result : dict
+            The scaling parameters.
+        """
+        self.memory[key] = {name: float(value) for name, value in result.items()}
+        if self.cache_dir is not None:
+            self.new_keys.add(key)
+
+    def flush(self):
+        """
+        Write the new results to the on-disk store, merged with the results that other
+        processes have written in the meantime. Failures to write are ignored.
+        """
+        if not self.new_keys:
+            return
+        store = self.read_store()
+        store.update((fingerprint(key), self.memory[key]) for key in self.new_keys)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temporary file first, such that concurrent readers never see
+            # a partially written store
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(store, f)
+            os.replace(tmp_path, self.path)
+            self.new_keys.clear()
+        except OSError:
+            pass
+
+    def clear(self):
+        """Remove all results, including those in the on-disk store."""
+        self.memory.clear()
+        self.stored = None
+        self.new_keys.clear()
+        if self.cache_dir is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+# The on-disk store is opt-in, so that nothing is written to the home directory by default
+SCALING_CACHE = ScalingCache(os.environ.get(CACHE_DIR_ENV) or None)
+atexit.register(SCALING_CACHE.flush)
+
+
+def freeze_names(names):
+    """Sorted tuple of a set of variable names (or `None`)."""
+    return tuple(sorted(names)) if names is not None else None
+
+
+def freeze_specs(specs=LOIHI2_SPECS):
+    """The public numeric and string constants of the hardware specifications."""
+    return tuple((name, getattr(specs, name)) for name in dir(specs)
+                 if not name.startswith("_") and isinstance(getattr(specs, name), (bool, int, float, str)))
+
+
+def scaling_key(scaler, source_hash: str, specs: tuple, method: str, variables: dict):
+    """
+    Get the cache key of a result of a scaler method.
+
+    Parameters
+    ----------
+    scaler : type
+        The `ModelScaler` class.
+    source_hash : str
+        Hash of the source files of the scaler.
+    specs : tuple
+        The frozen hardware specifications (see `freeze_specs()`).
+    method : str
+        Name of the method.
+    variables : dict
+        Maps variable names to (min, max) tuples.
+
+    Returns
+    -------
+    tuple
+        The key.
+
+    Raises
+    ------
+    TypeError, ValueError
+        If the variable ranges are not numeric.
+    """
+    ranges = tuple(sorted((name, float(var_min), float(var_max)) for name, (var_min, var_max) in variables.items()))
+    return (scaler.process_class, source_hash, method, ranges,
+            freeze_names(scaler.msb_align_act), freeze_names(scaler.msb_align_decay),
+            freeze_names(scaler.msb_align_prob), freeze_names(scaler.variables),
+            freeze_names(scaler.const),
+            tuple((name, getattr(scaler, name)) for name in SCALER_ASSUMPTIONS if hasattr(scaler, name)),
+            specs)
+
+
+def memoize_scaling_params(scaler):
+    """
+    Class decorator that memoizes `min_scaling_params()`, `max_scaling_params()` and
+    `optimal_scaling_params()` of a `ModelScaler` in `SCALING_CACHE`. Failing
+    computations (e.g., for incompatible parameter ranges) are not memoized, and
+    neither are scalers whose source file is not available.
+
+    Parameters
+    ----------
+    scaler : type
+        The `ModelScaler` class.
+
+    Returns
+    -------
+    type
+        The same class, with memoized methods.
+    """
+    try:
+        # The source file of the scaler, which doesn't require the module to be importable,
+        # and the files that generated scalers are derived from
+        source_hash = hashlib.sha256()
+        for path in (scaler.max_scaling_params.__code__.co_filename, *getattr(scaler, "model_files", ())):
+            with open(path, "rb") as f:
+                source_hash.update(f.read())
+        source_hash = source_hash.hexdigest()
+    except (OSError, AttributeError):
+        # Without the source code, results of changed scalers can't be distinguished
+        return scaler
+    # The specifications are constants, so they are only frozen once
+    specs = freeze_specs()
+
+    def memoized(method, func):
+        @functools.wraps(func)
+        def wrapper(variables):
+            try:
+                key = scaling_key(scaler, source_hash, specs, method, variables)
+            except (TypeError, ValueError):
+                return func(variables)
+            result = SCALING_CACHE.get(key)
+            if result is None:
+                result = func(variables)
+                SCALING_CACHE.put(key, result)
+            return result
+        return staticmethod(wrapper)
+
+    for method in ("min_scaling_params", "max_scaling_params", "optimal_scaling_params"):
+        setattr(scaler, method, memoized(method, getattr(scaler, method)))
+    return scaler
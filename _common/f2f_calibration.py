@@ -0,0 +1,344 @@
+"""
+Calibration of the variable ranges for the F2F scaling by a short pre-run of the
+floating-point process model, similar to the calibration of int8 quantization.
+
+The model scalers (see e.g. `lif/lif_f2f.py`) take the ranges of the variables as given.
+If these only stem from the initial values, the ranges of state variables like `v` and `j`
+are underestimated (and the fixed-point models saturate at +-2**23), or they have to be
+chosen conservatively. Instead, `calibrate_ranges()` runs a `floating_pt` process model
+(e.g. `PyLifModelFloat`) for a configurable number of time steps, records the values of
+the state variables in a `RangeRecorder`, and restores the whole state of the model
+afterwards.
+`calibrated_scaling_params()` then feeds the observed ranges to
+`ModelScaler.optimal_scaling_params()`.
+
+As the ranges that the F2F converter passes to the scalers, the observed ranges are
+ranges of magnitudes, (smallest nonzero |x|, largest |x|), since the scalers bound `A` by
+the largest magnitude regardless of its sign.
+
+The values are recorded in the representation of the floating-point process model. For
+models whose process model uses other units than Brian (e.g., per time step instead of
+per second), factors to convert the observed values can be passed.
+"""
+import numpy as np
+
+# Binary exponents covered by the histograms (values of smaller magnitude are counted
+# in the lowest bin, values of larger magnitude in the highest)
+MIN_EXPONENT = -64
+MAX_EXPONENT = 64
+# Package of the shared modules, whose helper objects (e.g. `GaussianNoise`) are part of
+# the state of a process model
+COMMON_PACKAGE = __name__.rpartition(".")[0]
+
+
+class RangeRecorder:
+    """
+    Records the range of the magnitudes of variables over time steps, as the exact
+    smallest nonzero and largest magnitudes and as histograms of the magnitudes of the
+    positive and of the negative values in bins of powers of two.
+
+    Parameters
+    ----------
+    var_names : iterable(str)
+        Names of the variables.
+    """
+
+    def __init__(self, var_names):
+        self.var_names = tuple(var_names)
+        num_bins = MAX_EXPONENT - MIN_EXPONENT + 1
+        # Smallest nonzero and largest magnitudes (the largest is -inf without recorded values)
+        self.min = {name: np.inf for name in self.var_names}
+        self.max = {name: -np.inf for name in self.var_names}
+        # Counts of the values `x` with `2**(e-1) <= |x| < 2**e` for the exponents
+        # `e = MIN_EXPONENT, ..., MAX_EXPONENT`
+        self.positive = {name: np.zeros(num_bins, dtype=np.int64) for name in self.var_names}
+        self.negative = {name: np.zeros(num_bins, dtype=np.int64) for name in self.var_names}
+        self.num_steps = 0
+
+    @staticmethod
+    def count_exponents(values: np.ndarray, counts: np.ndarray):
+        """Add the binary exponents of nonzero `values` to the histogram `counts`."""
+        values = values[values != 0]
+        if values.size:
+            exponents = np.clip(np.frexp(values)[1], MIN_EXPONENT, MAX_EXPONENT) - MIN_EXPONENT
+            counts += np.bincount(exponents, minlength=counts.size)
+
+    def record(self, values: dict):
+        """
+        Record the values of one time step.
+
+        Parameters
+        ----------
+        values : dict
+            Maps the variable names to arrays of their values.
+        """
+        for name in self.var_names:
+            x = np.asarray(values[name], dtype=float).reshape(-1)
+            if x.size == 0:
+                continue
+            magnitudes = np.abs(x)
+            nonzero = magnitudes[magnitudes != 0]
+            if nonzero.size:
+                self.min[name] = min(self.min[name], float(nonzero.min()))
+            self.max[name] = max(self.max[name], float(magnitudes.max()))
+            self.count_exponents(x[x > 0], self.positive[name])
+            self.count_exponents(-x[x < 0], self.negative[name])
+        self.num_steps += 1
+
+    @staticmethod
+    def covering_magnitude(counts: np.ndarray, percentile: float):
+        """The power of two below which `percentile` percent of the counted magnitudes lie."""
+        cumulative = np.cumsum(counts)
+        if cumulative[-1] == 0:
+            return 0.
+        index = np.searchsorted(cumulative, percentile/100*cumulative[-1])
+        return 2.**(index + MIN_EXPONENT)
+
+    def ranges(self, percentile: float = 100.):
+        """
+        Get the recorded ranges.
+
+        Parameters
+        ----------
+        percentile : float, optional
+            Percentage of the positive and of the negative values to be covered. With
+            the default of 100, the exact largest magnitude is returned. Smaller values
+            exclude outliers (which then saturate in the fixed-point models), with the
+            largest magnitude rounded up to a power of two that covers the percentile
+            of both signs.
+
+        Returns
+        -------
+        dict
+            Maps the variable names to (min, max) tuples of the smallest nonzero (0 if
+            all values are zero) and the largest magnitudes. Variables without recorded
+            values are omitted.
+        """
+        ranges = {}
+        for name in self.var_names:
+            if self.max[name] < 0:
+                continue
+            var_max = self.max[name]
+            if percentile < 100:
+                var_max = min(var_max, max(self.covering_magnitude(self.positive[name], percentile),
+                                           self.covering_magnitude(self.negative[name], percentile)))
+            var_min = min(self.min[name], var_max) if var_max > 0 else 0.
+            ranges[name] = (var_min, var_max)
+        return ranges
+
+
+class _InputPort:
+    """Replaces the input port of a process model during the calibration."""
+
+    def __init__(self, inputs, shape):
+        self.inputs = inputs
+        self.shape = shape
+        self.time_step = 0
+
+    def recv(self):
+        if self.inputs is None:
+            data = np.zeros(self.shape)
+        elif callable(self.inputs):
+            data = self.inputs(self.time_step)
+        else:
+            data = self.inputs[self.time_step]
+        self.time_step += 1
+        return np.broadcast_to(np.asarray(data, dtype=float), self.shape)
+
+
+class _OutputPort:
+    """Replaces the output port of a process model during the calibration."""
+
+    def __init__(self):
+        self.num_spikes = 0
+
+    def send(self, data, *indices):
+        self.num_spikes += int(np.count_nonzero(data))
+
+
+def snapshot_state(obj, nested: bool = True):
+    """
+    Take a snapshot of the attributes of a process model (or of one of its helper
+    objects), which `restore_state()` restores.
+
+    Besides the bindings of the attributes, the snapshot holds the contents of the
+    mutable ones: arrays (except read-only and memory-mapped ones), the states of
+    random number generators, lists, dicts and sets, and, if `nested`, the snapshots
+    of the helper objects from the shared modules (e.g. `GaussianNoise` or
+    `PredefinedStimulus`).
+
+    Parameters
+    ----------
+    obj : object
+        The process model or helper object.
+    nested : bool, optional
+        Whether to include the snapshots of helper objects.
+
+    Returns
+    -------
+    tuple(dict, dict)
+        The attributes, and the saved contents of the mutable ones.
+    """
+    attributes = dict(vars(obj))
+    contents = {}
+    for name, value in attributes.items():
+        if isinstance(value, np.ndarray):
+            if value.flags.writeable and not isinstance(value, np.memmap):
+                contents[name] = value.copy()
+        elif isinstance(value, np.random.Generator):
+            contents[name] = value.bit_generator.state
+        elif isinstance(value, (list, dict, set)):
+            contents[name] = value.copy()
+        elif nested and type(value).__module__.startswith(COMMON_PACKAGE + "."):
+            contents[name] = snapshot_state(value, nested=False)
+    return attributes, contents
+
+
+def restore_state(obj, snapshot: tuple):
+    """
+    Restore the attributes of a process model (or of one of its helper objects) from
+    a snapshot (see `snapshot_state()`). Attributes that were rebound are bound to their
+    original objects again, whose contents are restored in place (such that other
+    references to them see the original values as well), and new attributes are removed.
+
+    Parameters
+    ----------
+    obj : object
+        The process model or helper object.
+    snapshot : tuple(dict, dict)
+        The snapshot.
+    """
+    attributes, contents = snapshot
+    for name in vars(obj).keys() - attributes.keys():
+        delattr(obj, name)
+    vars(obj).update(attributes)
+    for name, saved in contents.items():
+        value = attributes[name]
+        if isinstance(value, np.ndarray):
+            value[...] = saved
+        elif isinstance(value, np.random.Generator):
+            value.bit_generator.state = saved
+        elif isinstance(value, list):
+            value[:] = saved
+        elif isinstance(value, (dict, set)):
+            value.clear()
+            value.update(saved)
+        else:
+            restore_state(value, saved)
+
+
+def calibrate_ranges(model, var_names, num_steps: int, inputs=None, shape=None):
+    """
+    Run a floating-point process model for a number of time steps and record the ranges
+    of its variables. The state of the model is restored afterwards (see
+    `snapshot_state()`), including its time step and the states of its random number
+    generators and stimulus, such that the actual simulation starts from the original
+    state and draws the same random numbers.
+
+    Parameters
+    ----------
+    model : PyLoihiProcessModel
+        The initialized `floating_pt` process model, with the ports `a_in` and `s_out`.
+    var_names : iterable(str)
+        Names of the variables to record (e.g. `ModelScaler.variables`). Names that
+        the model does not have are ignored.
+    num_steps : int
+        Number of time steps of the calibration.
+    inputs : numpy.ndarray, callable, optional
+        The synaptic input, as array with the input of each time step along the first
+        axis, or as function of the time step (counted from 0) that returns the input.
+        By default, there is no input.
+    shape : tuple(int), optional
+        Shape of the input. By default, the shape of the `shape` process parameter.
+
+    Returns
+    -------
+    RangeRecorder
+        The recorded values, including the initial ones.
+    """
+    var_names = [name for name in var_names if isinstance(getattr(model, name, None), np.ndarray)]
+    if shape is None:
+        shape = model.proc_params._parameters["shape"]
+    # Snapshot of the whole state, since the process model updates its variables in
+    # place, rebinds some of them, and advances its random number generators
+    state = snapshot_state(model)
+    recorder = RangeRecorder(var_names)
+    recorder.record({name: getattr(model, name) for name in var_names})
+    model.a_in, model.s_out = _InputPort(inputs, shape), _OutputPort()
+    try:
+        for _ in range(num_steps):
+            model.time_step += 1
+            model.run_spk()
+            recorder.record({name: getattr(model, name) for name in var_names})
+    finally:
+        restore_state(model, state)
+        # Models that cache state derived from their variables recompute it
+        if hasattr(model, "on_var_update"):
+            model.on_var_update()
+    return recorder
+
+
+def calibrated_ranges(variables: dict, observed: dict, scales: dict = None):
+    """
+    Extend the given variable ranges by the observed ones. Both are ranges of magnitudes,
+    (smallest nonzero |x|, largest |x|), as passed to the scalers by the F2F converter.
+
+    Parameters
+    ----------
+    variables : dict
+        Maps variable names to (min, max) tuples, as passed to the scalers.
+    observed : dict
+        The observed ranges (see `RangeRecorder.ranges()`).
+    scales : dict, optional
+        Factors to convert observed values to the units of `variables`.
+
+    Returns
+    -------
+    dict
+        The combined ranges, with the smallest nonzero minimum and the largest maximum.
+    """
+    scales = scales or {}
+    ranges = dict(variables)
+    for name, (var_min, var_max) in observed.items():
+        scale = abs(scales.get(name, 1))
+        var_min, var_max = var_min*scale, var_max*scale
+        if name in ranges:
+            minima = [x for x in (var_min, ranges[name][0]) if x != 0]
+            var_min = min(minima) if minima else 0.
+            var_max = max(var_max, ranges[name][1])
+        ranges[name] = (var_min, var_max)
+    return ranges
+
+
+def calibrated_scaling_params(scaler, variables: dict, model, num_steps: int, inputs=None,
+                              percentile: float = 100., scales: dict = None):
+    """
+    Get the optimal scaling parameters of a model for the variable ranges observed in
+    a pre-run of its floating-point process model (see `calibrate_ranges()`).
+
+    Parameters
+    ----------
+    scaler : type
+        The `ModelScaler` class of the model.
+    variables : dict
+        Maps the variable names to (min, max) tuples, which are extended by the ranges
+        of the recorded variables (`scaler.variables`).
+    model : PyLoihiProcessModel
+        The initialized `floating_pt` process model.
+    num_steps : int
+        Number of time steps of the calibration.
+    inputs : numpy.ndarray, callable, optional
+        The synaptic input during the calibration (see `calibrate_ranges()`).
+    percentile : float, optional
+        Percentage of the observed values to be covered (see `RangeRecorder.ranges()`).
+    scales : dict, optional
+        Factors to convert observed values to the units of `variables`.
+
+    Returns
+    -------
+    dict
+        The scaling parameters `alpha_t` and `A`.
+    """
+    recorder = calibrate_ranges(model, scaler.variables, num_steps, inputs)
+    ranges = calibrated_ranges(variables, recorder.ranges(percentile), scales)
+    return scaler.optimal_scaling_params(ranges)
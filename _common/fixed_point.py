@@ -0,0 +1,207 @@
+"""
+Fixed-point arithmetic shared by the bit-accurate CPU process models of the LIF family.
+
+All functions are vectorized and accept optional output and scratch buffers, such that
+process models can preallocate these once and reuse them in every timestep. Intermediate
+results are computed in int64 to avoid overflow of the product between a 24-bit state
+and a 12-bit decay constant. If int32 buffers are passed instead, the product is split
+such that all intermediate results fit into int32 (see `mul_shift_toward_zero()`), which
+halves the memory of the buffers and the memory traffic of the arithmetic.
+"""
+import numpy as np
+
+# MSB alignment of decays by 12 bits
+# --> decay constants are accordingly prepared by Brian2Lava already
+DECAY_SHIFT = 12
+DECAY_UNITY = 2**DECAY_SHIFT
+# State variables are 24 bits wide
+STATE_BITWIDTH = 24
+MAX_STATE_VAL = 2 ** (STATE_BITWIDTH - 1)
+
+
+def _get_buffer(buffer, shape):
+    """Return `buffer`, or a new int64 array of the given shape if `buffer` is `None`."""
+    if buffer is None:
+        return np.empty(shape, dtype=np.int64)
+    return buffer
+
+
+def shift_toward_zero(x: np.ndarray, shift: int = DECAY_SHIFT, scratch: np.ndarray = None):
+    """
+    Right shift of the int64 array `x` by `shift` bits, in place and rounding toward zero.
+    Equivalent to `np.sign(x) * np.right_shift(np.abs(x), shift)`: adding `2**shift - 1`
+    to negative values before the arithmetic shift turns rounding toward negative infinity
+    into rounding toward zero.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Array of dtype int64 that is shifted in place.
+    shift : int, optional
+        Number of bits to shift.
+    scratch : numpy.ndarray, optional
+        Int64 buffer of the same shape as `x` for intermediate results.
+
+    Returns
+    -------
+    numpy.ndarray
+        The shifted array `x`.
+    """
+    scratch = _get_buffer(scratch, x.shape)
+    np.right_shift(x, 63, out=scratch)
+    np.bitwise_and(scratch, 2**shift - 1, out=scratch)
+    np.add(x, scratch, out=x)
+    np.right_shift(x, shift, out=x)
+    return x
+
+
+def mul_shift_toward_zero(x: np.ndarray, factor, out: np.ndarray = None, scratch: np.ndarray = None):
+    """
+    Compute `x * factor` in int64 and shift the product right by `DECAY_SHIFT` bits,
+    rounding toward zero.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Integer array to be multiplied.
+    factor : int, numpy.ndarray
+        Integer factor, either scalar or broadcastable to the shape of `x`.
+    out : numpy.ndarray, optional
+        Int64 buffer to store the result in. May be `x` itself if `x` is of dtype int64.
+        If an int32 buffer is given, the result is computed with int32 arithmetic, which
+        requires `|x| < 2**24` and `0 <= factor <= DECAY_UNITY`. It may then be `x`
+        itself if `x` is of dtype int32.
+    scratch : numpy.ndarray, optional
+        Buffer of the dtype of `out` for intermediate results (must be neither `out`
+        nor `x`).
+
+    Returns
+    -------
+    numpy.ndarray
+        The result (of the dtype of `out`).
+    """
+    out = _get_buffer(out, np.shape(x))
+    if out.dtype == np.int32:
+        return _mul_shift_toward_zero_int32(x, factor, out, scratch)
+    np.multiply(x, factor, out=out, dtype=np.int64)
+    return shift_toward_zero(out, DECAY_SHIFT, scratch)
+
+
+def _mul_shift_toward_zero_int32(x: np.ndarray, factor, out: np.ndarray, scratch: np.ndarray = None):
+    """
+    Implementation of `mul_shift_toward_zero()` for int32 buffers. With
+    `x = xh * DECAY_UNITY + xl`, where `xh = x >> DECAY_SHIFT` and `0 <= xl < DECAY_UNITY`,
+    the shifted product is `xh * factor + (xl * factor >> DECAY_SHIFT)`, and both partial
+    products fit into int32 for `|x| < 2**24` and `0 <= factor <= DECAY_UNITY`.
+    """
+    if scratch is None:
+        scratch = np.empty(np.shape(x), dtype=np.int32)
+    np.bitwise_and(x, DECAY_UNITY - 1, out=scratch, casting='unsafe')
+    np.multiply(scratch, factor, out=scratch, casting='unsafe')
+    np.right_shift(x, DECAY_SHIFT, out=out, casting='unsafe')
+    np.multiply(out, factor, out=out, casting='unsafe')
+    # Round toward zero, i.e., round the low part up instead of down if the product is
+    # negative, using `ceil(p / 2**n) = ((p - 1) >> n) + 1`. The product is negative if
+    # and only if `xh * factor` is (or `factor` is zero, in which case both parts are zero).
+    negative = np.less(out, 0)
+    np.subtract(scratch, negative, out=scratch)
+    np.right_shift(scratch, DECAY_SHIFT, out=scratch)
+    np.add(scratch, negative, out=scratch)
+    np.add(out, scratch, out=out)
+    return out
+
+
+def decay_round_toward_zero(x: np.ndarray, decay_const, out: np.ndarray = None, scratch: np.ndarray = None):
+    """
+    Decay `x` by the MSB-aligned decay constant, i.e., compute
+    `x * (DECAY_UNITY - decay_const) >> DECAY_SHIFT`, rounding toward zero.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Integer array to be decayed.
+    decay_const : int, numpy.ndarray
+        Decay constant(s) in the range 0 to `DECAY_UNITY`.
+    out : numpy.ndarray, optional
+        Int64 or int32 buffer to store the result in (see `mul_shift_toward_zero()`).
+    scratch : numpy.ndarray, optional
+        Buffer of the dtype of `out` for intermediate results (must be neither `out`
+        nor `x`).
+
+    Returns
+    -------
+    numpy.ndarray
+        The decayed values (of the dtype of `out`).
+    """
+    return mul_shift_toward_zero(x, DECAY_UNITY - decay_const, out, scratch)
+
+
+def saturate24(x: np.ndarray, out: np.ndarray = None):
+    """
+    Clip values to the symmetric 24-bit range `[-2**23 + 1, 2**23 - 1]`.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Integer array to be clipped.
+    out : numpy.ndarray, optional
+        Buffer to store the result in. May be `x` itself.
+
+    Returns
+    -------
+    numpy.ndarray
+        The clipped values.
+    """
+    return np.clip(x, -MAX_STATE_VAL + 1, MAX_STATE_VAL - 1, out=out)
+
+
+def wrap24(x: np.ndarray, out: np.ndarray = None):
+    """
+    Handle overflows of the 24-bit range by wrapping around modulo `2**23`. E.g.,
+    `2**23 + k` becomes `-2**23 + k` and `-(2**23 + k)` becomes `2**23 - k`.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Integer array to be wrapped.
+    out : numpy.ndarray, optional
+        Buffer to store the result in. May be `x` itself.
+
+    Returns
+    -------
+    numpy.ndarray
+        The wrapped values.
+    """
+    if out is None:
+        out = x.copy()
+    elif out is not x:
+        np.copyto(out, x, casting='unsafe')
+    np.subtract(out, 2 * MAX_STATE_VAL, out=out, where=out > MAX_STATE_VAL)
+    np.add(out, 2 * MAX_STATE_VAL, out=out, where=out <= -MAX_STATE_VAL)
+    return out
+
+
+def scale_bias(bias_mant: np.ndarray, bias_exp: np.ndarray):
+    """
+    Scale bias with bias exponent by taking into account sign of the exponent.
+
+    Parameters
+    ----------
+    bias_mant : numpy.ndarray
+        Mantissa part of the bias.
+    bias_exp : numpy.ndarray
+        Exponent part of the bias.
+
+    Returns
+    -------
+    numpy.ndarray
+        The effective bias as int32 array.
+    """
+    # Create local copy of bias_mant with promoted dtype to prevent
+    # overflow when applying shift of bias_exp.
+    bias_mant = np.asarray(bias_mant).astype(np.int32)
+    return np.where(
+        bias_exp >= 0,
+        np.left_shift(bias_mant, bias_exp),
+        np.right_shift(bias_mant, -bias_exp),
+    )
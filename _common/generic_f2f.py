@@ -0,0 +1,251 @@
+"""
+Table-driven F2F scaling, generated from the `model.json` of a model instead of hand-coded
+per model (compare e.g. `lif/lif_f2f.py`).
+
+Each variable and parameter declared in `model.json` is scaled according to the class of
+its unit, which fixes the exponents of `A` and `alpha_t` in its forward scaling:
+
+    voltage         "V"     ->  A * x               = x'
+    current (red.)  "V/s"   ->  A/alpha_t * x       = x'
+    time            "s"     ->  alpha_t * x         = x'
+    dimensionless   "1"     ->  x                   = x'
+
+Only `dt` and the names that scale with `A` (voltages and currents) are scaled, since
+these are the ones that the processes receive as they are. Time constants and refractory
+periods are passed to the processes as decays and numbers of time steps instead, and
+dimensionless names are step counters or dummy states, so neither appear in
+`forward_ops`. Names in `f2f_exceptions` are not scaled either. The unit of a name can be
+overridden by the `f2f_units` entry of `model.json`, for quantities whose physical unit
+differs from the unit of their representation in the process (e.g., a noise amplitude
+that is added to a voltage).
+
+As in the hand-coded scalers, `alpha_t = 1/dt` and the bounds on `A` follow from imposing
+that the minima of the declared variables (and `w`) are at least 1 and that the maxima of
+all declared names fit into their bit-range on Loihi. The bounds are evaluated as array
+operations over all names and populations at once.
+"""
+import json
+import os
+
+import numpy as np
+
+from brian2lava.utils.const import LOIHI2_SPECS
+from brian2lava.preset_mode.lib.model_lib._common.f2f import (
+    stack_variable_ranges, batch_ranges, divide_nonzero, max_of_quotients, check_feasible
+)
+from brian2lava.preset_mode.lib.model_lib._common.f2f_cache import memoize_scaling_params
+
+# Exponents of (A, alpha_t) in the forward scaling, by unit
+UNIT_SCALING = {
+    'V': (1, 0),
+    'V/s': (1, -1),
+    's': (0, 1),
+    '1': (0, 0),
+}
+# Names that are represented by mantissa and exponent
+MANT_EXP = {'bias', 'w'}
+
+
+def forward_op(A_exp: int, alpha_t_exp: int):
+    """The forward scaling `A**A_exp * alpha_t**alpha_t_exp` as a function of `alpha_t` and `A`."""
+    # Divide for negative exponents, such that e.g. A/alpha_t is computed exactly as written
+    if alpha_t_exp < 0:
+        return lambda alpha_t, A: A**A_exp / alpha_t**-alpha_t_exp
+    return lambda alpha_t, A: A**A_exp * alpha_t**alpha_t_exp
+
+
+class GenericModelScaler:
+    """
+    Base class of the scalers generated by `make_model_scaler()`. The class attributes
+    are the same as those of the hand-coded scalers, complemented by the scaling exponents
+    of each name.
+    """
+    process_class = None
+    forward_ops = {}
+    # Maps names to the exponents of (A, alpha_t) in their scaling
+    scaling = {}
+    # Names whose minima bound A from below
+    min_names = ()
+    msb_align_act = None
+    msb_align_decay = None
+    msb_align_prob = None
+    variables = set()
+    const = None
+    mant_exp = set()
+    # The files that the scaling is generated from (see `memoize_scaling_params()`)
+    model_files = ()
+
+    @classmethod
+    def max_val(cls, var_name):
+        if var_name in cls.variables:
+            return LOIHI2_SPECS.Max_Variables
+        elif var_name in (cls.const or ()):
+            return LOIHI2_SPECS.Max_Constants
+        else:
+            return LOIHI2_SPECS.Max_Weights
+
+    @classmethod
+    def aligned_max_val(cls, var_name):
+        """
+        The largest value of a variable, accounting for the fact that some variables
+        are represented with smaller bit-ranges. Since we're interested in their true
+        value after the alignment, we account for the implied shift here.
+        """
+        max_val = cls.max_val(var_name)
+        if var_name in cls.msb_align_act:
+            max_val = max_val * 2**LOIHI2_SPECS.MSB_Alignment_Act
+        elif var_name in cls.msb_align_decay:
+            max_val = max_val * 2**LOIHI2_SPECS.MSB_Alignment_Decay
+        elif var_name in cls.msb_align_prob:
+            max_val = max_val * 2**LOIHI2_SPECS.MSB_Alignment_Prob
+        return max_val
+
+    @classmethod
+    def scales_with_A(cls, var_name):
+        return cls.scaling.get(var_name, (0, 0))[0] != 0
+
+    @classmethod
+    def min_scaling_params(cls, variables):
+        """
+        Get the minimum scaling parameters to shift all of the parameters into
+        integer range.
+        """
+        return cls._single(cls.batch_min_scaling_params, variables)
+
+    @classmethod
+    def optimal_scaling_params(cls, variables):
+        """
+        The models are static, so the optimal choice for the parameters corresponds
+        to the maximal range of values allowed.
+        """
+        return cls.max_scaling_params(variables)
+
+    @classmethod
+    def max_scaling_params(cls, variables):
+        """
+        The scaling of each variable shouldn't surpass the largest values allowed
+        on Loihi2.
+        """
+        return cls._single(cls.batch_max_scaling_params, variables)
+
+    @classmethod
+    def _single(cls, batch_method, variables):
+        result = batch_method(stack_variable_ranges([variables]))
+        return {name: float(value[0]) for name, value in result.items()}
+
+    @classmethod
+    def batch_min_scaling_params(cls, variables):
+        """
+        Vectorized version of `min_scaling_params()` for many populations at once.
+
+        Parameters
+        ----------
+        variables : dict
+            Maps the variable names to arrays of shape `(n, 2)` with the (min, max)
+            ranges of the variable in each of the `n` populations, with `(0, 0)` for
+            variables that are not defined in a population (see `_common.f2f`).
+
+        Returns
+        -------
+        dict
+            The arrays `alpha_t` and `A` of shape `(n,)`. `A` is NaN for populations in
+            which all relevant minima are zero, and 1 for models without names that
+            scale with `A`.
+        """
+        ranges = batch_ranges(variables)
+        min_alpha_t = 1/ranges['dt'][:, 0]
+        terms = [(min_alpha_t**-cls.scaling[name][1], ranges[name][:, 0])
+                 for name in cls.min_names if name in ranges]
+        if not terms:
+            return {'alpha_t': min_alpha_t, 'A': np.ones_like(min_alpha_t)}
+        return {'alpha_t': min_alpha_t, 'A': max_of_quotients(terms)}
+
+    @classmethod
+    def batch_optimal_scaling_params(cls, variables):
+        """
+        Vectorized version of `optimal_scaling_params()` for many populations at once
+        (see `batch_min_scaling_params()` for the format of `variables`).
+        """
+        return cls.batch_max_scaling_params(variables)
+
+    @classmethod
+    def batch_max_scaling_params(cls, variables):
+        """
+        Vectorized version of `max_scaling_params()` for many populations at once
+        (see `batch_min_scaling_params()` for the format of `variables`). The bound of
+        each name is set by the largest magnitude in its range.
+
+        Returns
+        -------
+        dict
+            The arrays `alpha_t` and `A` of shape `(n,)`.
+        """
+        ranges = batch_ranges(variables)
+        alpha_t = 1/ranges['dt'][:, 0]
+        names = [name for name in ranges if cls.scales_with_A(name)]
+        if not names:
+            return {'alpha_t': alpha_t, 'A': np.ones_like(alpha_t)}
+        # One row per name: (max_val-1) / (alpha_t**alpha_t_exp * |x|_max) <= A
+        max_vals = np.array([cls.aligned_max_val(name) - 1 for name in names], dtype=float)[:, None]
+        alpha_t_exps = np.array([cls.scaling[name][1] for name in names])[:, None]
+        magnitudes = np.abs(np.stack([ranges[name] for name in names])).max(axis=2)
+        # Zero values are skipped
+        max_A = divide_nonzero(max_vals * alpha_t**-alpha_t_exps, magnitudes, np.inf).min(axis=0)
+
+        min_A = cls.batch_min_scaling_params(ranges)['A']
+        # Without nonzero minima there is no lower bound
+        check_feasible(max_A, np.where(np.isnan(min_A), -np.inf, min_A))
+
+        return {'alpha_t': alpha_t, 'A': max_A}
+
+
+def make_model_scaler(model_file: str):
+    """
+    Generate the `ModelScaler` of a model from its `model.json`.
+
+    Parameters
+    ----------
+    model_file : str
+        Path of the `model.json` file.
+
+    Returns
+    -------
+    type
+        The `ModelScaler` class, a (memoized) subclass of `GenericModelScaler`.
+
+    Raises
+    ------
+    ValueError
+        If the unit of a scaled name is not in `UNIT_SCALING`.
+    """
+    with open(model_file) as f:
+        model = json.load(f)
+    exceptions = set(model.get('f2f_exceptions', []))
+    units = {entry['name']: entry['unit'] for entry in model['variables'] + model['parameters']}
+    units.update(model.get('f2f_units', {}))
+
+    unknown = sorted(name for name, unit in units.items()
+                     if name not in exceptions and unit not in UNIT_SCALING)
+    if unknown:
+        raise ValueError(f"F2F scaling of {model['process_name']} not supported for the units "
+                         f"of {', '.join(f'{name} ({units[name]})' for name in unknown)}.")
+
+    # Only the names that the process receives as they are (see above)
+    scaling = {name: UNIT_SCALING[unit] for name, unit in units.items()
+               if name not in exceptions and UNIT_SCALING[unit][0] != 0}
+    scaling['dt'] = UNIT_SCALING['s']
+    declared_variables = [entry['name'] for entry in model['variables'] if entry['name'] in scaling]
+    attributes = {
+        'process_class': model['process_name'],
+        'forward_ops': {name: forward_op(*exps) for name, exps in scaling.items()},
+        'scaling': scaling,
+        # As in the hand-coded scalers, the minima of the variables and weights
+        'min_names': tuple(name for name in declared_variables + ['w'] if name in scaling),
+        'msb_align_act': set(model.get('msb_align_act', [])),
+        'msb_align_decay': set(model.get('msb_align_decay', [])),
+        'msb_align_prob': set(model.get('msb_align_prob', [])),
+        'variables': set(declared_variables) - MANT_EXP,
+        'mant_exp': MANT_EXP & set(scaling),
+        'model_files': (os.path.abspath(model_file),),
+    }
+    return memoize_scaling_params(type('ModelScaler', (GenericModelScaler,), attributes))
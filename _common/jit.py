@@ -0,0 +1,35 @@
+"""
+Optional just-in-time compilation of process model kernels with numba.
+
+numba is not a dependency of Brian2Lava. If it is not installed, `jit()` returns the
+functions unchanged, and the process models that use JIT-compiled kernels fall back to
+their NumPy implementation (see `NUMBA_AVAILABLE`).
+"""
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Whether the kernels are actually compiled
+NUMBA_AVAILABLE = numba is not None
+
+
+def jit(func):
+    """
+    Compile a function in nopython mode, if numba is available.
+
+    Parameters
+    ----------
+    func : callable
+        The function, which has to be compatible with numba's nopython mode.
+
+    Returns
+    -------
+    callable
+        The compiled function, or `func` itself if numba is not available. In the
+        latter case, the function still computes the same results (slowly), which
+        allows to validate the kernels without numba.
+    """
+    if numba is None:
+        return func
+    return numba.njit(nogil=True)(func)
@@ -0,0 +1,163 @@
+"""
+Kernels that compute one timestep of LIF-type neurons in a single loop over the neurons,
+to be compiled by `jit()`. In contrast to the NumPy implementations of the process models,
+which pass over the whole population array once per operation, each neuron is updated
+completely (sub-threshold dynamics, threshold, reset and refractory period) while its
+state is in registers.
+
+The state arrays are updated in place and have to be one-dimensional (flat views of the
+Vars). The parameters have to be arrays of the same length (see `per_neuron()`). The fixed-point kernels are
+bit-exact with the NumPy implementations in `fixed_point`.
+"""
+import numpy as np
+
+from brian2lava.preset_mode.lib.model_lib._common.fixed_point import DECAY_SHIFT, DECAY_UNITY, MAX_STATE_VAL
+from brian2lava.preset_mode.lib.model_lib._common.jit import jit
+
+
+@jit
+def shift_toward_zero_scalar(x):
+    """Right shift of an integer by `DECAY_SHIFT` bits, rounding toward zero."""
+    if x < 0:
+        return -((-x) >> DECAY_SHIFT)
+    return x >> DECAY_SHIFT
+
+
+@jit
+def saturate24_scalar(x):
+    """Clip an integer to the symmetric 24-bit range `[-2**23 + 1, 2**23 - 1]`."""
+    return min(max(x, -MAX_STATE_VAL + 1), MAX_STATE_VAL - 1)
+
+
+@jit
+def wrap24_scalar(x):
+    """Wrap an integer around modulo `2**23` on overflows of the 24-bit range (see `wrap24()`)."""
+    if x > MAX_STATE_VAL:
+        return x - 2 * MAX_STATE_VAL
+    if x <= -MAX_STATE_VAL:
+        return x + 2 * MAX_STATE_VAL
+    return x
+
+
+@jit
+def wrap32_scalar(x):
+    """Wrap an integer around to the int32 range, as int32 arithmetic does."""
+    return ((x + 2**31) & (2**32 - 1)) - 2**31
+
+
+@jit
+def lif_float_step(j, v, a_in, bias, delta_j, delta_v, dt, v_th, v_rs, spikes):
+    """One timestep of the floating-point LIF model (see `PyLifModelFloat`)."""
+    for i in range(v.shape[0]):
+        j_new = j[i] * (1 - delta_j[i]) + a_in[i]
+        v_new = v[i] * (1 - delta_v[i]) + (j_new + bias[i]) * dt[i]
+        j[i] = j_new
+        spikes[i] = v_new >= v_th[i]
+        v[i] = v_rs[i] if spikes[i] else v_new
+
+
+@jit
+def lif_fixed_step(j, v, a_in, effective_bias, delta_j, delta_v, dt, v_th, v_rs, ds_offset, dm_offset, spikes):
+    """One timestep of the bit-accurate LIF model (see `PyLifModelBitAcc`)."""
+    for i in range(v.shape[0]):
+        decay_const_j = min(max(np.int64(delta_j[i]) + ds_offset, 0), DECAY_UNITY)
+        j_new = shift_toward_zero_scalar(np.int64(j[i]) * (DECAY_UNITY - decay_const_j))
+        j_new = saturate24_scalar(j_new + np.int64(a_in[i]))
+        decay_const_v = np.int64(delta_v[i]) + dm_offset
+        v_new = shift_toward_zero_scalar(np.int64(v[i]) * (DECAY_UNITY - decay_const_v))
+        # The increase `(j + effective_bias) * dt` needs no shift (see
+        # `AbstractPyLifModelFixed.subthr_dynamics_fused()`)
+        v_new = saturate24_scalar(v_new + (j_new + np.int64(effective_bias[i])) * np.int64(dt[i]))
+        j[i] = j_new
+        spikes[i] = v_new >= v_th[i]
+        v[i] = v_rs[i] if spikes[i] else v_new
+
+
+@jit
+def lif_rp_v_input_float_step(v_psp, v, t_rp_steps_end, a_in, bias, delta_psp, delta_v, v_th, v_rs,
+                              time_step, t_rp_steps, spikes):
+    """One timestep of the floating-point LIF model with refractory period and
+    voltage input (see `lif_rp_v_input`).
+    """
+    for i in range(v.shape[0]):
+        v_psp_new = v_psp[i] * (1 - delta_psp[i]) + a_in[i]
+        v_psp[i] = v_psp_new
+        # Only update non-refractory neurons
+        if t_rp_steps_end[i] < time_step:
+            v[i] = v[i] * (1 - delta_v[i]) + (v_psp_new + bias[i]) * delta_v[i]
+        spikes[i] = v[i] > v_th[i]
+        if spikes[i]:
+            v[i] = v_rs[i]
+            t_rp_steps_end[i] = time_step + t_rp_steps
+
+
+@jit
+def lif_rp_v_input_fixed_step(v_psp, v, t_rp_steps_end, a_in, effective_bias, delta_psp, delta_v, v_th, v_rs,
+                              ds_offset, dm_offset, time_step, t_rp_steps, spikes):
+    """One timestep of the bit-accurate LIF model with refractory period and
+    voltage input (see `lif_rp_v_input`).
+    """
+    for i in range(v.shape[0]):
+        decay_const_psp = min(max(np.int64(delta_psp[i]) + ds_offset, 0), DECAY_UNITY)
+        v_psp_new = shift_toward_zero_scalar(np.int64(v_psp[i]) * (DECAY_UNITY - decay_const_psp))
+        v_psp_new = saturate24_scalar(v_psp_new + np.int64(a_in[i]))
+        v_psp[i] = v_psp_new
+        # Only update non-refractory neurons
+        if t_rp_steps_end[i] < time_step:
+            decay_const_v = np.int64(delta_v[i]) + dm_offset
+            v_new = shift_toward_zero_scalar(np.int64(v[i]) * (DECAY_UNITY - decay_const_v))
+            v_new += shift_toward_zero_scalar((v_psp_new + np.int64(effective_bias[i])) * decay_const_v)
+            v[i] = saturate24_scalar(v_new)
+        spikes[i] = v[i] > v_th[i]
+        if spikes[i]:
+            v[i] = v_rs[i]
+            t_rp_steps_end[i] = time_step + t_rp_steps
+
+
+@jit
+def atrlif_fixed_step(j, v, theta, r, a_in, effective_bias, delta_j, delta_v, delta_theta, delta_r,
+                      theta_0, theta_step, ds_offset, spikes):
+    """One timestep of the bit-accurate ATRLIF model (see `PyATRLIFModelFixed`)."""
+    for i in range(v.shape[0]):
+        j_new = shift_toward_zero_scalar(np.int64(j[i]) * (DECAY_UNITY - np.int64(delta_j[i]) - ds_offset))
+        j_new = wrap24_scalar(j_new + np.int64(a_in[i]))
+        v_new = shift_toward_zero_scalar(np.int64(v[i]) * (DECAY_UNITY - np.int64(delta_v[i])))
+        v_new = saturate24_scalar(v_new + j_new + np.int64(effective_bias[i]))
+        theta_new = np.int64(theta[i]) - np.int64(theta_0[i])
+        theta_new = shift_toward_zero_scalar(theta_new * (DECAY_UNITY - np.int64(delta_theta[i])))
+        theta_new = wrap32_scalar(theta_new + np.int64(theta_0[i]))
+        r_new = shift_toward_zero_scalar(np.int64(r[i]) * (DECAY_UNITY - np.int64(delta_r[i])))
+        j[i] = j_new
+        v[i] = v_new
+        # The difference and the post-spike updates wrap around as in the int32
+        # arithmetic of the NumPy implementation
+        spikes[i] = wrap32_scalar(v_new - r_new) >= theta_new
+        if spikes[i]:
+            r_new = wrap32_scalar(r_new + 2 * theta_new)
+            theta_new = wrap32_scalar(theta_new + np.int64(theta_step[i]))
+        theta[i] = theta_new
+        r[i] = r_new
+
+
+def per_neuron(value, size: int):
+    """
+    Get a parameter as a one-dimensional array with one value per neuron, as
+    required by the kernels. Parameters shared by all neurons are broadcast
+    without copying.
+
+    Parameters
+    ----------
+    value : int, float, numpy.ndarray
+        The parameter, either a scalar or an array of any shape with `size` elements.
+    size : int
+        The number of neurons.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape `(size,)` (read-only if broadcast).
+    """
+    value = np.asarray(value)
+    if value.size == size:
+        return value.reshape(-1)
+    return np.broadcast_to(value.reshape(-1), (size,))
@@ -0,0 +1,111 @@
+"""
+Generation of Gaussian background noise for the CPU process models.
+"""
+from statistics import NormalDist
+
+import numpy as np
+
+# Number of entries of the table that maps uniformly distributed integers to
+# integer-valued Gaussian noise
+INTEGER_NOISE_TABLE_SIZE = 2**16
+
+
+class GaussianNoise:
+    """
+    Generates Gaussian noise for all neurons of a population, using a random number
+    generator that is owned by the process model (instead of the global NumPy state).
+
+    Parameters
+    ----------
+    shape : tuple(int)
+        Shape of the neuron population.
+    seed : int, optional
+        Seed of the random number generator. If `None`, fresh entropy is used.
+    block_steps : int, optional
+        Number of timesteps for which the random numbers are drawn at once. Does not
+        change the generated numbers.
+    """
+
+    def __init__(self, shape, seed: int = None, block_steps: int = 1):
+        self.rng = np.random.default_rng(seed)
+        self.shape = tuple(np.atleast_1d(shape))
+        self.block_steps = block_steps
+        self.block = np.empty((block_steps,) + self.shape)
+        self.block_pos = block_steps
+        self.int_block = None
+        self.int_block_pos = block_steps
+        self.int_noise = np.empty(self.shape, dtype=np.int32)
+        # Table for integer-valued noise and the standard deviation it was built for
+        self.int_table = None
+        self.int_table_sigma = None
+
+    def standard_normal(self):
+        """
+        Draw standard normally distributed numbers for the current timestep.
+
+        Returns
+        -------
+        numpy.ndarray
+            The numbers, as view of an internal buffer that is overwritten by
+            subsequent calls.
+        """
+        if self.block_pos == self.block_steps:
+            self.rng.standard_normal(out=self.block)
+            self.block_pos = 0
+        self.block_pos += 1
+        return self.block[self.block_pos - 1]
+
+    def add_noise(self, x: np.ndarray, sigma: float):
+        """
+        Add Gaussian noise with standard deviation `sigma` to the float array `x`, in place.
+
+        Parameters
+        ----------
+        x : numpy.ndarray
+            The values to which the noise is added.
+        sigma : float
+            The standard deviation of the noise.
+        """
+        noise = self.standard_normal()
+        np.multiply(noise, sigma, out=noise)
+        np.add(x, noise, out=x)
+
+    def build_integer_table(self, sigma: float):
+        """
+        Build the table that maps uniformly distributed integers to Gaussian noise with
+        standard deviation `sigma`, rounded to integers. The table holds the rounded
+        quantiles of the normal distribution at the midpoints of
+        `INTEGER_NOISE_TABLE_SIZE` equally probable intervals.
+
+        Parameters
+        ----------
+        sigma : float
+            The standard deviation of the noise.
+        """
+        dist = NormalDist(0.0, float(sigma))
+        quantiles = [dist.inv_cdf((i + 0.5) / INTEGER_NOISE_TABLE_SIZE) for i in range(INTEGER_NOISE_TABLE_SIZE)]
+        self.int_table = np.rint(quantiles).astype(np.int32)
+        self.int_table_sigma = sigma
+
+    def add_integer_noise(self, x: np.ndarray, sigma: float):
+        """
+        Add integer-valued Gaussian noise with standard deviation `sigma` to the integer
+        array `x`, in place. The noise is looked up from a table using uniformly
+        distributed random integers, which avoids floating-point arithmetic.
+
+        Parameters
+        ----------
+        x : numpy.ndarray
+            The integer values to which the noise is added.
+        sigma : float
+            The standard deviation of the noise.
+        """
+        if self.int_table_sigma != sigma:
+            self.build_integer_table(sigma)
+        if self.int_block_pos == self.block_steps:
+            self.int_block = self.rng.integers(0, INTEGER_NOISE_TABLE_SIZE, size=(self.block_steps,) + self.shape,
+                                               dtype=np.uint16)
+            self.int_block_pos = 0
+        self.int_block_pos += 1
+        np.take(self.int_table, self.int_block[self.int_block_pos - 1], out=self.int_noise)
+        np.add(x, self.int_noise, out=x, casting='unsafe')
@@ -0,0 +1,25 @@
+"""
+Handling of neuron parameters that can either be shared by all neurons of a process or
+be given individually for each neuron.
+"""
+import numpy as np
+
+
+def parameter_shape(value, shape):
+    """
+    Get the shape of the Var for a parameter that can be shared by all neurons (scalar
+    value) or be specified individually for each neuron (array value).
+
+    Parameters
+    ----------
+    value : float, list, numpy.ndarray
+        The value of the parameter.
+    shape : tuple(int)
+        Shape of the neuron population.
+
+    Returns
+    -------
+    tuple(int)
+        `shape` if `value` holds more than one element, else `(1,)`.
+    """
+    return tuple(shape) if np.size(value) > 1 else (1,)
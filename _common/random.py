@@ -0,0 +1,200 @@
+"""
+Counter-based random number generation for the CPU process models.
+
+The random numbers are generated by the Philox bit generator, with the counter set from
+the timestep and the (global) index of the neuron. Thus, the numbers that a neuron draws
+in a timestep only depend on the seed, the name of the random stream, the neuron index,
+and the timestep. They neither depend on the order of the draws nor on how a population
+is split across processes.
+"""
+import hashlib
+
+import numpy as np
+
+# Number of 64-bit outputs that Philox4x64 generates per counter value
+PHILOX_OUTPUTS_PER_COUNTER = 4
+# Value of the highest counter word for the streams of `CounterBasedRandom.generator()`,
+# which separates them from the per-neuron streams
+GENERATOR_STREAM = 1
+
+
+def stream_key(seed, stream: str):
+    """
+    Derive the 128-bit Philox key from a seed and the name of a random stream.
+
+    Parameters
+    ----------
+    seed : int
+        The seed.
+    stream : str
+        The name of the random stream (e.g., the name of a process).
+
+    Returns
+    -------
+    numpy.ndarray
+        The key as two 64-bit unsigned integers.
+    """
+    digest = hashlib.sha256(f"{seed}/{stream}".encode()).digest()
+    return np.frombuffer(digest[:16], dtype=np.uint64).copy()
+
+
+def bernoulli_indices(rng: np.random.Generator, p: np.ndarray, unity: float = 1.0):
+    """
+    Sample the indices `i` of independent Bernoulli trials with success probabilities
+    `p[i] / unity`, without drawing a random number for every trial.
+
+    The number of candidates is drawn from a binomial distribution with the maximum
+    probability, and the candidates are chosen without replacement. If the probabilities
+    differ, each candidate is accepted with probability `p[i] / max(p)`. The cost thus
+    scales with the expected number of successes instead of the number of trials.
+
+    Parameters
+    ----------
+    rng : numpy.random.Generator
+        The random number generator.
+    p : numpy.ndarray
+        The success probabilities (multiplied by `unity`).
+    unity : float, optional
+        The value of `p` that corresponds to probability 1.
+
+    Returns
+    -------
+    numpy.ndarray
+        The sorted flat indices of the successful trials.
+    """
+    p = np.ravel(p)
+    p_max = min(p.max(), unity) if p.size > 0 else 0
+    if p_max <= 0:
+        return np.empty(0, dtype=np.int64)
+    num_candidates = rng.binomial(p.size, p_max / unity)
+    indices = rng.choice(p.size, size=num_candidates, replace=False, shuffle=False)
+    if p.min() < p_max:
+        accepted = rng.random(num_candidates) * p_max < p[indices]
+        indices = indices[accepted]
+    indices.sort()
+    return indices
+
+
+class CounterBasedRandom:
+    """
+    Counter-based random numbers for all neurons of a population.
+
+    Parameters
+    ----------
+    shape : tuple(int)
+        Shape of the neuron population.
+    seed : int, optional
+        The seed. If `None`, fresh entropy is used.
+    stream : str, optional
+        The name of the random stream. Populations with the same seed and stream draw
+        the same numbers for the same neuron indices.
+    neuron_offset : int, optional
+        Global index of the first neuron of the population within the stream. Allows to
+        split a population across processes without changing the drawn numbers.
+    """
+
+    def __init__(self, shape, seed=None, stream: str = "", neuron_offset: int = 0):
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        self.key = stream_key(seed, stream)
+        self.shape = tuple(np.atleast_1d(shape))
+        self.size = int(np.prod(self.shape))
+        self.neuron_offset = neuron_offset
+
+    def random_raw(self, time_step: int, num_steps: int = 1, neurons: slice = None):
+        """
+        Draw 64-bit random integers for all neurons.
+
+        Parameters
+        ----------
+        time_step : int
+            The (first) timestep.
+        num_steps : int, optional
+            The number of consecutive timesteps to draw for.
+        neurons : slice, optional
+            If given, only draw for this contiguous range of the flat neuron indices
+            (with the same numbers as for all neurons).
+
+        Returns
+        -------
+        numpy.ndarray
+            Array of dtype uint64 and shape `(num_steps,) + shape`, or
+            `(num_steps, num_neurons)` if `neurons` is given.
+        """
+        start, stop, _ = (neurons or slice(None)).indices(self.size)
+        num_neurons = max(stop - start, 0)
+        first_counter, skip = divmod(self.neuron_offset + start, PHILOX_OUTPUTS_PER_COUNTER)
+        raw = np.empty((num_steps, num_neurons), dtype=np.uint64)
+        for k in range(num_steps):
+            bit_gen = np.random.Philox(key=self.key, counter=[first_counter, 0, time_step + k, 0])
+            raw[k] = bit_gen.random_raw(num_neurons + skip)[skip:]
+        if neurons is not None:
+            return raw
+        return raw.reshape((num_steps,) + self.shape)
+
+    def generator(self, time_step: int):
+        """
+        Get a random number generator for drawing numbers that are not bound to single
+        neurons in the given timestep. Its stream only depends on the seed, the name of
+        the random stream, the neuron offset, and the timestep.
+
+        Parameters
+        ----------
+        time_step : int
+            The timestep.
+
+        Returns
+        -------
+        numpy.random.Generator
+            The generator.
+        """
+        counter = [0, self.neuron_offset, time_step, GENERATOR_STREAM]
+        return np.random.Generator(np.random.Philox(key=self.key, counter=counter))
+
+    def uniform(self, time_step: int, num_steps: int = 1, neurons: slice = None):
+        """
+        Draw uniformly distributed floats in [0, 1) with 53-bit resolution for all neurons.
+
+        Parameters
+        ----------
+        time_step : int
+            The (first) timestep.
+        num_steps : int, optional
+            The number of consecutive timesteps to draw for.
+        neurons : slice, optional
+            If given, only draw for this contiguous range of the flat neuron indices.
+
+        Returns
+        -------
+        numpy.ndarray
+            Array of shape `(num_steps,) + shape`, or `(num_steps, num_neurons)` if
+            `neurons` is given.
+        """
+        raw = self.random_raw(time_step, num_steps, neurons)
+        np.right_shift(raw, np.uint64(11), out=raw)
+        return np.multiply(raw, 1.0 / 2**53)
+
+    def integers(self, time_step: int, bits: int, num_steps: int = 1, neurons: slice = None):
+        """
+        Draw uniformly distributed integers in [0, 2**bits) for all neurons.
+
+        Parameters
+        ----------
+        time_step : int
+            The (first) timestep.
+        bits : int
+            The number of random bits (at most 63).
+        num_steps : int, optional
+            The number of consecutive timesteps to draw for.
+        neurons : slice, optional
+            If given, only draw for this contiguous range of the flat neuron indices.
+
+        Returns
+        -------
+        numpy.ndarray
+            Array of dtype int64 and shape `(num_steps,) + shape`, or
+            `(num_steps, num_neurons)` if `neurons` is given.
+        """
+        raw = self.random_raw(time_step, num_steps, neurons)
+        np.right_shift(raw, np.uint64(64 - bits), out=raw)
+        return raw.view(np.int64)
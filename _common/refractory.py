@@ -0,0 +1,114 @@
+"""
+Bookkeeping of refractory neurons shared by the CPU process models with refractory period.
+
+At low firing rates, only few neurons are refractory. Masking the whole population in every
+timestep is then more costly than updating all neurons densely and afterwards restoring the
+few refractory ones. `RefractoryTracker` therefore keeps the refractory neurons as a small
+set of indices as long as their fraction stays below a threshold, and otherwise falls back
+to a dense boolean mask.
+"""
+import numpy as np
+
+
+class RefractoryTracker:
+    """
+    Tracks which neurons of a population are in their refractory period.
+
+    Parameters
+    ----------
+    shape : tuple(int)
+        Shape of the neuron population.
+    sparse_fraction : float, optional
+        Maximum fraction of refractory neurons for which they are tracked as a set of
+        indices. If more neurons are refractory, a dense mask is used instead.
+    """
+
+    def __init__(self, shape, sparse_fraction: float = 0.05):
+        self.max_sparse = int(sparse_fraction * np.prod(shape))
+        # Flat indices of the refractory neurons, or `None` if they are not tracked
+        # sparsely (either because there are too many or because `t_rp_steps_end`
+        # was changed from outside)
+        self.indices = None
+        # Mask of non-refractory neurons, only valid if `indices` is `None`
+        self.non_ref = np.zeros(shape, dtype=bool)
+
+    def invalidate(self):
+        """
+        Discard the set of indices, such that the refractory neurons are determined
+        from `t_rp_steps_end` again in the next timestep.
+        """
+        self.indices = None
+
+    def update(self, t_rp_steps_end: np.ndarray, time_step: int):
+        """
+        Determine the neurons that are refractory in the current timestep.
+
+        Parameters
+        ----------
+        t_rp_steps_end : numpy.ndarray
+            The timesteps until which the neurons are in refractory period.
+        time_step : int
+            The current timestep.
+
+        Returns
+        -------
+        numpy.ndarray or None
+            The flat indices of the refractory neurons, or `None` if there are too
+            many of them. In the latter case, the attribute `non_ref` holds the mask
+            of the non-refractory neurons.
+        """
+        if self.indices is not None:
+            # Only the previously refractory neurons need to be checked
+            still_ref = np.take(t_rp_steps_end, self.indices) >= time_step
+            self.indices = self.indices[still_ref]
+            return self.indices
+        np.less(t_rp_steps_end, time_step, out=self.non_ref)
+        num_ref = self.non_ref.size - np.count_nonzero(self.non_ref)
+        if num_ref <= self.max_sparse:
+            self.indices = np.flatnonzero(~self.non_ref)
+        return self.indices
+
+    def add(self, spike_vector: np.ndarray):
+        """
+        Add the neurons that have spiked and therefore start their refractory period.
+
+        Parameters
+        ----------
+        spike_vector : numpy.ndarray
+            Boolean array of the neurons that have spiked in the current timestep.
+        """
+        if self.indices is None:
+            return
+        spiked = np.flatnonzero(spike_vector)
+        if spiked.size > 0:
+            # Duplicates (neurons spiking during their refractory period) do no
+            # harm and are removed once the refractory period has ended
+            self.indices = np.concatenate((self.indices, spiked))
+            if self.indices.size > self.max_sparse:
+                self.indices = None
+
+    def copy_non_refractory(self, dst: np.ndarray, src: np.ndarray, t_rp_steps_end: np.ndarray,
+                            time_step: int):
+        """
+        Copy the updated values `src` to the state variable `dst` for all neurons
+        that are not refractory in the current timestep.
+
+        Parameters
+        ----------
+        dst : numpy.ndarray
+            The state variable to be updated.
+        src : numpy.ndarray
+            The updated values for all neurons. Is overwritten at the refractory neurons
+            if these are tracked sparsely.
+        t_rp_steps_end : numpy.ndarray
+            The timesteps until which the neurons are in refractory period.
+        time_step : int
+            The current timestep.
+        """
+        indices = self.update(t_rp_steps_end, time_step)
+        if indices is None:
+            np.copyto(dst, src, casting='unsafe', where=self.non_ref)
+        else:
+            # Keep the values of the few refractory neurons and copy densely
+            np.put(src, indices, np.take(dst, indices))
+            np.copyto(dst, src, casting='unsafe')
@@ -0,0 +1,97 @@
+"""
+Computation of spike schedules for the time-specific spiker models.
+"""
+import numpy as np
+
+
+def periodic_spike_block(t_start: int, num_steps: int, t_spike_steps, t_rp_steps_end, t_rp_steps):
+    """
+    Compute the spikes of time-specific spiker neurons for `num_steps` timesteps at once.
+
+    A neuron spikes in timestep `t` if `t > t_spike_steps` and if it is not refractory
+    (`t > t_rp_steps_end`), and is refractory until `t + t_rp_steps` afterwards. Thus,
+    from its first spike on, it spikes periodically every `t_rp_steps + 1` timesteps.
+
+    Parameters
+    ----------
+    t_start : int
+        The first timestep of the block.
+    num_steps : int
+        The number of timesteps of the block.
+    t_spike_steps : int, numpy.ndarray
+        The timesteps after which the neurons start spiking.
+    t_rp_steps_end : int, numpy.ndarray
+        The timesteps until which the neurons are in refractory period at `t_start`.
+    t_rp_steps : int
+        The duration of the refractory period in timesteps.
+
+    Returns
+    -------
+    numpy.ndarray
+        Boolean array of shape `(num_steps,) + shape` that holds the spikes of all neurons,
+        one timestep after the other.
+    """
+    first_step = np.maximum(np.maximum(t_spike_steps, t_rp_steps_end) + 1, t_start)
+    period = np.maximum(t_rp_steps + 1, 1)
+    t = np.arange(t_start, t_start + num_steps).reshape((-1,) + (1,) * np.ndim(first_step))
+    # `(t - first_step) % period == 0` is evaluated by comparing the phases, which only
+    # requires the modulo of the neurons' `first_step` instead of the whole block
+    return (t >= first_step) & (t % period == first_step % period)
+
+
+class SpikeSchedule:
+    """
+    Event queue for time-specific spiker neurons, such that the cost per timestep scales
+    with the number of spiking neurons instead of the number of all neurons.
+
+    The neurons are sorted by the timestep of their first spike, and a cursor into this
+    order marks the neurons that have started spiking. Since the neurons then spike
+    periodically every `t_rp_steps + 1` timesteps (see `periodic_spike_block()`), they
+    are grouped by the phase of their spikes within this period.
+
+    Parameters
+    ----------
+    t_start : int
+        The timestep from which on the schedule is used.
+    t_spike_steps : int, numpy.ndarray
+        The timesteps after which the neurons start spiking.
+    t_rp_steps_end : int, numpy.ndarray
+        The timesteps until which the neurons are in refractory period at `t_start`.
+    t_rp_steps : int
+        The duration of the refractory period in timesteps.
+    """
+
+    def __init__(self, t_start: int, t_spike_steps, t_rp_steps_end, t_rp_steps):
+        first_step = np.ravel(np.maximum(np.maximum(t_spike_steps, t_rp_steps_end) + 1, t_start))
+        self.order = np.argsort(first_step, kind='stable')
+        self.first_step = first_step[self.order]
+        self.period = max(int(t_rp_steps) + 1, 1)
+        self.cursor = 0
+        # Flat indices of the spiking neurons, by the phase of their spikes
+        self.phase_groups = {}
+        self.empty = np.empty(0, dtype=np.int64)
+
+    def spike_indices(self, time_step: int):
+        """
+        Get the neurons that spike in the given timestep. Has to be called for
+        consecutive timesteps, starting at `t_start`.
+
+        Parameters
+        ----------
+        time_step : int
+            The timestep.
+
+        Returns
+        -------
+        numpy.ndarray
+            The flat indices of the spiking neurons.
+        """
+        phase = time_step % self.period
+        group = self.phase_groups.get(phase, self.empty)
+        # Add the neurons that spike for the first time
+        cursor_end = np.searchsorted(self.first_step, time_step, side='right')
+        if cursor_end > self.cursor:
+            group = np.concatenate((group, self.order[self.cursor:cursor_end]))
+            self.phase_groups[phase] = group
+            self.cursor = cursor_end
+        return group
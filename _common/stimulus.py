@@ -0,0 +1,125 @@
+"""
+Access to predefined stimuli that are stored for all timesteps in a `.npy` file.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class PredefinedStimulus:
+    """
+    Provides the values of a predefined stimulus for one timestep after the other.
+
+    Brian2Lava stores the stimulus in neuron-major layout, i.e., as array of shape
+    `(num_neurons, num_steps)`. Reading the values of one timestep from this layout
+    gathers one element per neuron. Thus, if the file is loaded into memory, it is
+    transposed to time-major layout once, such that the values of each timestep are
+    contiguous. For memory-mapped files, a time-major file of shape
+    `(num_steps, num_neurons)` (e.g., written via `np.save(path, stimulus.T)`) can be
+    read instead.
+
+    Parameters
+    ----------
+    path : str
+        Path to the `.npy` file.
+    time_major : bool, optional
+        Whether the file is stored in time-major layout.
+    mmap_mode : str, optional
+        If not `None`, the file is memory-mapped with the given mode (see `numpy.load`)
+        instead of being loaded into memory completely.
+    prefetch_steps : int, optional
+        If larger than 0, the values are read in blocks of this number of timesteps,
+        and the next block is read in a background thread while the current one is
+        used. This is mainly useful together with `mmap_mode`.
+    """
+
+    def __init__(self, path: str, time_major: bool = False, mmap_mode: str = None, prefetch_steps: int = 0):
+        self.data = np.load(path, mmap_mode=mmap_mode)
+        self.time_major = time_major
+        if not time_major and mmap_mode is None:
+            self.data = np.ascontiguousarray(self.data.T)
+            self.time_major = True
+        # The stored values are never written (which also keeps them out of snapshots of
+        # the process model state, see `_common/f2f_calibration.py`)
+        if mmap_mode is None:
+            self.data.flags.writeable = False
+        self.prefetch_steps = prefetch_steps
+        # Block of prefetched values (in time-major layout)
+        self.block = None
+        self.block_start = 0
+        # Background reading of the next block
+        self.executor = ThreadPoolExecutor(max_workers=1) if prefetch_steps > 0 else None
+        self.next_block = None
+        self.next_block_start = None
+
+    @property
+    def shape(self):
+        """Shape of the stored array (after transposing it to time-major layout, if so)."""
+        return self.data.shape
+
+    @property
+    def num_steps(self):
+        """Number of timesteps for which stimulus values are stored."""
+        return self.data.shape[0] if self.time_major else self.data.shape[1]
+
+    def read_block(self, start: int):
+        """
+        Read the values of `prefetch_steps` timesteps into memory.
+
+        Parameters
+        ----------
+        start : int
+            The first timestep of the block.
+
+        Returns
+        -------
+        numpy.ndarray
+            The values in time-major layout.
+        """
+        stop = min(start + self.prefetch_steps, self.num_steps)
+        if self.time_major:
+            return np.array(self.data[start:stop])
+        return np.ascontiguousarray(self.data[:, start:stop].T)
+
+    def fetch_block(self, start: int):
+        """
+        Make the block starting at timestep `start` the current block, and start
+        reading the subsequent block in the background.
+
+        Parameters
+        ----------
+        start : int
+            The first timestep of the block.
+        """
+        if self.next_block is not None and self.next_block_start == start:
+            self.block = self.next_block.result()
+        else:
+            self.block = self.read_block(start)
+        self.block_start = start
+        self.next_block = None
+        next_start = start + len(self.block)
+        if next_start < self.num_steps:
+            self.next_block = self.executor.submit(self.read_block, next_start)
+            self.next_block_start = next_start
+
+    def values(self, time_step: int):
+        """
+        Get the stimulus values for one timestep.
+
+        Parameters
+        ----------
+        time_step : int
+            The timestep.
+
+        Returns
+        -------
+        numpy.ndarray
+            The values for all neurons. This may be a view of the stored data.
+        """
+        if self.prefetch_steps == 0:
+            return self.data[time_step] if self.time_major else self.data[:, time_step]
+        k = time_step - self.block_start
+        if self.block is None or not 0 <= k < len(self.block):
+            self.fetch_block(time_step)
+            k = 0
+        return self.block[k]
@@ -1,10 +1,17 @@
 import numpy as np
+from brian2.utils.logger import get_logger
 from lava.magma.core.sync.protocols.loihi_protocol import LoihiProtocol
 from lava.magma.core.model.py.ports import PyInPort, PyOutPort
 from lava.magma.core.model.py.type import LavaPyType
 from lava.magma.core.resources import CPU
 from lava.magma.core.decorator import implements, requires, tag
 from lava.magma.core.model.py.model import PyLoihiProcessModel
+from brian2lava.preset_mode.lib.model_lib._common.fixed_point import (
+	decay_round_toward_zero, saturate24, wrap24, scale_bias
+)
+from brian2lava.preset_mode.lib.model_lib._common.chunked import ChunkedExecutor, DEFAULT_CHUNK_SIZE
+from brian2lava.preset_mode.lib.model_lib._common.jit import NUMBA_AVAILABLE
+from brian2lava.preset_mode.lib.model_lib._common.lif_kernels import atrlif_fixed_step, per_neuron
 
 @implements(proc=ATRLIF, protocol=LoihiProtocol)
 @requires(CPU)
@@ -24,12 +31,12 @@ class PyATRLIFModelFloat(PyLoihiProcessModel):
 	s: np.ndarray = LavaPyType(np.ndarray, bool)
 	bias_mant: np.ndarray = LavaPyType(np.ndarray, float)
 	bias_exp: np.ndarray = LavaPyType(np.ndarray, float)
-	delta_j: float = LavaPyType(float, float)
-	delta_v: float = LavaPyType(float, float)
-	delta_theta: float = LavaPyType(float, float)
-	delta_r: float = LavaPyType(float, float)
-	theta_0: float = LavaPyType(float, float)
-	theta_step: float = LavaPyType(float, float)
+	delta_j: np.ndarray = LavaPyType(np.ndarray, float)
+	delta_v: np.ndarray = LavaPyType(np.ndarray, float)
+	delta_theta: np.ndarray = LavaPyType(np.ndarray, float)
+	delta_r: np.ndarray = LavaPyType(np.ndarray, float)
+	theta_0: np.ndarray = LavaPyType(np.ndarray, float)
+	theta_step: np.ndarray = LavaPyType(np.ndarray, float)
 	s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, float)
 	
 
@@ -64,7 +71,7 @@ class PyATRLIFModelFloat(PyLoihiProcessModel):
 		theta_spiking = self.theta[spike_vector]
 
 		self.r[spike_vector] = r_spiking + 2*theta_spiking
-		self.theta[spike_vector] = theta_spiking + self.theta_step
+		np.add(self.theta, self.theta_step, out=self.theta, where=spike_vector)
 
 
 	def run_spk(self):
@@ -99,12 +106,12 @@ class PyATRLIFModelFixed(PyLoihiProcessModel):
 	s: np.ndarray = LavaPyType(np.ndarray, bool)
 	bias_mant: np.ndarray = LavaPyType(np.ndarray, np.int16, precision=13)
 	bias_exp: np.ndarray = LavaPyType(np.ndarray, np.int16, precision=3)
-	delta_j: int = LavaPyType(int, np.uint16, precision=12)
-	delta_v: int = LavaPyType(int, np.uint16, precision=12)
-	delta_theta: int = LavaPyType(int, np.uint16, precision=12)
-	delta_r: int = LavaPyType(int, np.uint16, precision=12)
-	theta_0: int = LavaPyType(int, np.uint16, precision=12)
-	theta_step: int = LavaPyType(int, np.uint16, precision=12)
+	delta_j: np.ndarray = LavaPyType(np.ndarray, np.uint16, precision=12)
+	delta_v: np.ndarray = LavaPyType(np.ndarray, np.uint16, precision=12)
+	delta_theta: np.ndarray = LavaPyType(np.ndarray, np.uint16, precision=12)
+	delta_r: np.ndarray = LavaPyType(np.ndarray, np.uint16, precision=12)
+	theta_0: np.ndarray = LavaPyType(np.ndarray, np.uint16, precision=12)
+	theta_step: np.ndarray = LavaPyType(np.ndarray, np.uint16, precision=12)
 	s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.int32, precision=24)
 
 
@@ -116,6 +123,9 @@ class PyATRLIFModelFixed(PyLoihiProcessModel):
 		# Without it, the range of 12-bit unsigned decay_u and dv is 0 to 4095.
 		self.ds_offset = 1
 		self.effective_bias = 0
+		# The effective bias only depends on `bias_mant` and `bias_exp`, so it is
+		# computed in the first timestep and then only after a Var update
+		self.bias_changed = True
 		# State variables j and v are 24 bits wide
 		self.jv_bitwidth = 24
 		self.max_jv_val = 2 ** (self.jv_bitwidth - 1)
@@ -123,6 +133,22 @@ class PyATRLIFModelFixed(PyLoihiProcessModel):
         # --> decay constants are accordingly prepared by Brian2Lava already 
 		self.decay_shift = 12
 		self.decay_unity = 2**self.decay_shift
+		# Preallocated integer buffers for the fixed-point arithmetic, reused in every timestep
+		# With `narrow_buffers=True`, the buffers are int32 instead of int64 (see
+		# `mul_shift_toward_zero()`), which halves their memory and memory traffic
+		buf_dtype = np.int32 if proc_params._parameters.get("narrow_buffers", False) else np.int64
+		shape = proc_params._parameters["shape"]
+		self.buf_a = np.zeros(shape, dtype=buf_dtype)
+		self.buf_b = np.zeros(shape, dtype=buf_dtype)
+		# In fused kernel mode, all four state variables, the spikes and the post-spike
+		# behavior are computed chunk by chunk (see `update_chunk()`), such that the data
+		# of a chunk stays in the cache for the whole timestep. The unfused implementation
+		# is kept as a bit-exact reference and can be selected by `fused_kernel=False`.
+		self.fused_kernel = proc_params._parameters.get("fused_kernel", True)
+		self.chunked = ChunkedExecutor(
+			shape, proc_params._parameters.get("num_threads", 1),
+			proc_params._parameters.get("chunk_size", DEFAULT_CHUNK_SIZE)
+		) if self.fused_kernel else None
 
 	
 	def subthr_dynamics(self, activation_in: np.ndarray):
@@ -133,87 +159,40 @@ class PyATRLIFModelFixed(PyLoihiProcessModel):
 		theta[t] = (1-delta_theta)*(theta[t-1] - theta_0) + theta_0 
 		r[t] = (1-delta_r)*r[t-1]
 		"""
+		buf, scratch = self.buf_a, self.buf_b
+
 		# Update current
 		# --------------
 		# Compute decay constant (left shift via multiplication by `decay_unity`
         # --> already done by Brian2Lava!)
-		#decay_const_j = self.delta_j*self.decay_unity + self.ds_offset
 		decay_const_j = self.delta_j + self.ds_offset
-
-		# Below, j is promoted to int64 to avoid overflow of the product
-		# between j and decay constant beyond int32. Subsequent right shift by
-		# 12 brings us back within 24-bits (and hence, within 32-bits)
-		j_decayed = np.int64(self.j * (self.decay_unity - decay_const_j)) # multiplication by 'decay_unity' is like a left shift
-		j_decayed = np.sign(j_decayed) * np.right_shift(
-			np.abs(j_decayed), self.decay_shift
-		)
-
+		decay_round_toward_zero(self.j, decay_const_j, out=buf, scratch=scratch)
 		# Add synaptic input to decayed current
-		j_updated = np.int32(j_decayed + activation_in)
-		# Check if value of current is within bounds of 24-bit. Overflows are
-		# handled by wrapping around modulo 2 ** 23. E.g., (2 ** 23) + k
-		# becomes k and -(2**23 + k) becomes -k
-		wrapped_curr = np.where(
-			j_updated > self.max_jv_val,
-			j_updated - 2 * self.max_jv_val,
-			j_updated,
-		)
-		wrapped_curr = np.where(
-			wrapped_curr <= -self.max_jv_val,
-			j_updated + 2 * self.max_jv_val,
-			wrapped_curr,
-		)
-		#print(f"-  delta_j = {self.delta_j}\n-  decay_const_j = {decay_const_j}\n-  j_decayed = {j_decayed}\n-  j_updated = {wrapped_curr}")
-		self.j[:] = wrapped_curr
+		np.add(buf, activation_in, out=buf)
+		# Overflows beyond 24-bit are handled by wrapping around modulo 2 ** 23
+		self.j[:] = wrap24(buf, out=buf)
 
 		# Update voltage (decaying similar to current)
 		# --------------------------------------------
-		# Compute decay constant (left shift via multiplication by `decay_unity`
-        # --> already done by Brian2Lava!)
-		#decay_const_v = self.delta_v*self.decay_unity
 		decay_const_v = self.delta_v
-
-		neg_voltage_limit = -np.int32(self.max_jv_val) + 1
-		pos_voltage_limit = np.int32(self.max_jv_val) - 1
-		v_decayed = np.int64(self.v) * np.int64(self.decay_unity - decay_const_v) # multiplication by 'decay_unity' is like a left shift
-		v_decayed = np.sign(v_decayed) * np.right_shift(
-			np.abs(v_decayed), self.decay_shift
-		)
-
-		v_updated = np.int32(v_decayed + self.j + self.effective_bias)
-		#print(f"-  delta_v = {self.delta_v}\n-  decay_const_v = {decay_const_v}\n-  v_decayed = {v_decayed}\n-  v_updated = {v_updated}")
-		self.v[:] = np.clip(v_updated, neg_voltage_limit, pos_voltage_limit)
+		decay_round_toward_zero(self.v, decay_const_v, out=buf, scratch=scratch)
+		np.add(buf, self.j, out=buf)
+		np.add(buf, self.effective_bias, out=buf)
+		self.v[:] = saturate24(buf, out=buf)
 
 		# Update threshold (decaying similar to current)
 		# ----------------------------------------------
-		# Compute decay constant (left shift via multiplication by `decay_unity`
-        # --> already done by Brian2Lava!)
-		#decay_const_theta = self.delta_theta*self.decay_unity
 		decay_const_theta = self.delta_theta
-
-		theta_diff_decayed = np.int64(self.theta - self.theta_0) * \
-		                     np.int64(self.decay_unity - decay_const_theta) # multiplication by 'decay_unity' is like a left shift
-		theta_diff_decayed = np.sign(theta_diff_decayed) * np.right_shift(
-			np.abs(theta_diff_decayed), self.decay_shift
-		)
-		#print(f"-  delta_theta = {self.delta_theta}\n-  decay_const_theta = {decay_const_theta}\n-  theta = {self.theta}\n-  theta_diff_decayed = {theta_diff_decayed}")
-
-		self.theta[:] = np.int32(theta_diff_decayed) + self.theta_0
+		np.subtract(self.theta, self.theta_0, out=buf)
+		decay_round_toward_zero(buf, decay_const_theta, out=buf, scratch=scratch)
+		np.add(buf, self.theta_0, out=buf)
+		self.theta[:] = buf
 		# TODO clipping?
 
 		# Update refractoriness (decaying similar to current)
 		# ---------------------------------------------------
-		# Compute decay constant (left shift via multiplication by `decay_unity`
-        # --> already done by Brian2Lava!)
-		#decay_const_r = self.delta_r*self.decay_unity
 		decay_const_r = self.delta_r
-
-		r_decayed = np.int64(self.r) * np.int64(self.decay_unity - decay_const_r) # multiplication by 'decay_unity' is like a left shift
-		r_decayed = np.sign(r_decayed) * np.right_shift(
-			np.abs(r_decayed), self.decay_shift
-		)
-
-		self.r[:] = np.int32(r_decayed)
+		self.r[:] = decay_round_toward_zero(self.r, decay_const_r, out=buf, scratch=scratch)
 		# TODO clipping?
 
 
@@ -221,16 +200,15 @@ class PyATRLIFModelFixed(PyLoihiProcessModel):
 		"""
 		Scale bias with bias exponent by taking into account sign of the exponent.
 		"""
-		# Create local copy of bias_mant with promoted dtype to prevent
-		# overflow when applying shift of bias_exp.
-		bias_mant = self.bias_mant.copy().astype(np.int32)
-		self.effective_bias = np.where(
-			self.bias_exp >= 0,
-			np.left_shift(bias_mant, self.bias_exp),
-			np.right_shift(bias_mant, -self.bias_exp),
-		)
+		self.effective_bias = scale_bias(self.bias_mant, self.bias_exp)
 		#print(f"scale_bias():\n\tbias_mant = {self.bias_mant}\n\tbias_exp = {self.bias_exp}\n\teffective_bias = {self.effective_bias}")
 
+	def on_var_update(self):
+		"""Mark the effective bias for recomputation, since `bias_mant` or
+		`bias_exp` might have been set at runtime.
+		"""
+		self.bias_changed = True
+
 	
 	def post_spike(self, spike_vector: np.ndarray):
 		"""
@@ -242,7 +220,49 @@ class PyATRLIFModelFixed(PyLoihiProcessModel):
 		theta_spiking = self.theta[spike_vector]
 
 		self.r[spike_vector] = r_spiking + 2*theta_spiking
-		self.theta[spike_vector] = theta_spiking + self.theta_step
+		np.add(self.theta, self.theta_step, out=self.theta, where=spike_vector)
+
+
+	def update_chunk(self, neurons: slice, activation_in: np.ndarray, spikes: np.ndarray):
+		"""
+		Sub-threshold dynamics (as in `subthr_dynamics()`), spiking and post-spike behavior
+		(as in `post_spike()`) of a chunk of neurons in fused kernel mode. Writes the spikes
+		of the chunk to the flat array `spikes`.
+		"""
+		c = self.chunked.chunk
+		j, v, theta, r = c(self.j, neurons), c(self.v, neurons), c(self.theta, neurons), c(self.r, neurons)
+		buf, scratch = c(self.buf_a, neurons), c(self.buf_b, neurons)
+		theta_0 = c(self.theta_0, neurons)
+		s = spikes[neurons]
+
+		decay_round_toward_zero(j, c(self.delta_j, neurons) + self.ds_offset, out=buf, scratch=scratch)
+		np.add(buf, c(activation_in, neurons), out=buf)
+		j[:] = wrap24(buf, out=buf)
+
+		decay_round_toward_zero(v, c(self.delta_v, neurons), out=buf, scratch=scratch)
+		np.add(buf, j, out=buf)
+		np.add(buf, c(self.effective_bias, neurons), out=buf)
+		v[:] = saturate24(buf, out=buf)
+
+		np.subtract(theta, theta_0, out=buf)
+		decay_round_toward_zero(buf, c(self.delta_theta, neurons), out=buf, scratch=scratch)
+		np.add(buf, theta_0, out=buf)
+		theta[:] = buf
+
+		r[:] = decay_round_toward_zero(r, c(self.delta_r, neurons), out=buf, scratch=scratch)
+
+		# Spike if (v[t] - r[t]) >= theta[t], with the difference computed in int32 as in
+		# the unfused implementation
+		np.subtract(v, r, out=buf, dtype=np.int32)
+		np.greater_equal(buf, theta, out=s)
+
+		# Post-spike behavior, multiplying by the spikes instead of indexing or masking
+		# with them (the results are the same modulo 2**32, as in int32 arithmetic)
+		np.multiply(theta, s, out=buf)
+		np.left_shift(buf, 1, out=buf)
+		np.add(r, buf, out=r, casting='unsafe')
+		np.multiply(c(self.theta_step, neurons), s, out=buf)
+		np.add(theta, buf, out=theta, casting='unsafe')
 
 
 	def run_spk(self):
@@ -256,8 +276,15 @@ class PyATRLIFModelFixed(PyLoihiProcessModel):
 		# Receive synaptic input
 		a_in_data = self.a_in.recv()
 
-		# Compute effective bias
-		self.scale_bias()
+		# Compute effective bias (if bias might have changed)
+		if self.bias_changed:
+			self.scale_bias()
+			self.bias_changed = False
+
+		if self.chunked is not None:
+			self.chunked.map(self.update_chunk, a_in_data, self.s.reshape(-1))
+			self.s_out.send(self.s)
+			return
 
 		# Compute the subthreshold dynamics
 		self.subthr_dynamics(activation_in=a_in_data)
@@ -269,3 +296,94 @@ class PyATRLIFModelFixed(PyLoihiProcessModel):
 		# Do the post-processing
 		self.post_spike(spike_vector=s_out_buff)
 		self.s_out.send(s_out_buff)
+
+
+@implements(proc=ATRLIF, protocol=LoihiProtocol)
+@tag("floating_pt_compact")
+class PyATRLIFModelFloatCompact(PyATRLIFModelFloat):
+	"""Variant of `PyATRLIFModelFloat` that sends the spikes as `np.uint8` instead of
+	float, which reduces the data transferred per timestep. The receiving
+	synapse process models cast the spikes to `bool` anyway.
+	"""
+	s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.uint8, precision=1)
+
+
+@implements(proc=ATRLIF, protocol=LoihiProtocol)
+@tag("fixed_pt_compact")
+class PyATRLIFModelFixedCompact(PyATRLIFModelFixed):
+	"""Variant of `PyATRLIFModelFixed` that sends the spikes as `np.uint8` instead of
+	`np.int32`, which reduces the data transferred per timestep. The receiving
+	synapse process models cast the spikes to `bool` anyway.
+	"""
+	s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.uint8, precision=1)
+
+
+@implements(proc=ATRLIF, protocol=LoihiProtocol)
+@tag("fixed_pt_jit")
+class PyATRLIFModelFixedJit(PyATRLIFModelFixed):
+	"""Variant of `PyATRLIFModelFixed` that computes the sub-threshold dynamics, spiking
+	and post-spike behavior in one JIT-compiled loop over the neurons (see
+	`atrlif_fixed_step()`), bit-exact with `PyATRLIFModelFixed`. Falls back to the NumPy
+	implementation of `PyATRLIFModelFixed` if numba is not installed.
+	"""
+
+	def __init__(self, proc_params):
+		super(PyATRLIFModelFixedJit, self).__init__(proc_params)
+		if not NUMBA_AVAILABLE:
+			get_logger('brian2.devices.lava').warning(
+				f"numba is not installed, process '{proc_params._parameters['name']}' "
+				f"falls back to the NumPy implementation of PyATRLIFModelFixed")
+
+
+	def run_spk(self):
+		"""The run function that performs the actual computation during
+		execution orchestrated by a PyLoihiProcessModel using the
+		LoihiProtocol.
+		"""
+		if not NUMBA_AVAILABLE:
+			super().run_spk()
+			return
+		a_in_data = self.a_in.recv()
+
+		# Compute effective bias (if bias might have changed)
+		if self.bias_changed:
+			self.scale_bias()
+			self.bias_changed = False
+
+		size = self.v.size
+		args = (self.j.reshape(-1), self.v.reshape(-1), self.theta.reshape(-1), self.r.reshape(-1),
+				per_neuron(a_in_data, size), per_neuron(self.effective_bias, size),
+				per_neuron(self.delta_j, size), per_neuron(self.delta_v, size),
+				per_neuron(self.delta_theta, size), per_neuron(self.delta_r, size),
+				per_neuron(self.theta_0, size), per_neuron(self.theta_step, size),
+				self.ds_offset, self.s.reshape(-1))
+		if self.chunked is not None:
+			self.chunked.map_kernel(atrlif_fixed_step, *args)
+		else:
+			atrlif_fixed_step(*args)
+		self.s_out.send(self.s)
+
+
+@implements(proc=ATRLIF, protocol=LoihiProtocol)
+@tag("floating_pt32")
+class PyATRLIFModelFloat32(PyATRLIFModelFloat):
+	"""Variant of `PyATRLIFModelFloat` that keeps the state, parameters and
+	spikes in single precision (`np.float32`) instead of double precision,
+	which halves the memory traffic per timestep and the size of the spike
+	messages. Scalar parameters are stored as arrays of shape `(1,)`, so
+	that they do not promote the computation to double precision.
+	"""
+	a_in: PyInPort = LavaPyType(PyInPort.VEC_DENSE, np.float32)
+	j: np.ndarray = LavaPyType(np.ndarray, np.float32)
+	v: np.ndarray = LavaPyType(np.ndarray, np.float32)
+	theta: np.ndarray = LavaPyType(np.ndarray, np.float32)
+	r: np.ndarray = LavaPyType(np.ndarray, np.float32)
+	bias_mant: np.ndarray = LavaPyType(np.ndarray, np.float32)
+	bias_exp: np.ndarray = LavaPyType(np.ndarray, np.float32)
+	delta_j: np.ndarray = LavaPyType(np.ndarray, np.float32)
+	delta_v: np.ndarray = LavaPyType(np.ndarray, np.float32)
+	delta_theta: np.ndarray = LavaPyType(np.ndarray, np.float32)
+	delta_r: np.ndarray = LavaPyType(np.ndarray, np.float32)
+	theta_0: np.ndarray = LavaPyType(np.ndarray, np.float32)
+	theta_step: np.ndarray = LavaPyType(np.ndarray, np.float32)
+	s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.float32)
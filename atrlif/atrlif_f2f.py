@@ -12,6 +12,7 @@ for F2F conversion of the LIF model. A more meaningful table of the forward scal
     w       ->  A/alpha_t * w    = w'
     bias    ->  A/alpha_t * bias    = bias'
     dt      ->  alpha_t * dt        = dt'
+    delta_* ->  delta_*             = delta_*' (decays per time step)
 
     The minimum values for alpha_t and A are calculated by imposing all 
     values to be > 1:
@@ -23,7 +24,14 @@ Note: All the lambda functions must have the same number of arguments (all the p
 """
 
 
+import numpy as np
+
 from brian2lava.utils.const import LOIHI2_SPECS
+from brian2lava.preset_mode.lib.model_lib._common.f2f import (
+    stack_variable_ranges, batch_ranges, divide_nonzero, max_of_quotients, check_feasible
+)
+from brian2lava.preset_mode.lib.model_lib._common.f2f_cache import memoize_scaling_params
+@memoize_scaling_params
 class ModelScaler:
     # This attribute is not used but can be useful for debugging
     process_class = 'ATRLIF'
@@ -39,6 +47,12 @@ class ModelScaler:
         'theta_step': lambda alpha_t,A: A,
         # Refractory variable scales also as v
         'r': lambda alpha_t,A: A,
+        # The decays are per time step and not scaled, but their ranges are needed
+        # by `optimal_scaling_params()`
+        'delta_j': lambda alpha_t,A: 1,
+        'delta_v': lambda alpha_t,A: 1,
+        'delta_theta': lambda alpha_t,A: 1,
+        'delta_r': lambda alpha_t,A: 1,
     }
     # Variables to be MSB-aligned are defined in 'model.json'. To avoid copy-paste mistakes we 
     # define this variable at runtime using the instance from the F2F converter.
@@ -48,6 +62,11 @@ class ModelScaler:
     variables = {'v','j','theta','r'}
     const = None
     mant_exp = {'bias','w'}
+    # Worst-case input assumed by the optimal scaling: the number of input spikes per
+    # time step, each with the largest weight (see `reachable_bounds()`)
+    max_input_rate = 1
+    # Number of increments that a variable without decay may accumulate
+    undecayed_steps = 3
     
     @staticmethod
     def max_val(var_name):
@@ -58,6 +77,22 @@ class ModelScaler:
         else:
             return LOIHI2_SPECS.Max_Weights
 
+    @staticmethod
+    def aligned_max_val(var_name):
+        """
+        The largest value of a variable, accounting for the fact that some variables
+        are represented with smaller bit-ranges. Since we're interested in their true
+        value after the alignment, we account for the implied shift here.
+        """
+        max_val = ModelScaler.max_val(var_name)
+        if var_name in ModelScaler.msb_align_act:
+            max_val = max_val * 2**LOIHI2_SPECS.MSB_Alignment_Act
+        elif var_name in ModelScaler.msb_align_decay:
+            max_val = max_val * 2**LOIHI2_SPECS.MSB_Alignment_Decay
+        elif var_name in ModelScaler.msb_align_prob:
+            max_val = max_val * 2**LOIHI2_SPECS.MSB_Alignment_Prob
+        return max_val
+
     @staticmethod
     def min_scaling_params(variables):
         """
@@ -91,11 +126,14 @@ class ModelScaler:
     @staticmethod
     def optimal_scaling_params(variables):
         """
-        Since LIF neurons are static the optimal choice for the parameters
-        corresponds to the maximal range of values allowed (so increasing 
-        the scaling parameters to the largest possible)
+        The largest scaling parameters for which all values that the model can reach
+        fit into their bit-ranges on Loihi2. Instead of the fixed margins used by
+        `max_scaling_params()`, the ranges of theta, r, j and v are bounded using the
+        decay constants and the worst-case input (see `reachable_bounds()`). If the
+        ranges of the decays are not given, this falls back to `max_scaling_params()`.
         """
-        return ModelScaler.max_scaling_params(variables)
+        result = ModelScaler.batch_optimal_scaling_params(stack_variable_ranges([variables]))
+        return {name: float(value[0]) for name, value in result.items()}
     
     @staticmethod
     def max_scaling_params(variables):
@@ -105,26 +143,15 @@ class ModelScaler:
         In most cases we expect vth to be the one that defines the value of A.
         (The other parameters would have to be at least factor of 1/dt larger than vth)
         """
-        from numpy import infty
         alpha_t = 1/variables['dt'][0]
-        overall_max_A = infty
-        max_A = infty
+        overall_max_A = np.inf
+        max_A = np.inf
         for var_name, (var_min,var_max) in variables.items():
             # Avoid zero values
             if var_max == 0:
                 continue
-            max_val = ModelScaler.max_val(var_name) 
-            
-            # Account for the fact that some variables are represented with smaller bit-ranges.
-            # Since we're interested in their true value after the alignment, we account for the implied shift
-            # here.
-            if var_name in ModelScaler.msb_align_act:
-                max_val = max_val * 2**LOIHI2_SPECS.MSB_Alignment_Act
-            elif var_name in ModelScaler.msb_align_decay:
-                max_val = max_val * 2**LOIHI2_SPECS.MSB_Alignment_Decay
-            elif var_name in ModelScaler.msb_align_prob:
-                max_val = max_val * 2**LOIHI2_SPECS.MSB_Alignment_Prob
-                
+            max_val = ModelScaler.aligned_max_val(var_name)
+
             if var_name == 'v':
                 max_A = (max_val-1)/var_max
             # Here we have to account that the threshold voltage can increase
@@ -159,6 +186,169 @@ class ModelScaler:
 
         return {'alpha_t': alpha_t, 'A': overall_max_A}
 
+    @staticmethod
+    def batch_min_scaling_params(variables):
+        """
+        Vectorized version of `min_scaling_params()` for many populations at once.
 
+        Parameters
+        ----------
+        variables : dict
+            Maps the variable names to arrays of shape `(n, 2)` with the (min, max)
+            ranges of the variable in each of the `n` populations, with `(0, 0)` for
+            variables that are not defined in a population (see `_common.f2f`).
 
-    
+        Returns
+        -------
+        dict
+            The arrays `alpha_t` and `A` of shape `(n,)`. `A` is NaN for populations in
+            which all relevant minima are zero.
+        """
+        ranges = batch_ranges(variables)
+        min_alpha_t = 1/ranges['dt'][:, 0]
+        terms = [(1, ranges['v'][:, 0]), (1, ranges['theta'][:, 0]), (1, ranges['r'][:, 0]),
+                 (min_alpha_t, ranges['j'][:, 0]), (min_alpha_t, ranges['bias'][:, 0])]
+        if 'w' in ranges:
+            terms.append((min_alpha_t, ranges['w'][:, 0]))
+        return {'alpha_t': min_alpha_t, 'A': max_of_quotients(terms)}
+
+    @staticmethod
+    def has_decays(ranges):
+        """Whether the decays of j, v and theta are given, as `delta_*` or `tau_*` ranges."""
+        return all(f'delta_{var_name}' in ranges or f'tau_{var_name}' in ranges
+                   for var_name in ['j', 'v', 'theta'])
+
+    @staticmethod
+    def decay_gain(ranges, var_name):
+        """
+        The factor by which constant increments of a variable accumulate, which is
+        `1/delta` for a decay of `delta` per time step (the fixed point of
+        `x = (1-delta)*x + 1`). The smallest decay is taken from the range of
+        `delta_<var_name>` or, if that is not given, from `dt/tau_<var_name>`.
+        Without decay, `undecayed_steps` increments are allowed.
+        """
+        if f'delta_{var_name}' in ranges:
+            delta = ranges[f'delta_{var_name}'][:, 0]
+        elif f'tau_{var_name}' in ranges:
+            delta = divide_nonzero(ranges['dt'][:, 0], ranges[f'tau_{var_name}'][:, 1], 0)
+        else:
+            delta = np.zeros(len(ranges['dt']))
+        return divide_nonzero(1, np.clip(delta, 0, 1), ModelScaler.undecayed_steps)
+
+    @staticmethod
+    def reachable_bounds(variables):
+        """
+        Upper bounds of the magnitudes of the values that the ATRLIF dynamics can reach,
+        given the ranges of the parameters and initial values. Per time step:
+
+            j       <-  (1-delta_j)*j + a_in,  with |a_in| <= max_input_rate*|w|
+            v       <-  (1-delta_v)*v + dt*(j + bias)
+            theta   <-  (1-delta_theta)*(theta - theta_0) + theta_0 (+ theta_step on spikes)
+            r       <-  (1-delta_r)*r (+ 2*theta on spikes)
+
+        The bounds of j, v and theta are the fixed points of these updates for maximal
+        increments. A spike requires `v - r >= theta`, so r is at most `v - theta` before
+        and `v + theta` after a spike.
+
+        Parameters
+        ----------
+        variables : dict
+            Batched ranges (see `batch_min_scaling_params()`).
+
+        Returns
+        -------
+        dict
+            Maps the names to arrays of shape `(n,)` with the bounds.
+        """
+        ranges = batch_ranges(variables)
+        def magnitude(var_name):
+            if var_name not in ranges:
+                return np.zeros(len(ranges['dt']))
+            return np.abs(ranges[var_name]).max(axis=1)
+
+        bounds = {var_name: magnitude(var_name) for var_name in ['j', 'v', 'theta', 'r', 'theta_0', 'theta_step', 'bias', 'w']}
+        bounds['j'] = np.maximum(bounds['j'],
+                                 ModelScaler.max_input_rate*bounds['w']*ModelScaler.decay_gain(ranges, 'j'))
+        bounds['v'] = np.maximum(bounds['v'],
+                                 ranges['dt'][:, 0]*(bounds['j'] + bounds['bias'])*ModelScaler.decay_gain(ranges, 'v'))
+        bounds['theta'] = np.maximum(bounds['theta'],
+                                     bounds['theta_0'] + bounds['theta_step']*ModelScaler.decay_gain(ranges, 'theta'))
+        bounds['r'] = np.maximum(bounds['r'], bounds['v'] + bounds['theta'])
+        return bounds
+
+    @staticmethod
+    def batch_optimal_scaling_params(variables):
+        """
+        Vectorized version of `optimal_scaling_params()` for many populations at once
+        (see `batch_min_scaling_params()` for the format of `variables`).
+
+        Every bound `x` constrains the scaled value `A*x` (or `A/alpha_t*x` for j,
+        bias and w) to the bit-range of its variable. With `alpha_t = 1/dt`, these
+        constraints are linear in `A`, so the largest feasible `A` is the minimum
+        of the individual limits. Without the ranges of the decays, the bounds would
+        assume that j, v and theta accumulate only `undecayed_steps` increments, so
+        the result of `batch_max_scaling_params()` is returned instead.
+
+        Returns
+        -------
+        dict
+            The arrays `alpha_t` and `A` of shape `(n,)`.
+        """
+        ranges = batch_ranges(variables)
+        if not ModelScaler.has_decays(ranges):
+            return ModelScaler.batch_max_scaling_params(ranges)
+        alpha_t = 1/ranges['dt'][:, 0]
+        overall_max_A = np.full(alpha_t.shape, np.inf)
+        for var_name, bound in ModelScaler.reachable_bounds(ranges).items():
+            numerator = ModelScaler.aligned_max_val(var_name)-1
+            if var_name in ['j','bias','w']:
+                numerator = numerator*alpha_t
+            # Zero values are skipped
+            np.minimum(overall_max_A, divide_nonzero(numerator, bound, np.inf), out=overall_max_A)
+
+        check_feasible(overall_max_A, ModelScaler.batch_min_scaling_params(ranges)['A'])
+
+        return {'alpha_t': alpha_t, 'A': overall_max_A}
+
+    @staticmethod
+    def batch_max_scaling_params(variables):
+        """
+        Vectorized version of `max_scaling_params()` for many populations at once
+        (see `batch_min_scaling_params()` for the format of `variables`). Computes the
+        same values, but only loops over the variable names.
+
+        Returns
+        -------
+        dict
+            The arrays `alpha_t` and `A` of shape `(n,)`.
+        """
+        ranges = batch_ranges(variables)
+        alpha_t = 1/ranges['dt'][:, 0]
+        overall_max_A = np.full(alpha_t.shape, np.inf)
+        for var_name, var_range in ranges.items():
+            var_max = var_range[:, 1]
+            max_val = ModelScaler.aligned_max_val(var_name)
+            # Zero values are skipped, so the adjusted maxima are only used
+            # where the original maxima are nonzero
+            if var_name == 'v':
+                max_A = divide_nonzero(max_val-1, var_max, np.inf)
+            elif var_name == 'theta_0':
+                step = ranges['theta_step'][:, 1]
+                max_A = np.where(var_max != 0, divide_nonzero(max_val-1, np.maximum(var_max + 3*step, var_max), np.inf), np.inf)
+            elif var_name == 'r':
+                theta = ranges['theta_0'][:, 1]
+                step = ranges['theta_step'][:, 1]
+                max_A = np.where(var_max != 0, divide_nonzero(max_val-1, np.maximum(var_max + theta + 3*step, var_max), np.inf), np.inf)
+            elif var_name in ['bias','j']:
+                max_A = divide_nonzero((max_val-1)*alpha_t, var_max, np.inf)
+            # The doubled range of w allows spikes to accumulate in the current (see
+            # `max_scaling_params()`)
+            elif var_name == 'w':
+                max_A = divide_nonzero((max_val-1)*alpha_t, 2*var_max, np.inf)
+            else:
+                continue
+            np.minimum(overall_max_A, max_A, out=overall_max_A)
+
+        check_feasible(overall_max_A, ModelScaler.batch_min_scaling_params(ranges)['A'])
+
+        return {'alpha_t': alpha_t, 'A': overall_max_A}
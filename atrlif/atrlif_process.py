@@ -4,6 +4,7 @@ import typing as ty
 from lava.magma.core.process.process import AbstractProcess, LogConfig
 from lava.magma.core.process.variable import Var
 from lava.magma.core.process.ports.ports import InPort, OutPort
+from brian2lava.preset_mode.lib.model_lib._common.parameters import parameter_shape
 
 
 class ATRLIF(AbstractProcess):
@@ -54,23 +55,39 @@ class ATRLIF(AbstractProcess):
 		Initial value of the refractory dynamics
 	s : bool, list, numpy.ndarray, optional
 		Initial spiking state
-	delta_j : float, optional
+	delta_j : float, list, numpy.ndarray, optional
 		...
-	delta_v : float, optional
+	delta_v : float, list, numpy.ndarray, optional
 		...
-	delta_theta : float, optional
+	delta_theta : float, list, numpy.ndarray, optional
 		...
-	delta_r : float, optional
+	delta_r : float, list, numpy.ndarray, optional
 		...
-	theta_0 : float, optional
+	theta_0 : float, list, numpy.ndarray, optional
 		...
-	theta_step : float, optional
+	theta_step : float, list, numpy.ndarray, optional
 		...
 	bias_mant : float, list, numpy.ndarray, optional
 		Mantissa part of neuron bias.
 	bias_exp : float, list, numpy.ndarray, optional
 		Exponent part of neuron bias, if needed. Mostly for fixed point
 		implementations. Ignored for floating point implementations.
+	fused_kernel : bool, optional
+		Only for fixed-point computation. If `True` (default), all state
+		variables, the spikes and the post-spike behavior are computed chunk by
+		chunk on preallocated buffers. If `False`, the unfused reference
+		implementation is used. Both are bit-identical.
+	narrow_buffers : bool, optional
+		Only for fixed-point computation. If `True`, int32 instead of int64
+		buffers are used for the intermediate results, with bit-identical
+		results as long as the states stay within the 24-bit range. Default
+		is `False`.
+	num_threads : int, optional
+		Only for fixed-point computation in fused kernel mode. If larger than
+		1, the chunks are processed on this number of threads. The results are
+		identical to the default (single-threaded) execution.
+	chunk_size : int, optional
+		Number of neurons per chunk in fused kernel mode.
 
 	Example
 	-------
@@ -88,13 +105,13 @@ class ATRLIF(AbstractProcess):
 			theta: ty.Optional[ty.Union[float, list, np.ndarray]] = 5,
 			r: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
 			s: ty.Optional[ty.Union[bool, list, np.ndarray]] = 0,
-			delta_j: ty.Optional[float] = 0.4,
-			delta_v: ty.Optional[float] = 0.4,
-			delta_theta: ty.Optional[float] = 0.4,
-			delta_r: ty.Optional[float] = 0.2,
-			theta_0: ty.Optional[float] = 5,
+			delta_j: ty.Optional[ty.Union[float, list, np.ndarray]] = 0.4,
+			delta_v: ty.Optional[ty.Union[float, list, np.ndarray]] = 0.4,
+			delta_theta: ty.Optional[ty.Union[float, list, np.ndarray]] = 0.4,
+			delta_r: ty.Optional[ty.Union[float, list, np.ndarray]] = 0.2,
+			theta_0: ty.Optional[ty.Union[float, list, np.ndarray]] = 5,
 			#theta_0: ty.Optional[ty.Union[float, list, np.ndarray]] = 5,
-			theta_step: ty.Optional[float] = 3.75,
+			theta_step: ty.Optional[ty.Union[float, list, np.ndarray]] = 3.75,
 			bias_mant: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
 			bias_exp: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
 			name: ty.Optional[str] = None,
@@ -137,10 +154,10 @@ class ATRLIF(AbstractProcess):
 		self.s = Var(shape=shape, init=s) # TODO used at all?
 
 		# Parameters
-		self.delta_j = Var(shape=(1,), init=delta_j)
-		self.delta_v = Var(shape=(1,), init=delta_v)
-		self.delta_theta = Var(shape=(1,), init=delta_theta)
-		self.delta_r = Var(shape=(1,), init=delta_r)
-		self.theta_0 = Var(shape=(1,), init=theta_0)
-		self.theta_step = Var(shape=(1,), init=theta_step)
+		self.delta_j = Var(shape=parameter_shape(delta_j, shape), init=delta_j)
+		self.delta_v = Var(shape=parameter_shape(delta_v, shape), init=delta_v)
+		self.delta_theta = Var(shape=parameter_shape(delta_theta, shape), init=delta_theta)
+		self.delta_r = Var(shape=parameter_shape(delta_r, shape), init=delta_r)
+		self.theta_0 = Var(shape=parameter_shape(theta_0, shape), init=theta_0)
+		self.theta_step = Var(shape=parameter_shape(theta_step, shape), init=theta_step)
 
@@ -0,0 +1,62 @@
+"""
+Duration of a timestep of the fixed-point `atrlif` process model, unfused and with the
+fused chunked update (with and without narrow buffers), depending on the population size.
+
+Usage: python atrlif_benchmark.py [--num-steps T] [--num-threads K]
+"""
+import argparse
+
+import numpy as np
+
+from benchmark_utils import create_model, load_model, time_run_spk
+
+NUM_NEURONS = [10**3, 10**4, 10**5, 10**6, 4 * 10**6]
+VARIANTS = {
+    "unfused": dict(fused_kernel=False),
+    "fused": dict(),
+    "fused+narrow_buffers": dict(narrow_buffers=True),
+}
+
+
+def make_state(num_neurons: int):
+    """State with moderate decay and threshold adaptation."""
+    int_array = lambda value, dtype: np.full(num_neurons, value, dtype=dtype)
+    return {
+        "j": int_array(0, np.int32), "v": int_array(0, np.int32),
+        "theta": int_array(0, np.int32), "r": int_array(0, np.int32),
+        "s": np.zeros(num_neurons, dtype=bool),
+        "delta_j": int_array(1024, np.uint16), "delta_v": int_array(256, np.uint16),
+        "delta_theta": int_array(64, np.uint16), "delta_r": int_array(512, np.uint16),
+        "theta_0": int_array(2**10, np.uint16), "theta_step": int_array(2**8, np.uint16),
+        "bias_mant": int_array(0, np.int16), "bias_exp": int_array(0, np.int16),
+    }
+
+
+def make_inputs(num_neurons: int, rng, num_inputs: int = 20):
+    """Random synaptic inputs, which make a few percent of the neurons spike."""
+    return [rng.integers(-2**10, 2**12, num_neurons).astype(np.int32) for _ in range(num_inputs)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--num-steps", type=int, default=50)
+    parser.add_argument("--num-threads", type=int, default=1)
+    args = parser.parse_args()
+
+    model = load_model("atrlif")
+    rng = np.random.default_rng(0)
+    print(f"ms per step, {args.num_threads} thread(s)")
+    print(f"{'N':<10}" + "".join(f"{name:>22}" for name in VARIANTS))
+    for num_neurons in NUM_NEURONS:
+        inputs = make_inputs(num_neurons, rng)
+        durations = []
+        for options in VARIANTS.values():
+            # `num_threads` only applies to the fused update
+            process_model = create_model(model["PyATRLIFModelFixed"], make_state(num_neurons),
+                                         shape=(num_neurons,), num_threads=args.num_threads, **options)
+            durations.append(time_run_spk(process_model, args.num_steps, inputs))
+        print(f"{num_neurons:<10.0e}" + "".join(f"{duration:>22.2f}" for duration in durations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Helpers of the benchmark scripts. The scripts time the process models of the model
+library directly, without the Lava runtime, so that the timings are not dominated by
+the message passing between processes. This requires Lava, Brian2 and Brian2Lava to be
+installed (the process models import the shared modules from Brian2Lava's model library).
+
+The timings of two versions of the library can be compared by running a script on both
+of them (e.g., after `git checkout` of the respective commits).
+"""
+import glob
+import os
+import time
+
+import numpy as np
+from lava.magma.core.process.process import ProcessParameters
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_model(model_dir: str, directory: str = None):
+    """
+    Load the processes and process models of a model. As in Brian2Lava, the files of
+    the model directory are concatenated and executed, since the process models refer
+    to the process classes without importing them.
+
+    Parameters
+    ----------
+    model_dir : str
+        Name of the model directory (e.g. `'lif'`).
+    directory : str, optional
+        The directory that the process models take as their own, e.g. to load the
+        stimulus of `lif_predef_stim_versatile` from. By default, the model directory.
+
+    Returns
+    -------
+    dict
+        The namespace with the classes of the model.
+    """
+    path = os.path.join(REPO_DIR, model_dir)
+    files = sorted(glob.glob(os.path.join(path, "*process.py"))) + \
+        sorted(glob.glob(os.path.join(path, "*process_model.py")))
+    code = "".join("\n" + open(file).read() for file in files)
+    namespace = {"__file__": os.path.join(directory or path, "model.py"), "__name__": f"model_lib_{model_dir}"}
+    exec(compile(code, path, "exec"), namespace)
+    return namespace
+
+
+class InPort:
+    """Replaces the input port of a process model, returning the input set before
+    each timestep."""
+
+    def __init__(self, data=0):
+        self.data = data
+
+    def recv(self):
+        return self.data
+
+
+class OutPort:
+    """Replaces the output port of a process model and counts the sent spikes."""
+
+    def __init__(self):
+        self.num_spikes = 0
+
+    def send(self, data, *indices):
+        self.num_spikes += np.count_nonzero(data)
+
+
+def create_model(model_class, state: dict, **parameters):
+    """
+    Create a process model as the Lava runtime would, with the given values of its Vars
+    and with stand-ins of its ports.
+
+    Parameters
+    ----------
+    model_class : type
+        The process model class.
+    state : dict
+        The values of the Vars (arrays are copied).
+    **parameters
+        The process parameters, including `shape`.
+
+    Returns
+    -------
+    PyLoihiProcessModel
+        The process model.
+    """
+    parameters.setdefault("name", model_class.__name__)
+    model = model_class(ProcessParameters(parameters))
+    for name, value in state.items():
+        setattr(model, name, value.copy() if isinstance(value, np.ndarray) else value)
+    model.a_in = InPort()
+    model.s_out = OutPort()
+    return model
+
+
+def time_run_spk(model, num_steps: int, inputs=None):
+    """
+    Run a process model (see `create_model()`) and time its `run_spk()`.
+
+    Parameters
+    ----------
+    model : PyLoihiProcessModel
+        The process model.
+    num_steps : int
+        The number of timesteps.
+    inputs : list of numpy.ndarray, optional
+        Synaptic inputs, which are passed to the model one after the other (and
+        repeated cyclically). Setting them is not included in the timing.
+
+    Returns
+    -------
+    float
+        The mean duration of a timestep in milliseconds.
+    """
+    duration = 0.
+    for step in range(num_steps):
+        model.time_step += 1
+        if inputs is not None:
+            model.a_in.data = inputs[step % len(inputs)]
+        start = time.perf_counter()
+        model.run_spk()
+        duration += time.perf_counter() - start
+    return 1e3 * duration / num_steps
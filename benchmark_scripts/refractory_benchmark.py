@@ -0,0 +1,70 @@
+"""
+Duration of a timestep of the float and fixed-point `lif_rp_v_input` process models,
+depending on the firing rate (and thus the fraction of refractory neurons).
+
+Usage: python refractory_benchmark.py [--num-neurons N] [--num-steps T]
+"""
+import argparse
+
+import numpy as np
+
+from benchmark_utils import create_model, load_model, time_run_spk
+
+FIRING_RATES = [0, 0.002, 0.01, 0.05, 0.2]
+T_RP_STEPS = 4
+
+
+def make_state(num_neurons: int, fixed: bool):
+    """State in which the synaptic input of a timestep determines the spikes: the
+    postsynaptic potential and voltage (almost) fully take the new input."""
+    if fixed:
+        int_array = lambda value, dtype: np.full(num_neurons, value, dtype=dtype)
+        return {
+            "v_psp": int_array(0, np.int32), "v": int_array(0, np.int32),
+            "delta_psp": int_array(4095, np.uint16), "delta_v": int_array(4095, np.uint16),
+            "bias_mant": int_array(0, np.int16), "bias_exp": int_array(0, np.int16),
+            "v_th": 2**10, "v_rs": 0,
+            "t_rp_steps": T_RP_STEPS, "t_rp_steps_end": int_array(-1, np.int64),
+        }
+    return {
+        "v_psp": np.zeros(num_neurons), "v": np.zeros(num_neurons),
+        "delta_psp": np.ones(num_neurons), "delta_v": np.ones(num_neurons),
+        "bias_mant": np.zeros(num_neurons), "bias_exp": np.zeros(num_neurons),
+        "v_th": 2.**10, "v_rs": 0.,
+        "t_rp_steps": T_RP_STEPS, "t_rp_steps_end": np.full(num_neurons, -1),
+    }
+
+
+def make_inputs(num_neurons: int, firing_rate: float, fixed: bool, rng, num_inputs: int = 20):
+    """Inputs that make a random subset of `firing_rate * num_neurons` neurons spike
+    (unless they are refractory)."""
+    inputs = []
+    for _ in range(num_inputs):
+        data = np.zeros(num_neurons, dtype=np.int16 if fixed else float)
+        data[rng.choice(num_neurons, int(firing_rate * num_neurons), replace=False)] = 2**12
+        inputs.append(data)
+    return inputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--num-neurons", type=int, default=10**6)
+    parser.add_argument("--num-steps", type=int, default=200)
+    args = parser.parse_args()
+
+    model = load_model("lif_rp_v_input")
+    rng = np.random.default_rng(0)
+    print(f"N = {args.num_neurons}, t_rp_steps = {T_RP_STEPS}, ms per step")
+    print(f"{'firing rate':<14}{'float':>10}{'fixed':>10}")
+    for firing_rate in FIRING_RATES:
+        durations = []
+        for fixed, model_name in ((False, "PyLifModelFloat"), (True, "PyLifModelFixed")):
+            process_model = create_model(model[model_name], make_state(args.num_neurons, fixed),
+                                         shape=(args.num_neurons,))
+            inputs = make_inputs(args.num_neurons, firing_rate, fixed, rng)
+            durations.append(time_run_spk(process_model, args.num_steps, inputs))
+        print(f"{firing_rate:<14.1%}{durations[0]:>10.1f}{durations[1]:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Duration of reading the predefined stimulus of a timestep and of a timestep of the
+fixed-point `lif_predef_stim_versatile` process model with a memory-mapped stimulus.
+
+Usage: python stimulus_benchmark.py [--num-neurons N] [--num-steps T] [--directory DIR]
+
+The stimulus file of the full run has `N * T` float64 values (8 GB for the defaults) and
+is written to `DIR` (by default a temporary directory), in time-major layout.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmark_utils import create_model, load_model, time_run_spk
+
+
+def time_reading(num_neurons: int, num_steps: int, rng, repetitions: int = 200):
+    """Mean duration in milliseconds of copying the stimulus values of one timestep from
+    an in-memory array in neuron-major layout (strided column) and in time-major layout
+    (contiguous row)."""
+    neuron_major = rng.random((num_neurons, num_steps))
+    time_major = np.ascontiguousarray(neuron_major.T)
+    buffer = np.empty(num_neurons)
+    durations = []
+    for read in (lambda t: neuron_major[:, t], lambda t: time_major[t]):
+        start = time.perf_counter()
+        for t in rng.integers(0, num_steps, repetitions):
+            np.copyto(buffer, read(t))
+        durations.append(1e3 * (time.perf_counter() - start) / repetitions)
+    return durations
+
+
+def write_stimulus(path: str, num_neurons: int, num_steps: int, rng, block_steps: int = 500):
+    """Write a random stimulus in time-major layout, block by block."""
+    data = np.lib.format.open_memmap(path, mode="w+", dtype=float, shape=(num_steps, num_neurons))
+    for start in range(0, num_steps, block_steps):
+        stop = min(start + block_steps, num_steps)
+        data[start:stop] = rng.uniform(0, 200, (stop - start, num_neurons))
+    data.flush()
+    del data
+
+
+def make_state(num_neurons: int, sigma_bg: int):
+    return {
+        "v": np.zeros(num_neurons, dtype=np.int32),
+        "v_rs": np.zeros(num_neurons, dtype=np.int32),
+        "v_rev": 0,
+        "sigma_bg": sigma_bg,
+        "delta_v_ind": np.full(num_neurons, 400, dtype=np.uint16),
+        "bias_mant": np.zeros(num_neurons, dtype=np.int16),
+        "bias_exp": np.full(num_neurons, 6, dtype=np.int16),
+        "v_th": np.full(num_neurons, 2**16, dtype=np.int32),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--num-neurons", type=int, default=10**5)
+    parser.add_argument("--num-steps", type=int, default=10**4)
+    parser.add_argument("--num-read-steps", type=int, default=2000,
+                        help="number of timesteps of the in-memory stimulus for timing the reading")
+    parser.add_argument("--num-timed-steps", type=int, default=1000,
+                        help="number of timesteps of the full run that are timed")
+    parser.add_argument("--directory", default=None)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    strided, contiguous = time_reading(args.num_neurons, args.num_read_steps, rng)
+    print(f"N = {args.num_neurons}, reading one timestep (T = {args.num_read_steps}, in memory)")
+    print(f"  strided column: {strided:.2f} ms, contiguous row: {contiguous:.2f} ms")
+
+    with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+        write_stimulus(os.path.join(directory, "bias_for_all_times.npy"), args.num_neurons, args.num_steps, rng)
+        model = load_model("lif_predef_stim_versatile", directory=directory)
+        print(f"Fixed-point run_spk (T = {args.num_steps}, memory-mapped, time-major)")
+        for sigma_bg in (0, 10):
+            process_model = create_model(
+                model["PyLifModelFixed"], make_state(args.num_neurons, sigma_bg), shape=(args.num_neurons,),
+                stimulus_time_major=True, stimulus_mmap_mode="r", noise_seed=0
+            )
+            inputs = [np.zeros(args.num_neurons, dtype=np.int16)]
+            duration = time_run_spk(process_model, min(args.num_timed_steps, args.num_steps - 1), inputs)
+            print(f"  {'with' if sigma_bg else 'without'} noise: {duration:.2f} ms/step")
+
+
+if __name__ == "__main__":
+    main()
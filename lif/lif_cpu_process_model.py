@@ -7,6 +7,14 @@ from lava.magma.core.decorator import implements, requires, tag
 from lava.magma.core.model.py.model import PyLoihiProcessModel
 
 from brian2.utils.logger import get_logger
+from brian2lava.preset_mode.lib.model_lib._common.fixed_point import (
+    decay_round_toward_zero, saturate24, scale_bias
+)
+from brian2lava.preset_mode.lib.model_lib._common.chunked import ChunkedExecutor, DEFAULT_CHUNK_SIZE
+from brian2lava.preset_mode.lib.model_lib._common.jit import NUMBA_AVAILABLE
+from brian2lava.preset_mode.lib.model_lib._common.lif_kernels import (
+    lif_fixed_step, lif_float_step, per_neuron
+)
 
 class AbstractPyLifModelFloat(PyLoihiProcessModel):
     """Abstract implementation of floating point precision
@@ -19,13 +27,23 @@ class AbstractPyLifModelFloat(PyLoihiProcessModel):
     s_out = None  # This will be an OutPort of different LavaPyTypes
     j: np.ndarray = LavaPyType(np.ndarray, float)
     v: np.ndarray = LavaPyType(np.ndarray, float)
-    v_rs: float = LavaPyType(float, float)
+    v_rs: np.ndarray = LavaPyType(np.ndarray, float)
     bias_mant: np.ndarray = LavaPyType(np.ndarray, float)
     bias_exp: np.ndarray = LavaPyType(np.ndarray, float)
-    delta_j: float = LavaPyType(float, float)
-    delta_v: float = LavaPyType(float, float)
+    delta_j: np.ndarray = LavaPyType(np.ndarray, float)
+    delta_v: np.ndarray = LavaPyType(np.ndarray, float)
     dt: float = LavaPyType(float, float)
 
+    def __init__(self, proc_params):
+        super(AbstractPyLifModelFloat, self).__init__(proc_params)
+        # In chunked mode, the neurons are updated in contiguous chunks on a
+        # thread pool (see `ChunkedExecutor`)
+        num_threads = proc_params._parameters.get("num_threads", 1)
+        self.chunked = ChunkedExecutor(
+            proc_params._parameters["shape"], num_threads,
+            proc_params._parameters.get("chunk_size", DEFAULT_CHUNK_SIZE)
+        ) if num_threads > 1 else None
+
     def spiking_activation(self):
         """Abstract method to define the activation function that determines
         how spikes are generated.
@@ -47,7 +65,20 @@ class AbstractPyLifModelFloat(PyLoihiProcessModel):
     def reset_voltage(self, spike_vector: np.ndarray):
         """Voltage reset behaviour. This can differ for different neuron
         models."""
-        self.v[spike_vector] = self.v_rs
+        np.copyto(self.v, self.v_rs, casting='unsafe', where=spike_vector)
+
+    def update_chunk(self, neurons: slice, activation_in: np.ndarray, spikes: np.ndarray):
+        """Sub-threshold dynamics, spiking (if `v >= v_th`) and voltage reset
+        of a chunk of neurons in chunked mode. Writes the spikes of the chunk
+        to the flat array `spikes`.
+        """
+        c = self.chunked.chunk
+        j, v = c(self.j, neurons), c(self.v, neurons)
+        j[:] = j * (1 - c(self.delta_j, neurons)) + c(activation_in, neurons)
+        v[:] = v * (1 - c(self.delta_v, neurons)) + \
+               (j + c(self.bias_mant, neurons)) * c(self.dt, neurons)
+        np.greater_equal(v, c(self.v_th, neurons), out=spikes[neurons])
+        np.copyto(v, c(self.v_rs, neurons), casting='unsafe', where=spikes[neurons])
 
     def run_spk(self):
         """The run function that performs the actual computation during
@@ -57,6 +88,12 @@ class AbstractPyLifModelFloat(PyLoihiProcessModel):
         super().run_spk()
         a_in_data = self.a_in.recv()
 
+        if self.chunked is not None:
+            s_out_buff = np.empty(self.v.shape, dtype=bool)
+            self.chunked.map(self.update_chunk, a_in_data, s_out_buff.reshape(-1))
+            self.s_out.send(s_out_buff)
+            return
+
         self.subthr_dynamics(activation_in=a_in_data)
         s_out_buff = self.spiking_activation()
         self.reset_voltage(spike_vector=s_out_buff)
@@ -73,11 +110,11 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
     s_out: None  # This will be an OutPort of different LavaPyTypes
     j: np.ndarray = LavaPyType(np.ndarray, np.int32, precision=24)
     v: np.ndarray = LavaPyType(np.ndarray, np.int32, precision=24)
-    delta_j: int = LavaPyType(int, np.uint16, precision=12)
-    delta_v: int = LavaPyType(int, np.uint16, precision=12)
+    delta_j: np.ndarray = LavaPyType(np.ndarray, np.uint16, precision=12)
+    delta_v: np.ndarray = LavaPyType(np.ndarray, np.uint16, precision=12)
     bias_mant: np.ndarray = LavaPyType(np.ndarray, np.int16, precision=13)
     bias_exp: np.ndarray = LavaPyType(np.ndarray, np.int16, precision=3)
-    v_rs: int = LavaPyType(int, np.int32, precision=17)
+    v_rs: np.ndarray = LavaPyType(np.ndarray, np.int32, precision=17)
     dt: int = LavaPyType(int, np.uint16)
 
     def __init__(self, proc_params):
@@ -90,6 +127,9 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
         self.ds_offset = 1
         self.dm_offset = 0
         self.effective_bias = 0
+        # The effective bias only depends on `bias_mant` and `bias_exp`, so it is
+        # computed in the first timestep and then only after a Var update
+        self.bias_changed = True
         # Let's define some bit-widths from Loihi
         # State variables j and v are 24-bits wide
         self.jv_bitwidth = 24
@@ -98,19 +138,37 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
         # --> decay constants are accordingly prepared by Brian2Lava already
         self.decay_shift = 12
         self.decay_unity = 2**self.decay_shift
+        # In fused kernel mode, the sub-threshold dynamics are computed in place
+        # on preallocated scratch buffers, which avoids creating about a
+        # dozen temporary arrays per timestep. The unfused implementation is
+        # kept as a bit-exact reference and can be selected by passing
+        # `fused_kernel=False` to the process.
+        self.fused_kernel = proc_params._parameters.get("fused_kernel", True)
+        # With `narrow_buffers=True`, the buffers are int32 instead of int64 (see
+        # `mul_shift_toward_zero()`), which halves their memory and memory traffic
+        buf_dtype = np.int32 if proc_params._parameters.get("narrow_buffers", False) else np.int64
+        shape = proc_params._parameters["shape"]
+        self.buf_a = np.zeros(shape, dtype=buf_dtype)
+        self.buf_b = np.zeros(shape, dtype=buf_dtype)
+        # In chunked mode, the neurons are updated in contiguous chunks on a
+        # thread pool (see `ChunkedExecutor`), using the fused sub-threshold
+        # dynamics
+        num_threads = proc_params._parameters.get("num_threads", 1)
+        self.chunked = ChunkedExecutor(
+            shape, num_threads, proc_params._parameters.get("chunk_size", DEFAULT_CHUNK_SIZE)
+        ) if num_threads > 1 else None
 
     def scale_bias(self):
         """Scale bias with bias exponent by taking into account sign of the
         exponent.
         """
-        # Create local copy of bias_mant with promoted dtype to prevent
-        # overflow when applying shift of bias_exp.
-        bias_mant = self.bias_mant.copy().astype(np.int32)
-        self.effective_bias = np.where(
-            self.bias_exp >= 0,
-            np.left_shift(bias_mant, self.bias_exp),
-            np.right_shift(bias_mant, -self.bias_exp),
-        )
+        self.effective_bias = scale_bias(self.bias_mant, self.bias_exp)
+
+    def on_var_update(self):
+        """Mark the effective bias for recomputation, since `bias_mant` or
+        `bias_exp` might have been set at runtime.
+        """
+        self.bias_changed = True
 
     def reset_voltage(self):
         """Placeholder method for voltage reset."""
@@ -130,6 +188,40 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
         """Common sub-threshold dynamics of current and voltage variables for
         all LIF models. This is where the 'leaky integration' happens.
         """
+        if self.fused_kernel:
+            self.subthr_dynamics_fused(activation_in)
+        else:
+            self.subthr_dynamics_unfused(activation_in)
+
+    def subthr_dynamics_fused(self, activation_in: np.ndarray):
+        """Sub-threshold dynamics computed in place on the preallocated
+        scratch buffers. Bit-identical to `subthr_dynamics_unfused()` for
+        states within the 24-bit range.
+        """
+        buf, tmp = self.buf_a, self.buf_b
+
+        # Update current
+        # --------------
+        decay_const_j = np.clip(self.delta_j + self.ds_offset, 0, self.decay_unity)
+        decay_round_toward_zero(self.j, decay_const_j, out=buf, scratch=tmp)
+        np.add(buf, activation_in, out=buf)
+        self.j[:] = saturate24(buf, out=buf)
+
+        # Update voltage
+        # --------------
+        decay_const_v = self.delta_v + self.dm_offset
+        decay_round_toward_zero(self.v, decay_const_v, out=buf, scratch=tmp)
+        # The increase `(j + effective_bias) * dt * decay_unity` is a multiple of
+        # `decay_unity`, so shifting it back is exact and can be skipped
+        np.add(self.j, self.effective_bias, out=tmp)
+        np.multiply(tmp, self.dt, out=tmp)
+        np.add(buf, tmp, out=buf)
+        self.v[:] = saturate24(buf, out=buf)
+
+    def subthr_dynamics_unfused(self, activation_in: np.ndarray):
+        """Reference implementation of the sub-threshold dynamics, creating
+        temporary arrays for every intermediate result.
+        """
         # Update current
         # --------------
         # Compute decay constant. Left shift of `delta_j` by `log2(decay_unity)`` is
@@ -179,6 +271,29 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
         v_updated = np.int32(v_decayed + v_increase)
         self.v[:] = np.clip(v_updated, neg_jv_limit, pos_jv_limit)
 
+    def update_chunk(self, neurons: slice, activation_in: np.ndarray, spikes: np.ndarray):
+        """Sub-threshold dynamics (as in `subthr_dynamics_fused()`), spiking
+        (if `v >= v_th`) and voltage reset of a chunk of neurons in chunked
+        mode. Writes the spikes of the chunk to the flat array `spikes`.
+        """
+        c = self.chunked.chunk
+        j, v = c(self.j, neurons), c(self.v, neurons)
+        buf, tmp = c(self.buf_a, neurons), c(self.buf_b, neurons)
+
+        decay_const_j = np.clip(c(self.delta_j, neurons) + self.ds_offset, 0, self.decay_unity)
+        decay_round_toward_zero(j, decay_const_j, out=buf, scratch=tmp)
+        np.add(buf, c(activation_in, neurons), out=buf)
+        j[:] = saturate24(buf, out=buf)
+
+        decay_const_v = c(self.delta_v, neurons) + self.dm_offset
+        decay_round_toward_zero(v, decay_const_v, out=buf, scratch=tmp)
+        np.add(j, c(self.effective_bias, neurons), out=tmp)
+        np.multiply(tmp, c(self.dt, neurons), out=tmp)
+        np.add(buf, tmp, out=buf)
+        v[:] = saturate24(buf, out=buf)
+
+        np.greater_equal(v, c(self.v_th, neurons), out=spikes[neurons])
+        np.copyto(v, c(self.v_rs, neurons), casting='unsafe', where=spikes[neurons])
 
     def run_spk(self):
         """The run function that performs the actual computation during
@@ -188,8 +303,16 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
         # Receive synaptic input
         a_in_data = self.a_in.recv()
 
-        # Compute effective bias
-        self.scale_bias()
+        # Compute effective bias (if bias might have changed)
+        if self.bias_changed:
+            self.scale_bias()
+            self.bias_changed = False
+
+        if self.chunked is not None:
+            s_out_buff = np.empty(self.v.shape, dtype=bool)
+            self.chunked.map(self.update_chunk, a_in_data, s_out_buff.reshape(-1))
+            self.s_out.send(s_out_buff)
+            return
 
         # Compute subthreshold and spiking dynamics
         self.subthr_dynamics(activation_in=a_in_data)
@@ -211,7 +334,7 @@ class PyLifModelFloat(AbstractPyLifModelFloat):
     """
 
     s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, float)
-    v_th: float = LavaPyType(float, float)
+    v_th: np.ndarray = LavaPyType(np.ndarray, float)
 
     def __init__(self, proc_params):
         super(PyLifModelFloat, self).__init__(proc_params)
@@ -248,7 +371,7 @@ class PyLifModelBitAcc(AbstractPyLifModelFixed):
     """
 
     s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.int32, precision=24)
-    v_th: int = LavaPyType(int, np.int32, precision=17)
+    v_th: np.ndarray = LavaPyType(np.ndarray, np.int32, precision=17)
 
     def __init__(self, proc_params):
         super(PyLifModelBitAcc, self).__init__(proc_params)
@@ -262,4 +385,190 @@ class PyLifModelBitAcc(AbstractPyLifModelFixed):
     def reset_voltage(self, spike_vector: np.ndarray):
         """Voltage reset behavior.
         """
-        self.v[spike_vector] = self.v_rs
\ No newline at end of file
+        np.copyto(self.v, self.v_rs, casting='unsafe', where=spike_vector)
+
+
+@implements(proc=LIFPopulation, protocol=LoihiProtocol)
+@requires(CPU)
+@tag("floating_pt")
+class PyLifPopulationModelFloat(AbstractPyLifModelFloat):
+    """Implementation of a fused population of LIF groups in floating point
+    precision. The parameters are stored per neuron, such that all groups
+    are updated by the vectorized dynamics of `AbstractPyLifModelFloat`.
+    """
+
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, float)
+    delta_j: np.ndarray = LavaPyType(np.ndarray, float)
+    delta_v: np.ndarray = LavaPyType(np.ndarray, float)
+    v_th: np.ndarray = LavaPyType(np.ndarray, float)
+    v_rs: np.ndarray = LavaPyType(np.ndarray, float)
+    dt: np.ndarray = LavaPyType(np.ndarray, float)
+
+    def __init__(self, proc_params):
+        super(PyLifPopulationModelFloat, self).__init__(proc_params)
+        self.logger = get_logger('brian2.devices.lava')
+        self.logger.debug(f"Process '{proc_params._parameters['name']}' initialized with PyLifPopulationModelFloat process model")
+
+    def spiking_activation(self):
+        """Spiking activation function for LIF."""
+        return self.v >= self.v_th
+
+    def reset_voltage(self, spike_vector: np.ndarray):
+        """Reset the voltage of the spiking neurons to their reset value."""
+        self.v[spike_vector] = self.v_rs[spike_vector]
+
+
+@implements(proc=LIFPopulation, protocol=LoihiProtocol)
+@requires(CPU)
+@tag("bit_accurate_loihi", "fixed_pt")
+class PyLifPopulationModelBitAcc(AbstractPyLifModelFixed):
+    """Implementation of a fused population of LIF groups, bit-accurate with
+    `PyLifModelBitAcc` for each group. The parameters are stored per neuron,
+    such that all groups are updated by the vectorized dynamics of
+    `AbstractPyLifModelFixed`.
+    """
+
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.int32, precision=24)
+    delta_j: np.ndarray = LavaPyType(np.ndarray, np.uint16, precision=12)
+    delta_v: np.ndarray = LavaPyType(np.ndarray, np.uint16, precision=12)
+    v_th: np.ndarray = LavaPyType(np.ndarray, np.int32, precision=17)
+    v_rs: np.ndarray = LavaPyType(np.ndarray, np.int32, precision=17)
+    dt: np.ndarray = LavaPyType(np.ndarray, np.uint16)
+
+    def __init__(self, proc_params):
+        super(PyLifPopulationModelBitAcc, self).__init__(proc_params)
+        self.logger = get_logger('brian2.devices.lava')
+        self.logger.debug(f"Process '{proc_params._parameters['name']}' initialized with PyLifPopulationModelBitAcc process model")
+
+    def spiking_activation(self):
+        """Spike when voltage exceeds threshold."""
+        return self.v >= self.v_th
+
+    def reset_voltage(self, spike_vector: np.ndarray):
+        """Reset the voltage of the spiking neurons to their reset value."""
+        self.v[spike_vector] = self.v_rs[spike_vector]
+
+
+@implements(proc=LIF, protocol=LoihiProtocol)
+@tag("floating_pt_compact")
+class PyLifModelFloatCompact(PyLifModelFloat):
+    """Variant of `PyLifModelFloat` that sends the spikes as `np.uint8` instead of
+    float, which reduces the data transferred per timestep. The receiving
+    synapse process models cast the spikes to `bool` anyway.
+    """
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.uint8, precision=1)
+
+
+@implements(proc=LIF, protocol=LoihiProtocol)
+@tag("fixed_pt_compact")
+class PyLifModelBitAccCompact(PyLifModelBitAcc):
+    """Variant of `PyLifModelBitAcc` that sends the spikes as `np.uint8` instead of
+    `np.int32`, which reduces the data transferred per timestep. The receiving
+    synapse process models cast the spikes to `bool` anyway.
+    """
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.uint8, precision=1)
+
+
+@implements(proc=LIF, protocol=LoihiProtocol)
+@tag("floating_pt_jit")
+class PyLifModelFloatJit(PyLifModelFloat):
+    """Variant of `PyLifModelFloat` that computes the sub-threshold dynamics,
+    threshold and reset in one JIT-compiled loop over the neurons (see
+    `lif_float_step()`). Falls back to the NumPy implementation of
+    `PyLifModelFloat` if numba is not installed.
+    """
+
+    def __init__(self, proc_params):
+        super(PyLifModelFloatJit, self).__init__(proc_params)
+        if not NUMBA_AVAILABLE:
+            self.logger.warning(f"numba is not installed, process '{proc_params._parameters['name']}' "
+                                f"falls back to the NumPy implementation of PyLifModelFloat")
+
+    def run_spk(self):
+        """The run function that performs the actual computation during
+        execution orchestrated by a PyLoihiProcessModel using the
+        LoihiProtocol.
+        """
+        if not NUMBA_AVAILABLE:
+            super().run_spk()
+            return
+        a_in_data = self.a_in.recv()
+
+        size = self.v.size
+        s_out_buff = np.empty(self.v.shape, dtype=bool)
+        args = (self.j.reshape(-1), self.v.reshape(-1), per_neuron(a_in_data, size),
+                per_neuron(self.bias_mant, size), per_neuron(self.delta_j, size),
+                per_neuron(self.delta_v, size), per_neuron(self.dt, size),
+                per_neuron(self.v_th, size), per_neuron(self.v_rs, size),
+                s_out_buff.reshape(-1))
+        if self.chunked is not None:
+            self.chunked.map_kernel(lif_float_step, *args)
+        else:
+            lif_float_step(*args)
+        self.s_out.send(s_out_buff)
+
+
+@implements(proc=LIF, protocol=LoihiProtocol)
+@tag("fixed_pt_jit")
+class PyLifModelBitAccJit(PyLifModelBitAcc):
+    """Variant of `PyLifModelBitAcc` that computes the sub-threshold dynamics,
+    threshold and reset in one JIT-compiled loop over the neurons (see
+    `lif_fixed_step()`), bit-exact with `PyLifModelBitAcc`. Falls back to the
+    NumPy implementation of `PyLifModelBitAcc` if numba is not installed.
+    """
+
+    def __init__(self, proc_params):
+        super(PyLifModelBitAccJit, self).__init__(proc_params)
+        if not NUMBA_AVAILABLE:
+            self.logger.warning(f"numba is not installed, process '{proc_params._parameters['name']}' "
+                                f"falls back to the NumPy implementation of PyLifModelBitAcc")
+
+    def run_spk(self):
+        """The run function that performs the actual computation during
+        execution orchestrated by a PyLoihiProcessModel using the
+        LoihiProtocol.
+        """
+        if not NUMBA_AVAILABLE:
+            super().run_spk()
+            return
+        a_in_data = self.a_in.recv()
+
+        # Compute effective bias (if bias might have changed)
+        if self.bias_changed:
+            self.scale_bias()
+            self.bias_changed = False
+
+        size = self.v.size
+        s_out_buff = np.empty(self.v.shape, dtype=bool)
+        args = (self.j.reshape(-1), self.v.reshape(-1), per_neuron(a_in_data, size),
+                per_neuron(self.effective_bias, size), per_neuron(self.delta_j, size),
+                per_neuron(self.delta_v, size), per_neuron(self.dt, size),
+                per_neuron(self.v_th, size), per_neuron(self.v_rs, size),
+                self.ds_offset, self.dm_offset, s_out_buff.reshape(-1))
+        if self.chunked is not None:
+            self.chunked.map_kernel(lif_fixed_step, *args)
+        else:
+            lif_fixed_step(*args)
+        self.s_out.send(s_out_buff)
+
+
+@implements(proc=LIF, protocol=LoihiProtocol)
+@tag("floating_pt32")
+class PyLifModelFloat32(PyLifModelFloat):
+    """Variant of `PyLifModelFloat` that keeps the state, parameters and
+    spikes in single precision (`np.float32`) instead of double precision,
+    which halves the memory traffic per timestep and the size of the spike
+    messages. Scalar parameters are stored as arrays of shape `(1,)`, so
+    that they do not promote the computation to double precision.
+    """
+    a_in: PyInPort = LavaPyType(PyInPort.VEC_DENSE, np.float32)
+    j: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    v: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    v_rs: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    bias_mant: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    bias_exp: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    delta_j: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    delta_v: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    dt: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.float32)
+    v_th: np.ndarray = LavaPyType(np.ndarray, np.float32)
@@ -7,6 +7,7 @@ from lava.magma.core.process.variable import Var
 from lava.magma.core.process.ports.ports import InPort, OutPort
 from lava.magma.core.process.neuron import LearningNeuronProcess
 from brian2.utils.logger import get_logger
+from brian2lava.preset_mode.lib.model_lib._common.parameters import parameter_shape
 
 class AbstractLIF(AbstractProcess):
     """Abstract class for variables common to all neurons with leaky
@@ -18,8 +19,8 @@ class AbstractLIF(AbstractProcess):
         shape: ty.Tuple[int, ...],
         j: ty.Union[float, list, np.ndarray],
         v: ty.Union[float, list, np.ndarray],
-        delta_j: float,
-        delta_v: float,
+        delta_j: ty.Union[float, list, np.ndarray],
+        delta_v: ty.Union[float, list, np.ndarray],
         bias_mant: ty.Union[float, list, np.ndarray],
         bias_exp: ty.Union[float, list, np.ndarray],
         name: str,
@@ -45,8 +46,8 @@ class AbstractLIF(AbstractProcess):
         self.j = Var(shape=shape, init=j)
         self.v = Var(shape=shape, init=v)
         #self.bias = Var(shape=shape, init=np.int16(bias_mant * 2**bias_exp))
-        self.delta_j = Var(shape=(1,), init=delta_j)
-        self.delta_v = Var(shape=(1,), init=delta_v)
+        self.delta_j = Var(shape=parameter_shape(delta_j, shape), init=delta_j)
+        self.delta_v = Var(shape=parameter_shape(delta_v, shape), init=delta_v)
         self.bias_exp = Var(shape=shape, init=bias_exp)
         self.bias_mant = Var(shape=shape, init=bias_mant)
 
@@ -68,26 +69,42 @@ class LIF(AbstractLIF):
         Initial value of the neurons' current.
     v : float, list, numpy.ndarray, optional
         Initial value of the neurons' voltage (membrane potential).
-    delta_j : float, optional
-        Inverse of decay time constant `tau_j` for current decay. Currently, 
-        only a single decay can be set for the entire population of neurons.
-    delta_v : float, optional
-        Inverse of decay time constant `tau_v` for voltage decay. Currently, 
-        only a single decay can be set for the entire population of neurons.
+    delta_j : float, list, numpy.ndarray, optional
+        Inverse of decay time constant `tau_j` for current decay. Can be
+        specified individually for each neuron.
+    delta_v : float, list, numpy.ndarray, optional
+        Inverse of decay time constant `tau_v` for voltage decay. Can be
+        specified individually for each neuron.
     bias_mant : float, list, numpy.ndarray, optional
         Mantissa part of neuron bias.
     bias_exp : float, list, numpy.ndarray, optional
         Exponent part of neuron bias, if needed. Mostly for fixed point
         implementations. Ignored for floating point implementations.
-    v_th : float, optional
+    v_th : float, list, numpy.ndarray, optional
         Neuron threshold voltage, exceeding which, the neuron will spike.
-        Currently, only a single threshold can be set for the entire
-        population of neurons.
-    v_rs : float, optional
-        Neuron reset voltage after spike.
+        Can be specified individually for each neuron.
+    v_rs : float, list, numpy.ndarray, optional
+        Neuron reset voltage after spike. Can be specified individually
+        for each neuron.
     dt : float, optional
         Duration of one timestep. Is only used for floating-point computation
         (assuming integer value `>= 1` for fixed-point computation).
+    fused_kernel : bool, optional
+        Only for fixed-point computation. If `True` (default), the
+        sub-threshold dynamics are computed in place on preallocated buffers.
+        If `False`, the unfused reference implementation is used. Both are
+        bit-identical.
+    narrow_buffers : bool, optional
+        Only for fixed-point computation. If `True`, int32 instead of int64
+        buffers are used for the intermediate results of the sub-threshold
+        dynamics, with bit-identical results as long as the states stay
+        within the 24-bit range. Default is `False`.
+    num_threads : int, optional
+        If larger than 1, the neurons are updated in contiguous chunks on this
+        number of threads. The results are identical to the default
+        (single-threaded) execution.
+    chunk_size : int, optional
+        Number of neurons per chunk if `num_threads` is larger than 1.
 
     Example
     -------
@@ -102,12 +119,12 @@ class LIF(AbstractLIF):
         shape: ty.Tuple[int, ...],
         j: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
         v: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
-        delta_j: ty.Optional[float] = 0,
-        delta_v: ty.Optional[float] = 0,
+        delta_j: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
+        delta_v: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
         bias_mant: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
         bias_exp: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
-        v_th: ty.Optional[float] = 100,
-        v_rs: ty.Optional[float] = 0,
+        v_th: ty.Optional[ty.Union[float, list, np.ndarray]] = 100,
+        v_rs: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
         dt: ty.Optional[float] = 0,
         name: ty.Optional[str] = None,
         log_config: ty.Optional[LogConfig] = None,
@@ -124,8 +141,8 @@ class LIF(AbstractLIF):
             log_config=log_config,
             **kwargs)
         # Set threshold and reset voltage
-        self.v_th = Var(shape=(1,), init=v_th)
-        self.v_rs = Var(shape=(1,), init=v_rs)
+        self.v_th = Var(shape=parameter_shape(v_th, shape), init=v_th)
+        self.v_rs = Var(shape=parameter_shape(v_rs, shape), init=v_rs)
         self.dt = Var(shape=(1,), init=dt)
         msg_var_par = f"Initialized attributes in process '{self.name}'"
             
@@ -142,3 +159,89 @@ class LIF(AbstractLIF):
              dt = {self.dt.init}"""
         self.logger.debug(msg_var_par)
         
+
+
+class LIFPopulation(AbstractProcess):
+    """Fused population of several groups of LIF neurons, which would otherwise
+    be represented by separate `LIF` processes. The states and parameters of all
+    groups are concatenated into contiguous arrays, such that all groups are
+    updated by one vectorized call per timestep instead of one process per group.
+    The dynamics of each group are the same as for `LIF`.
+
+    The neurons of group `k` occupy the slice `group_slice(k)` of the ports and
+    Vars of the population (groups of any shape are flattened). Synaptic input
+    to the population can, for instance, be concatenated from the outputs of
+    several synapse processes via `concat_with()`. Values of the population,
+    like spikes or monitored voltages, can be split back into the groups via
+    `split_groups()`.
+
+    Parameters
+    ----------
+    groups : list(dict)
+        Parameters of the groups, each given as dictionary of the keyword
+        arguments of `LIF` (`shape`, `j`, `v`, `delta_j`, `delta_v`,
+        `bias_mant`, `bias_exp`, `v_th`, `v_rs`, `dt`). Omitted arguments
+        take the default values of `LIF`. Unlike for `LIF`, `delta_j`,
+        `delta_v`, `v_th`, `v_rs` and `dt` are stored per neuron.
+    name : str, optional
+        Name of the current process.
+    log_config : LogConfig, optional
+        Configuration options for logging.
+
+    Example
+    -------
+    >>> pop = LIFPopulation(groups=[dict(shape=(100,), delta_v=5, v_th=50),
+    ...                             dict(shape=(20, 5), delta_j=10)])
+    This will create 200 LIF neurons, of which the first 100 have a voltage
+    decay of 5 and a threshold of 50.
+    """
+
+    # Parameters of the groups and their default values (as for `LIF`)
+    group_defaults = dict(j=0, v=0, delta_j=0, delta_v=0, bias_mant=0, bias_exp=0,
+                          v_th=100, v_rs=0, dt=0)
+
+    def __init__(
+        self,
+        *,
+        groups: ty.List[dict],
+        name: ty.Optional[str] = None,
+        log_config: ty.Optional[LogConfig] = None,
+        **kwargs) -> None:
+        self.group_shapes = [tuple(np.atleast_1d(group["shape"])) for group in groups]
+        self.group_offsets = np.cumsum([0] + [int(np.prod(shape)) for shape in self.group_shapes])
+        shape = (int(self.group_offsets[-1]),)
+        values = {
+            key: np.concatenate([
+                np.broadcast_to(np.asarray(group.get(key, default), dtype=float), group_shape).ravel()
+                for group, group_shape in zip(groups, self.group_shapes)
+            ])
+            for key, default in self.group_defaults.items()
+        }
+        super().__init__(shape=shape, name=name, log_config=log_config, **kwargs)
+        self.logger = get_logger('brian2.devices.lava')
+
+        self.a_in = InPort(shape=shape)
+        self.s_out = OutPort(shape=shape)
+        for key, value in values.items():
+            setattr(self, key, Var(shape=shape, init=value))
+
+        self.logger.debug(f"Initialized attributes in process '{self.name}': "
+                          f"{len(groups)} groups with {shape[0]} neurons in total")
+
+    def group_slice(self, index: int):
+        """Slice of the neurons of group `index` within the population."""
+        return slice(self.group_offsets[index], self.group_offsets[index + 1])
+
+    def split_groups(self, values: np.ndarray):
+        """Split values of all neurons of the population (e.g., spikes) into the
+        groups, with the last axis indexing the neurons.
+
+        Returns
+        -------
+        list(numpy.ndarray)
+            The values of each group, with the last axis reshaped to the
+            shape of the group.
+        """
+        values = np.asarray(values)
+        return [values[..., self.group_slice(k)].reshape(values.shape[:-1] + shape)
+                for k, shape in enumerate(self.group_shapes)]
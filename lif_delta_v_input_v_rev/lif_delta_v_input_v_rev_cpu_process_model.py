@@ -7,6 +7,9 @@ from lava.magma.core.decorator import implements, requires, tag
 from lava.magma.core.model.py.model import PyLoihiProcessModel
 
 from brian2.utils.logger import get_logger
+from brian2lava.preset_mode.lib.model_lib._common.fixed_point import (
+    decay_round_toward_zero, mul_shift_toward_zero, saturate24, scale_bias
+)
 
 class AbstractPyLifModelFloat(PyLoihiProcessModel):
     """Abstract implementation of floating point precision Leaky-Integrate-and-Fire neuron model.
@@ -16,12 +19,12 @@ class AbstractPyLifModelFloat(PyLoihiProcessModel):
     a_in: PyInPort = LavaPyType(PyInPort.VEC_DENSE, float)
     s_out = None  # OutPort of different LavaPyTypes
     v: np.ndarray = LavaPyType(np.ndarray, float)
-    v_rs: float = LavaPyType(float, float)
+    v_rs: np.ndarray = LavaPyType(np.ndarray, float)
     v_rev: float = LavaPyType(float, float)
     bias_mant: np.ndarray = LavaPyType(np.ndarray, float)
     bias_exp: np.ndarray = LavaPyType(np.ndarray, float)
     #bias: np.ndarray = LavaPyType(np.ndarray, float) # preparation for possible readout
-    delta_v: float = LavaPyType(float, float)
+    delta_v: np.ndarray = LavaPyType(np.ndarray, float)
 
     def spiking_activation(self):
         """Abstract method to define the activation function that determines
@@ -35,14 +38,14 @@ class AbstractPyLifModelFloat(PyLoihiProcessModel):
     def subthr_dynamics(self, activation_in: np.ndarray):
         """Sub-threshold dynamics of postsynaptic potential and membrane voltage.
         """
-        self.v = (self.v + activation_in) * (1 - self.delta_v) + \
-                 (self.v_rev + self.bias_mant) * self.delta_v
+        self.v[:] = (self.v + activation_in) * (1 - self.delta_v) + \
+                    (self.v_rev + self.bias_mant) * self.delta_v
 
     def spiking_post_processing(self, spike_vector: np.ndarray):
         """Post processing after spiking; including reset of membrane voltage
         and starting of refractory period.
         """
-        self.v[spike_vector] = self.v_rs
+        np.copyto(self.v, self.v_rs, casting='unsafe', where=spike_vector)
 
     def run_spk(self):
         """The run function that performs the actual computation during
@@ -66,9 +69,9 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
     a_in: PyInPort = LavaPyType(PyInPort.VEC_DENSE, np.int16, precision=16)
     s_out: None  # OutPort of different LavaPyTypes
     v: np.ndarray = LavaPyType(np.ndarray, np.int32, precision=24)
-    v_rs: int = LavaPyType(int, np.int32, precision=17)
+    v_rs: np.ndarray = LavaPyType(np.ndarray, np.int32, precision=17)
     v_rev: int = LavaPyType(int, np.int32, precision=17)
-    delta_v: int = LavaPyType(int, np.uint16, precision=12)
+    delta_v: np.ndarray = LavaPyType(np.ndarray, np.uint16, precision=12)
     bias_mant: np.ndarray = LavaPyType(np.ndarray, np.int16, precision=13)
     bias_exp: np.ndarray = LavaPyType(np.ndarray, np.int16, precision=3)
     #bias: np.ndarray = LavaPyType(np.ndarray, np.int16, precision=16) # preparation for possible readout
@@ -83,6 +86,9 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
         self.ds_offset = 1
         self.dm_offset = 0
         self.effective_bias = 0
+        # The effective bias only depends on `bias_mant` and `bias_exp`, so it is
+        # computed in the first timestep and then only after a Var update
+        self.bias_changed = True
         # Let's define some bit-widths from Loihi
         # State variable v is 24-bits wide
         self.bitwidth = 24
@@ -91,19 +97,27 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
         # --> decay constants are accordingly prepared by Brian2Lava already
         self.decay_shift = 12
         self.decay_unity = 2**self.decay_shift
+        # Preallocated integer buffers for the fixed-point arithmetic, reused in
+        # every timestep
+        # With `narrow_buffers=True`, the buffers are int32 instead of int64 (see
+        # `mul_shift_toward_zero()`), which halves their memory and memory traffic
+        buf_dtype = np.int32 if proc_params._parameters.get("narrow_buffers", False) else np.int64
+        shape = proc_params._parameters["shape"]
+        self.buf_a = np.zeros(shape, dtype=buf_dtype)
+        self.buf_b = np.zeros(shape, dtype=buf_dtype)
+        self.buf_c = np.zeros(shape, dtype=buf_dtype)
 
     def scale_bias(self):
         """Scale bias with bias exponent by taking into account sign of the
         exponent.
         """
-        # Create local copy of bias_mant with promoted dtype to prevent
-        # overflow when applying shift of bias_exp.
-        bias_mant = self.bias_mant.copy().astype(np.int32)
-        self.effective_bias = np.where(
-            self.bias_exp >= 0,
-            np.left_shift(bias_mant, self.bias_exp),
-            np.right_shift(bias_mant, -self.bias_exp),
-        )
+        self.effective_bias = scale_bias(self.bias_mant, self.bias_exp)
+
+    def on_var_update(self):
+        """Mark the effective bias for recomputation, since `bias_mant` or
+        `bias_exp` might have been set at runtime.
+        """
+        self.bias_changed = True
 
     def scale_threshold(self):
         """Placeholder method for scaling threshold(s)."""
@@ -122,27 +136,24 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
     def subthr_dynamics(self, activation_in: np.ndarray):
         """Sub-threshold dynamics of postsynaptic potential and membrane voltage.
         """
-        neg_v_limit = -np.int32(self.max_v_val) + 1
-        pos_v_limit = np.int32(self.max_v_val) - 1
+        buf, tmp, scratch = self.buf_a, self.buf_b, self.buf_c
+
         # Update membrane voltage (much simplified compared to 'lif_rp_v_input')
         # ----------------------------------------------------------------------
         decay_const_v = self.delta_v + self.dm_offset
-        v_decayed = np.int64(self.v + activation_in) * (self.decay_unity - decay_const_v)
-        v_decayed = np.sign(v_decayed) * np.right_shift(
-        	np.abs(v_decayed), self.decay_shift
-        )
-        v_increase = np.int64(self.v_rev + self.effective_bias) * decay_const_v
-        v_increase = np.sign(v_increase) * np.right_shift(
-        	np.abs(v_increase), self.decay_shift
-        )
-        v_updated = np.int32(v_decayed + v_increase)
-        self.v = np.clip(v_updated, neg_v_limit, pos_v_limit)
+        np.add(self.v, activation_in, out=tmp)
+        decay_round_toward_zero(tmp, decay_const_v, out=buf, scratch=scratch)
+        np.add(self.effective_bias, self.v_rev, out=tmp)
+        mul_shift_toward_zero(tmp, decay_const_v, out=tmp, scratch=scratch)
+        np.add(buf, tmp, out=buf)
+        saturate24(buf, out=buf)
+        self.v[:] = buf
 
     def spiking_post_processing(self, spike_vector: np.ndarray):
         """Post processing after spiking; including reset of membrane voltage
         and starting of refractory period.
         """
-        self.v[spike_vector] = self.v_rs
+        np.copyto(self.v, self.v_rs, casting='unsafe', where=spike_vector)
 
     def run_spk(self):
         """The run function that performs the actual computation during
@@ -152,8 +163,10 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
         # Receive synaptic input
         a_in_data = self.a_in.recv()
 
-        # Compute effective bias
-        self.scale_bias()
+        # Compute effective bias (if bias might have changed)
+        if self.bias_changed:
+            self.scale_bias()
+            self.bias_changed = False
 
         # Compute subthreshold and spiking dynamics
         self.subthr_dynamics(activation_in=a_in_data)
@@ -174,7 +187,7 @@ class PyLifModelFloat(AbstractPyLifModelFloat):
     """
 
     s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, float)
-    v_th: float = LavaPyType(float, float)
+    v_th: np.ndarray = LavaPyType(np.ndarray, float)
 
     def __init__(self, proc_params):
         super(PyLifModelFloat, self).__init__(proc_params)
@@ -203,7 +216,7 @@ class PyLifModelFixed(AbstractPyLifModelFixed):
     """
 
     s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.int32, precision=24)
-    v_th: int = LavaPyType(int, np.int32, precision=17)
+    v_th: np.ndarray = LavaPyType(np.ndarray, np.int32, precision=17)
 
     def __init__(self, proc_params):
         super(PyLifModelFixed, self).__init__(proc_params)
@@ -213,3 +226,43 @@ class PyLifModelFixed(AbstractPyLifModelFixed):
     def spiking_activation(self):
         """Spike when voltage exceeds threshold."""
         return self.v > self.v_th
+
+
+@implements(proc=LIF_delta_v_input_v_rev, protocol=LoihiProtocol)
+@tag("floating_pt_compact")
+class PyLifModelFloatCompact(PyLifModelFloat):
+    """Variant of `PyLifModelFloat` that sends the spikes as `np.uint8` instead of
+    float, which reduces the data transferred per timestep. The receiving
+    synapse process models cast the spikes to `bool` anyway.
+    """
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.uint8, precision=1)
+
+
+@implements(proc=LIF_delta_v_input_v_rev, protocol=LoihiProtocol)
+@tag("fixed_pt_compact")
+class PyLifModelFixedCompact(PyLifModelFixed):
+    """Variant of `PyLifModelFixed` that sends the spikes as `np.uint8` instead of
+    `np.int32`, which reduces the data transferred per timestep. The receiving
+    synapse process models cast the spikes to `bool` anyway.
+    """
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.uint8, precision=1)
+
+
+@implements(proc=LIF_delta_v_input_v_rev, protocol=LoihiProtocol)
+@tag("floating_pt32")
+class PyLifModelFloat32(PyLifModelFloat):
+    """Variant of `PyLifModelFloat` that keeps the state, parameters and
+    spikes in single precision (`np.float32`) instead of double precision,
+    which halves the memory traffic per timestep and the size of the spike
+    messages. Scalar parameters are stored as arrays of shape `(1,)`, so
+    that they do not promote the computation to double precision.
+    """
+    a_in: PyInPort = LavaPyType(PyInPort.VEC_DENSE, np.float32)
+    v: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    v_rs: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    v_rev: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    bias_mant: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    bias_exp: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    delta_v: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.float32)
+    v_th: np.ndarray = LavaPyType(np.ndarray, np.float32)
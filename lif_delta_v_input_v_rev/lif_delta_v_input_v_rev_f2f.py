@@ -0,0 +1,8 @@
+"""
+ModelScaler for the F2F scaling of the LIF_delta_v_input_v_rev model, generated from the units
+declared in 'model.json' (see `_common/generic_f2f.py`).
+"""
+import os
+
+from brian2lava.preset_mode.lib.model_lib._common.generic_f2f import make_model_scaler
+ModelScaler = make_model_scaler(os.path.join(os.path.dirname(os.path.abspath(__file__)), "model.json"))
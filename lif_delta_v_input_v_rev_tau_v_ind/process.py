@@ -7,6 +7,7 @@ from lava.magma.core.process.variable import Var
 from lava.magma.core.process.ports.ports import InPort, OutPort
 from lava.magma.core.process.neuron import LearningNeuronProcess
 from brian2.utils.logger import get_logger
+from brian2lava.preset_mode.lib.model_lib._common.parameters import parameter_shape
 
 class AbstractLIF(AbstractProcess):
     """Abstract class for variables common to all neurons with leaky
@@ -60,22 +61,22 @@ class LIF_delta_v_input_v_rev_tau_v_ind(AbstractLIF):
     v : float, list, numpy.ndarray, optional
         Initial value of the neurons' voltage (membrane potential).
     delta_v_ind : float, optional
-        Inverse of decay time constant `tau_v` for voltage decay. Currently, 
-        only a single decay can be set for the entire population of neurons.
+        Inverse of decay time constant `tau_v` for voltage decay. Can be
+        specified individually for each neuron.
     delta_v_ind : float, optional
-        Inverse of decay time-constant for voltage decay. Currently, only a
-        single decay can be set for the entire population of neurons.
+        Inverse of decay time-constant for voltage decay. Can be specified
+        individually for each neuron.
     bias_mant : float, list, numpy.ndarray, optional
         Mantissa part of neuron bias.
     bias_exp : float, list, numpy.ndarray, optional
         Exponent part of neuron bias, if needed. Mostly for fixed point
         implementations. Ignored for floating point implementations.
-    v_th : float, optional
+    v_th : float, list, numpy.ndarray, optional
         Neuron threshold voltage, exceeding which, the neuron will spike.
-        Currently, only a single threshold can be set for the entire
-        population of neurons.
-    v_rs : float, optional
-        Neuron reset voltage after spike.
+        Can be specified individually for each neuron.
+    v_rs : float, list, numpy.ndarray, optional
+        Neuron reset voltage after spike. Can be specified individually
+        for each neuron.
     v_rev : float, optional
         Neuron reversal voltage.
 
@@ -93,8 +94,8 @@ class LIF_delta_v_input_v_rev_tau_v_ind(AbstractLIF):
         delta_v_ind: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
         bias_mant: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
         bias_exp: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
-        v_th: ty.Optional[float] = 100,
-        v_rs: ty.Optional[float] = 0,
+        v_th: ty.Optional[ty.Union[float, list, np.ndarray]] = 100,
+        v_rs: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
         v_rev: ty.Optional[float] = 0,
         #bias: ty.Optional[ty.Union[float, list, np.ndarray]] = 0, # preparation for possible readout
         name: ty.Optional[str] = None,
@@ -111,8 +112,8 @@ class LIF_delta_v_input_v_rev_tau_v_ind(AbstractLIF):
             **kwargs,
         )
         # Set threshold and reset voltage
-        self.v_th = Var(shape=(1,), init=v_th)
-        self.v_rs = Var(shape=(1,), init=v_rs)
+        self.v_th = Var(shape=parameter_shape(v_th, shape), init=v_th)
+        self.v_rs = Var(shape=parameter_shape(v_rs, shape), init=v_rs)
         self.v_rev = Var(shape=(1,), init=v_rev)
         #self.bias = Var(shape=shape, init=0)
         msg_var_par = f"Initialized attributes in process '{self.name}'"
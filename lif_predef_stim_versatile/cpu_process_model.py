@@ -8,6 +8,12 @@ from lava.magma.core.decorator import implements, requires, tag
 from lava.magma.core.model.py.model import PyLoihiProcessModel
 
 from brian2.utils.logger import get_logger
+from brian2lava.preset_mode.lib.model_lib._common.fixed_point import (
+    decay_round_toward_zero, mul_shift_toward_zero, saturate24, scale_bias
+)
+from brian2lava.preset_mode.lib.model_lib._common.chunked import ChunkedExecutor, DEFAULT_CHUNK_SIZE
+from brian2lava.preset_mode.lib.model_lib._common.noise import GaussianNoise
+from brian2lava.preset_mode.lib.model_lib._common.stimulus import PredefinedStimulus
 
 class AbstractPyLifModelFloat(PyLoihiProcessModel):
     """Abstract implementation of floating point precision Leaky-Integrate-and-Fire neuron model.
@@ -17,7 +23,7 @@ class AbstractPyLifModelFloat(PyLoihiProcessModel):
     a_in: PyInPort = LavaPyType(PyInPort.VEC_DENSE, float)
     s_out = None  # OutPort of different LavaPyTypes
     v: np.ndarray = LavaPyType(np.ndarray, float)
-    v_rs: float = LavaPyType(float, float)
+    v_rs: np.ndarray = LavaPyType(np.ndarray, float)
     v_rev: float = LavaPyType(float, float)
     sigma_bg: float = LavaPyType(float, float)
     bias_mant: np.ndarray = LavaPyType(np.ndarray, float)
@@ -25,6 +31,17 @@ class AbstractPyLifModelFloat(PyLoihiProcessModel):
     #bias: np.ndarray = LavaPyType(np.ndarray, float) # preparation for possible readout
     delta_v_ind: np.ndarray = LavaPyType(np.ndarray, float)
 
+    def __init__(self, proc_params):
+        super(AbstractPyLifModelFloat, self).__init__(proc_params)
+        # In chunked mode, the neurons are updated in contiguous chunks on a
+        # thread pool (see `ChunkedExecutor`). The background noise is still
+        # drawn for all neurons at once, so it does not change.
+        num_threads = proc_params._parameters.get("num_threads", 1)
+        self.chunked = ChunkedExecutor(
+            proc_params._parameters["shape"], num_threads,
+            proc_params._parameters.get("chunk_size", DEFAULT_CHUNK_SIZE)
+        ) if num_threads > 1 else None
+
     def spiking_activation(self):
         """Abstract method to define the activation function that determines
         how spikes are generated.
@@ -37,14 +54,26 @@ class AbstractPyLifModelFloat(PyLoihiProcessModel):
     def subthr_dynamics(self, activation_in: np.ndarray):
         """Sub-threshold dynamics of postsynaptic potential and membrane voltage.
         """
-        self.v = (self.v + activation_in) * (1 - self.delta_v_ind) + \
-                 (self.v_rev + self.bias_mant) * self.delta_v_ind
+        self.v[:] = (self.v + activation_in) * (1 - self.delta_v_ind) + \
+                    (self.v_rev + self.bias_mant) * self.delta_v_ind
 
     def spiking_post_processing(self, spike_vector: np.ndarray):
         """Post processing after spiking; including reset of membrane voltage
         and starting of refractory period.
         """
-        self.v[spike_vector] = self.v_rs
+        np.copyto(self.v, self.v_rs, casting='unsafe', where=spike_vector)
+
+    def update_chunk(self, neurons: slice, activation_in: np.ndarray, spikes: np.ndarray):
+        """Sub-threshold dynamics, spiking (if `v > v_th`) and voltage reset
+        of a chunk of neurons in chunked mode. Writes the spikes of the chunk
+        to the flat array `spikes`.
+        """
+        c = self.chunked.chunk
+        v, delta_v_ind = c(self.v, neurons), c(self.delta_v_ind, neurons)
+        v[:] = (v + c(activation_in, neurons)) * (1 - delta_v_ind) + \
+               (self.v_rev + c(self.bias_mant, neurons)) * delta_v_ind
+        np.greater(v, c(self.v_th, neurons), out=spikes[neurons])
+        np.copyto(v, c(self.v_rs, neurons), casting='unsafe', where=spikes[neurons])
 
     def run_spk(self):
         """The run function that performs the actual computation during
@@ -55,12 +84,18 @@ class AbstractPyLifModelFloat(PyLoihiProcessModel):
         a_in_data = self.a_in.recv()
 
         # Retrieve inputs for the current timestep
-        if self.time_step < self.bias_for_all_times.shape[1]:
-            self.bias_mant = self.bias_for_all_times[:, self.time_step]
+        if self.time_step < self.bias_for_all_times.num_steps:
+            np.copyto(self.bias_buffer, self.bias_for_all_times.values(self.time_step))
             # Add noise
             if self.sigma_bg > self.EPSILON:
-                rand = np.random.normal(loc=0.0, scale=1.0, size=self.proc_params._parameters["shape"],)
-                self.bias_mant += self.sigma_bg * rand
+                self.noise.add_noise(self.bias_buffer, self.sigma_bg)
+            self.bias_mant = self.bias_buffer
+
+        if self.chunked is not None:
+            s_out_buff = np.empty(self.v.shape, dtype=bool)
+            self.chunked.map(self.update_chunk, a_in_data, s_out_buff.reshape(-1))
+            self.s_out.send(s_out_buff)
+            return
 
         self.subthr_dynamics(activation_in=a_in_data)
         s_out_buff = self.spiking_activation()
@@ -76,7 +111,7 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
     a_in: PyInPort = LavaPyType(PyInPort.VEC_DENSE, np.int16, precision=16)
     s_out: None  # OutPort of different LavaPyTypes
     v: np.ndarray = LavaPyType(np.ndarray, np.int32, precision=24)
-    v_rs: int = LavaPyType(int, np.int32, precision=17)
+    v_rs: np.ndarray = LavaPyType(np.ndarray, np.int32, precision=17)
     v_rev: int = LavaPyType(int, np.int32, precision=17)
     sigma_bg: float = LavaPyType(int, np.int32, precision=17)
     delta_v_ind: np.ndarray = LavaPyType(np.ndarray, np.uint16, precision=12)
@@ -102,19 +137,28 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
         # --> decay constants are accordingly prepared by Brian2Lava already
         self.decay_shift = 12
         self.decay_unity = 2**self.decay_shift
+        # Preallocated integer buffers for the fixed-point arithmetic, reused in
+        # every timestep
+        # With `narrow_buffers=True`, the buffers are int32 instead of int64 (see
+        # `mul_shift_toward_zero()`), which halves their memory and memory traffic
+        buf_dtype = np.int32 if proc_params._parameters.get("narrow_buffers", False) else np.int64
+        shape = proc_params._parameters["shape"]
+        self.buf_a = np.zeros(shape, dtype=buf_dtype)
+        self.buf_b = np.zeros(shape, dtype=buf_dtype)
+        self.buf_c = np.zeros(shape, dtype=buf_dtype)
+        # In chunked mode, the neurons are updated in contiguous chunks on a
+        # thread pool (see `ChunkedExecutor`). The background noise is still
+        # drawn for all neurons at once, so it does not change.
+        num_threads = proc_params._parameters.get("num_threads", 1)
+        self.chunked = ChunkedExecutor(
+            shape, num_threads, proc_params._parameters.get("chunk_size", DEFAULT_CHUNK_SIZE)
+        ) if num_threads > 1 else None
 
     def scale_bias(self):
         """Scale bias with bias exponent by taking into account sign of the
         exponent.
         """
-        # Create local copy of bias_mant with promoted dtype to prevent
-        # overflow when applying shift of bias_exp.
-        bias_mant = self.bias_mant.copy().astype(np.int32)
-        self.effective_bias = np.where(
-            self.bias_exp >= 0,
-            np.left_shift(bias_mant, self.bias_exp),
-            np.right_shift(bias_mant, -self.bias_exp),
-        )
+        self.effective_bias = scale_bias(self.bias_mant, self.bias_exp)
 
     def scale_threshold(self):
         """Placeholder method for scaling threshold(s)."""
@@ -133,27 +177,45 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
     def subthr_dynamics(self, activation_in: np.ndarray):
         """Sub-threshold dynamics of postsynaptic potential and membrane voltage.
         """
-        neg_v_limit = -np.int32(self.max_v_val) + 1
-        pos_v_limit = np.int32(self.max_v_val) - 1
+        buf, tmp, scratch = self.buf_a, self.buf_b, self.buf_c
+
         # Update membrane voltage (much simplified compared to 'lif_rp_v_input')
         # ----------------------------------------------------------------------
         decay_const_v = self.delta_v_ind + self.dm_offset
-        v_decayed = np.int64(self.v + activation_in) * (self.decay_unity - decay_const_v)
-        v_decayed = np.sign(v_decayed) * np.right_shift(
-        	np.abs(v_decayed), self.decay_shift
-        )
-        v_increase = np.int64(self.v_rev + self.effective_bias) * decay_const_v
-        v_increase = np.sign(v_increase) * np.right_shift(
-        	np.abs(v_increase), self.decay_shift
-        )
-        v_updated = np.int32(v_decayed + v_increase)
-        self.v = np.clip(v_updated, neg_v_limit, pos_v_limit)
+        np.add(self.v, activation_in, out=tmp)
+        decay_round_toward_zero(tmp, decay_const_v, out=buf, scratch=scratch)
+        np.add(self.effective_bias, self.v_rev, out=tmp)
+        mul_shift_toward_zero(tmp, decay_const_v, out=tmp, scratch=scratch)
+        np.add(buf, tmp, out=buf)
+        saturate24(buf, out=buf)
+        self.v[:] = buf
 
     def spiking_post_processing(self, spike_vector: np.ndarray):
         """Post processing after spiking; including reset of membrane voltage
         and starting of refractory period.
         """
-        self.v[spike_vector] = self.v_rs
+        np.copyto(self.v, self.v_rs, casting='unsafe', where=spike_vector)
+
+    def update_chunk(self, neurons: slice, activation_in: np.ndarray, spikes: np.ndarray):
+        """Effective bias, sub-threshold dynamics, spiking (if `v > v_th`) and
+        voltage reset of a chunk of neurons in chunked mode. Writes the spikes
+        of the chunk to the flat array `spikes`.
+        """
+        c = self.chunked.chunk
+        v = c(self.v, neurons)
+        buf, tmp, scratch = c(self.buf_a, neurons), c(self.buf_b, neurons), c(self.buf_c, neurons)
+        effective_bias = scale_bias(c(self.bias_mant, neurons), c(self.bias_exp, neurons))
+
+        decay_const_v = c(self.delta_v_ind, neurons) + self.dm_offset
+        np.add(v, c(activation_in, neurons), out=tmp)
+        decay_round_toward_zero(tmp, decay_const_v, out=buf, scratch=scratch)
+        np.add(effective_bias, self.v_rev, out=tmp)
+        mul_shift_toward_zero(tmp, decay_const_v, out=tmp, scratch=scratch)
+        np.add(buf, tmp, out=buf)
+        v[:] = saturate24(buf, out=buf)
+
+        np.greater(v, c(self.v_th, neurons), out=spikes[neurons])
+        np.copyto(v, c(self.v_rs, neurons), casting='unsafe', where=spikes[neurons])
 
     def run_spk(self):
         """The run function that performs the actual computation during
@@ -164,12 +226,21 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
         a_in_data = self.a_in.recv()
 
         # Retrieve inputs for the current timestep
-        if self.time_step < self.bias_for_all_times.shape[1]:
-            self.bias_mant = self.bias_for_all_times[:, self.time_step]
+        if self.time_step < self.bias_for_all_times.num_steps:
+            np.copyto(self.bias_buffer, self.bias_for_all_times.values(self.time_step), casting='unsafe')
             # Add noise
             if self.sigma_bg > self.EPSILON:
-                rand = np.random.normal(loc=0.0, scale=1.0, size=self.proc_params._parameters["shape"],)
-                self.bias_mant += self.sigma_bg * rand
+                if self.integer_noise:
+                    self.noise.add_integer_noise(self.bias_buffer, self.sigma_bg)
+                else:
+                    self.noise.add_noise(self.bias_buffer, self.sigma_bg)
+            self.bias_mant = self.bias_buffer
+
+        if self.chunked is not None:
+            s_out_buff = np.empty(self.v.shape, dtype=bool)
+            self.chunked.map(self.update_chunk, a_in_data, s_out_buff.reshape(-1))
+            self.s_out.send(s_out_buff)
+            return
 
         # Compute effective bias
         self.scale_bias()
@@ -193,7 +264,7 @@ class PyLifModelFloat(AbstractPyLifModelFloat):
     """
 
     s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, float)
-    v_th: float = LavaPyType(float, float)
+    v_th: np.ndarray = LavaPyType(np.ndarray, float)
 
     def __init__(self, proc_params):
         super(PyLifModelFloat, self).__init__(proc_params)
@@ -203,8 +274,22 @@ class PyLifModelFloat(AbstractPyLifModelFloat):
 
         # load bias values for all times from numpy file (which should have been stored by Brian2Lava)
         script_dir = os.path.dirname(os.path.abspath(__file__))
-        self.bias_for_all_times = np.load(os.path.join(script_dir, "bias_for_all_times.npy"))
+        self.bias_for_all_times = PredefinedStimulus(
+            os.path.join(script_dir, "bias_for_all_times.npy"),
+            time_major=proc_params._parameters.get("stimulus_time_major", False),
+            mmap_mode=proc_params._parameters.get("stimulus_mmap_mode", None),
+            prefetch_steps=proc_params._parameters.get("stimulus_prefetch_steps", 0)
+        )
         self.logger.debug(f"Loaded bias values for all timesteps, shape: {self.bias_for_all_times.shape}")
+        # Preallocated buffer that holds the bias values (with noise) of the current timestep
+        self.bias_buffer = np.zeros(proc_params._parameters["shape"], dtype=float)
+
+        # Background noise, drawn by a random number generator of this process model
+        self.noise = GaussianNoise(
+            proc_params._parameters["shape"],
+            seed=proc_params._parameters.get("noise_seed", None),
+            block_steps=proc_params._parameters.get("noise_block_steps", 1)
+        )
 
         # set epsilon
         self.EPSILON = 1e-7
@@ -231,7 +316,7 @@ class PyLifModelFixed(AbstractPyLifModelFixed):
     """
 
     s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.int32, precision=24)
-    v_th: int = LavaPyType(int, np.int32, precision=17)
+    v_th: np.ndarray = LavaPyType(np.ndarray, np.int32, precision=17)
 
     def __init__(self, proc_params):
         super(PyLifModelFixed, self).__init__(proc_params)
@@ -241,8 +326,27 @@ class PyLifModelFixed(AbstractPyLifModelFixed):
 
         # load bias values for all times from numpy file (which should have been stored by Brian2Lava)
         script_dir = os.path.dirname(os.path.abspath(__file__))
-        self.bias_for_all_times = np.load(os.path.join(script_dir, "bias_for_all_times.npy"))
+        self.bias_for_all_times = PredefinedStimulus(
+            os.path.join(script_dir, "bias_for_all_times.npy"),
+            time_major=proc_params._parameters.get("stimulus_time_major", False),
+            mmap_mode=proc_params._parameters.get("stimulus_mmap_mode", None),
+            prefetch_steps=proc_params._parameters.get("stimulus_prefetch_steps", 0)
+        )
         self.logger.debug(f"Loaded bias values for all timesteps, shape: {self.bias_for_all_times.shape}")
+        # Preallocated buffer that holds the bias values (with noise) of the current timestep.
+        # With integer noise, the bias values are kept as integers (truncating the stimulus
+        # values toward zero like `scale_bias()`), and the noise is added without converting
+        # to floating point.
+        self.integer_noise = proc_params._parameters.get("integer_noise", False)
+        self.bias_buffer = np.zeros(proc_params._parameters["shape"],
+                                    dtype=np.int32 if self.integer_noise else float)
+
+        # Background noise, drawn by a random number generator of this process model
+        self.noise = GaussianNoise(
+            proc_params._parameters["shape"],
+            seed=proc_params._parameters.get("noise_seed", None),
+            block_steps=proc_params._parameters.get("noise_block_steps", 1)
+        )
 
         # set epsilon
         self.EPSILON = 1e-7
@@ -250,3 +354,50 @@ class PyLifModelFixed(AbstractPyLifModelFixed):
     def spiking_activation(self):
         """Spike when voltage exceeds threshold."""
         return self.v > self.v_th
+
+
+@implements(proc=LIF_predef_stim_versatile, protocol=LoihiProtocol)
+@tag("floating_pt_compact")
+class PyLifModelFloatCompact(PyLifModelFloat):
+    """Variant of `PyLifModelFloat` that sends the spikes as `np.uint8` instead of
+    float, which reduces the data transferred per timestep. The receiving
+    synapse process models cast the spikes to `bool` anyway.
+    """
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.uint8, precision=1)
+
+
+@implements(proc=LIF_predef_stim_versatile, protocol=LoihiProtocol)
+@tag("fixed_pt_compact")
+class PyLifModelFixedCompact(PyLifModelFixed):
+    """Variant of `PyLifModelFixed` that sends the spikes as `np.uint8` instead of
+    `np.int32`, which reduces the data transferred per timestep. The receiving
+    synapse process models cast the spikes to `bool` anyway.
+    """
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.uint8, precision=1)
+
+
+@implements(proc=LIF_predef_stim_versatile, protocol=LoihiProtocol)
+@tag("floating_pt32")
+class PyLifModelFloat32(PyLifModelFloat):
+    """Variant of `PyLifModelFloat` that keeps the state, parameters and
+    spikes in single precision (`np.float32`) instead of double precision,
+    which halves the memory traffic per timestep and the size of the spike
+    messages. Scalar parameters are stored as arrays of shape `(1,)`, so
+    that they do not promote the computation to double precision.
+    """
+    a_in: PyInPort = LavaPyType(PyInPort.VEC_DENSE, np.float32)
+    v: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    v_rs: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    v_rev: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    sigma_bg: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    bias_mant: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    bias_exp: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    delta_v_ind: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.float32)
+    v_th: np.ndarray = LavaPyType(np.ndarray, np.float32)
+
+    def __init__(self, proc_params):
+        super(PyLifModelFloat32, self).__init__(proc_params)
+        # The bias values of the current timestep (with noise) are held in
+        # single precision as well
+        self.bias_buffer = self.bias_buffer.astype(np.float32)
@@ -7,6 +7,7 @@ from lava.magma.core.process.variable import Var
 from lava.magma.core.process.ports.ports import InPort, OutPort
 from lava.magma.core.process.neuron import LearningNeuronProcess
 from brian2.utils.logger import get_logger
+from brian2lava.preset_mode.lib.model_lib._common.parameters import parameter_shape
 
 class AbstractLIF(AbstractProcess):
     """Abstract class for variables common to all neurons with leaky
@@ -60,26 +61,60 @@ class LIF_predef_stim_versatile(AbstractLIF):
     v : float, list, numpy.ndarray, optional
         Initial value of the neurons' voltage (membrane potential).
     delta_v_ind : float, optional
-        Inverse of decay time constant `tau_v` for voltage decay. Currently, 
-        only a single decay can be set for the entire population of neurons.
+        Inverse of decay time constant `tau_v` for voltage decay. Can be
+        specified individually for each neuron.
     delta_v_ind : float, optional
-        Inverse of decay time-constant for voltage decay. Currently, only a
-        single decay can be set for the entire population of neurons.
+        Inverse of decay time-constant for voltage decay. Can be specified
+        individually for each neuron.
     bias_mant : float, list, numpy.ndarray, optional
         Mantissa part of neuron bias.
     bias_exp : float, list, numpy.ndarray, optional
         Exponent part of neuron bias, if needed. Mostly for fixed point
         implementations. Ignored for floating point implementations.
-    v_th : float, optional
+    v_th : float, list, numpy.ndarray, optional
         Neuron threshold voltage, exceeding which, the neuron will spike.
-        Currently, only a single threshold can be set for the entire
-        population of neurons.
-    v_rs : float, optional
-        Neuron reset voltage after spike.
+        Can be specified individually for each neuron.
+    v_rs : float, list, numpy.ndarray, optional
+        Neuron reset voltage after spike. Can be specified individually
+        for each neuron.
     v_rev : float, optional
         Neuron reversal voltage.
     sigma_bg : float, optional
         Standard deviation of background noise.
+    stimulus_time_major : bool, optional
+        Whether the file 'bias_for_all_times.npy' holds the stimulus in time-major
+        layout (shape `(num_steps, num_neurons)`) instead of the neuron-major
+        layout written by Brian2Lava. Time-major layout allows to read the values
+        of each timestep contiguously.
+    stimulus_mmap_mode : str, optional
+        If given (e.g., 'r'), the stimulus file is memory-mapped with this mode
+        instead of being loaded into memory completely.
+    stimulus_prefetch_steps : int, optional
+        If larger than 0, the stimulus is read in blocks of this number of
+        timesteps, and the next block is read ahead in a background thread.
+    noise_seed : int, optional
+        Seed of the random number generator for the background noise. If not
+        given, fresh entropy is used.
+    noise_block_steps : int, optional
+        Number of timesteps for which the background noise is drawn at once.
+        Does not change the generated noise.
+    integer_noise : bool, optional
+        Only for fixed-point computation. If `True`, integer-valued background
+        noise (Gaussian quantiles rounded to integers, looked up from a table)
+        is added to the integer stimulus values, avoiding floating-point
+        arithmetic. Otherwise (default), floating-point noise is added before
+        the bias is truncated to integer values.
+    narrow_buffers : bool, optional
+        Only for fixed-point computation. If `True`, int32 instead of int64
+        buffers are used for the intermediate results of the sub-threshold
+        dynamics, with bit-identical results as long as the states stay
+        within the 24-bit range. Default is `False`.
+    num_threads : int, optional
+        If larger than 1, the neurons are updated in contiguous chunks on this
+        number of threads. The results are identical to the default
+        (single-threaded) execution, including the background noise.
+    chunk_size : int, optional
+        Number of neurons per chunk if `num_threads` is larger than 1.
 
     Example
     -------
@@ -95,8 +130,8 @@ class LIF_predef_stim_versatile(AbstractLIF):
         delta_v_ind: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
         bias_mant: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
         bias_exp: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
-        v_th: ty.Optional[float] = 100,
-        v_rs: ty.Optional[float] = 0,
+        v_th: ty.Optional[ty.Union[float, list, np.ndarray]] = 100,
+        v_rs: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
         v_rev: ty.Optional[float] = 0,
         sigma_bg: ty.Optional[float] = 0,
         #bias: ty.Optional[ty.Union[float, list, np.ndarray]] = 0, # preparation for possible readout
@@ -114,8 +149,8 @@ class LIF_predef_stim_versatile(AbstractLIF):
             **kwargs,
         )
         # Set threshold and reset voltage
-        self.v_th = Var(shape=(1,), init=v_th)
-        self.v_rs = Var(shape=(1,), init=v_rs)
+        self.v_th = Var(shape=parameter_shape(v_th, shape), init=v_th)
+        self.v_rs = Var(shape=parameter_shape(v_rs, shape), init=v_rs)
         self.v_rev = Var(shape=(1,), init=v_rev)
         self.sigma_bg = Var(shape=(1,), init=sigma_bg)
         #self.bias = Var(shape=shape, init=0)
@@ -7,6 +7,14 @@ from lava.magma.core.decorator import implements, requires, tag
 from lava.magma.core.model.py.model import PyLoihiProcessModel
 
 from brian2.utils.logger import get_logger
+from brian2lava.preset_mode.lib.model_lib._common.fixed_point import (
+    decay_round_toward_zero, mul_shift_toward_zero, saturate24, scale_bias
+)
+from brian2lava.preset_mode.lib.model_lib._common.refractory import RefractoryTracker
+from brian2lava.preset_mode.lib.model_lib._common.jit import NUMBA_AVAILABLE
+from brian2lava.preset_mode.lib.model_lib._common.lif_kernels import (
+    lif_rp_v_input_fixed_step, lif_rp_v_input_float_step, per_neuron
+)
 
 class AbstractPyLifModelFloat(PyLoihiProcessModel):
     """Abstract implementation of floating point precision Leaky-Integrate-and-Fire neuron model.
@@ -17,14 +25,29 @@ class AbstractPyLifModelFloat(PyLoihiProcessModel):
     s_out = None  # OutPort of different LavaPyTypes
     v_psp: np.ndarray = LavaPyType(np.ndarray, float)
     v: np.ndarray = LavaPyType(np.ndarray, float)
-    v_rs: float = LavaPyType(float, float)
+    v_rs: np.ndarray = LavaPyType(np.ndarray, float)
     t_rp_steps: int = LavaPyType(int, int)
     t_rp_steps_end: np.ndarray = LavaPyType(np.ndarray, int) # indicates until which timestep a neuron is in refractory period
     bias_mant: np.ndarray = LavaPyType(np.ndarray, float)
     bias_exp: np.ndarray = LavaPyType(np.ndarray, float)
     #bias: np.ndarray = LavaPyType(np.ndarray, float) # preparation for possible readout
-    delta_psp: float = LavaPyType(float, float)
-    delta_v: float = LavaPyType(float, float)
+    delta_psp: np.ndarray = LavaPyType(np.ndarray, float)
+    delta_v: np.ndarray = LavaPyType(np.ndarray, float)
+
+    def __init__(self, proc_params):
+        super(AbstractPyLifModelFloat, self).__init__(proc_params)
+        # Refractory neurons are tracked as a set of indices while they are few,
+        # and as a mask otherwise (see `RefractoryTracker`)
+        self.refractory = RefractoryTracker(
+            proc_params._parameters["shape"],
+            proc_params._parameters.get("refractory_sparse_fraction", 0.05)
+        )
+
+    def on_var_update(self):
+        """Redetermine the refractory neurons, since `t_rp_steps_end` might have
+        been set at runtime.
+        """
+        self.refractory.invalidate()
 
     def spiking_activation(self):
         """Abstract method to define the activation function that determines
@@ -40,16 +63,17 @@ class AbstractPyLifModelFloat(PyLoihiProcessModel):
         """
         self.v_psp[:] = self.v_psp * (1 - self.delta_psp) + activation_in
 
-        non_ref = self.t_rp_steps_end < self.time_step
-        self.v[non_ref] = self.v[non_ref] * (1 - self.delta_v) + \
-                          (self.v_psp[non_ref] + self.bias_mant[non_ref]) * self.delta_v
+        v_updated = self.v * (1 - self.delta_v) + (self.v_psp + self.bias_mant) * self.delta_v
+        # Only update non-refractory neurons
+        self.refractory.copy_non_refractory(self.v, v_updated, self.t_rp_steps_end, self.time_step)
 
     def spiking_post_processing(self, spike_vector: np.ndarray):
         """Post processing after spiking; including reset of membrane voltage
         and starting of refractory period.
         """
-        self.v[spike_vector] = self.v_rs
+        np.copyto(self.v, self.v_rs, casting='unsafe', where=spike_vector)
         self.t_rp_steps_end[spike_vector] = (self.time_step + self.t_rp_steps)
+        self.refractory.add(spike_vector)
 
     def run_spk(self):
         """The run function that performs the actual computation during
@@ -74,12 +98,12 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
     s_out: None  # OutPort of different LavaPyTypes
     v_psp: np.ndarray = LavaPyType(np.ndarray, np.int32, precision=24)
     v: np.ndarray = LavaPyType(np.ndarray, np.int32, precision=24)
-    v_rs: int = LavaPyType(int, np.int32, precision=17)
+    v_rs: np.ndarray = LavaPyType(np.ndarray, np.int32, precision=17)
     t_rp_steps: int = LavaPyType(int, int)
     t_rp_steps_end: np.ndarray = LavaPyType(np.ndarray, int) # indicates until which timestep a neuron is 
                                                              # in refractory period
-    delta_psp: int = LavaPyType(int, np.uint16, precision=12)
-    delta_v: int = LavaPyType(int, np.uint16, precision=12)
+    delta_psp: np.ndarray = LavaPyType(np.ndarray, np.uint16, precision=12)
+    delta_v: np.ndarray = LavaPyType(np.ndarray, np.uint16, precision=12)
     bias_mant: np.ndarray = LavaPyType(np.ndarray, np.int16, precision=13)
     bias_exp: np.ndarray = LavaPyType(np.ndarray, np.int16, precision=3)
     #bias: np.ndarray = LavaPyType(np.ndarray, np.int16, precision=16) # preparation for possible readout
@@ -94,6 +118,9 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
         self.ds_offset = 1
         self.dm_offset = 0
         self.effective_bias = 0
+        # The effective bias only depends on `bias_mant` and `bias_exp`, so it is
+        # computed in the first timestep and then only after a Var update
+        self.bias_changed = True
         # Let's define some bit-widths from Loihi
         # State variables v_psp and v are 24-bits wide
         self.bitwidth = 24
@@ -102,19 +129,34 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
         # --> decay constants are accordingly prepared by Brian2Lava already
         self.decay_shift = 12
         self.decay_unity = 2**self.decay_shift
+        # Preallocated integer buffers for the fixed-point arithmetic, reused in
+        # every timestep
+        # With `narrow_buffers=True`, the buffers are int32 instead of int64 (see
+        # `mul_shift_toward_zero()`), which halves their memory and memory traffic
+        buf_dtype = np.int32 if proc_params._parameters.get("narrow_buffers", False) else np.int64
+        shape = proc_params._parameters["shape"]
+        self.buf_a = np.zeros(shape, dtype=buf_dtype)
+        self.buf_b = np.zeros(shape, dtype=buf_dtype)
+        self.buf_c = np.zeros(shape, dtype=buf_dtype)
+        # Refractory neurons are tracked as a set of indices while they are few,
+        # and as a mask otherwise (see `RefractoryTracker`)
+        self.refractory = RefractoryTracker(
+            shape, proc_params._parameters.get("refractory_sparse_fraction", 0.05)
+        )
 
     def scale_bias(self):
         """Scale bias with bias exponent by taking into account sign of the
         exponent.
         """
-        # Create local copy of bias_mant with promoted dtype to prevent
-        # overflow when applying shift of bias_exp.
-        bias_mant = self.bias_mant.copy().astype(np.int32)
-        self.effective_bias = np.where(
-            self.bias_exp >= 0,
-            np.left_shift(bias_mant, self.bias_exp),
-            np.right_shift(bias_mant, -self.bias_exp),
-        )
+        self.effective_bias = scale_bias(self.bias_mant, self.bias_exp)
+
+    def on_var_update(self):
+        """Mark the effective bias for recomputation and redetermine the
+        refractory neurons, since `bias_mant`, `bias_exp` or `t_rp_steps_end`
+        might have been set at runtime.
+        """
+        self.bias_changed = True
+        self.refractory.invalidate()
 
     def scale_threshold(self):
         """Placeholder method for scaling threshold(s)."""
@@ -133,63 +175,38 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
     def subthr_dynamics(self, activation_in: np.ndarray):
         """Sub-threshold dynamics of postsynaptic potential and membrane voltage.
         """
+        buf, tmp, scratch = self.buf_a, self.buf_b, self.buf_c
+
         # Update postsynaptic potential
         # -----------------------------
         # Compute decay constant. Left shift of `delta_psp` by `log2(decay_unity)`` is
         # already done by Brian2Lava! If `ds_offset > 0`, clip to ensure that it doesn't 
         # exceed `decay_unity`.
         decay_const_psp = np.clip(self.delta_psp + self.ds_offset, 0, self.decay_unity)
-        #decay_const_psp = self.delta_psp
-        # Below, v_psp is promoted to int64 to avoid overflow of the product
-        # between v_psp and decay term beyond int32. Subsequent right shift by
-        # 12 brings us back within 24-bits (and hence, within 32-bits).
-        v_psp_decayed = np.int64(self.v_psp) * (self.decay_unity - decay_const_psp)
-        v_psp_decayed = np.sign(v_psp_decayed) * np.right_shift(
-        	np.abs(v_psp_decayed), self.decay_shift
-        )
+        decay_round_toward_zero(self.v_psp, decay_const_psp, out=buf, scratch=scratch)
         # Add synaptic input to decayed postsynaptic potential
-        v_psp_updated = np.int32(v_psp_decayed + activation_in)
-        # Check if value of postsynaptic potential is within bounds of 24-bit. Overflows are
-        # handled by wrapping around modulo 2 ** 23. E.g., (2 ** 23) + k
-        # becomes k and -(2**23 + k) becomes -k
-        #wrapped_psp = np.where(
-        #	v_psp_updated > self.max_v_val,
-        #	v_psp_updated - 2 * self.max_v_val,
-        #	v_psp_updated,
-        #)
-        #wrapped_psp = np.where(
-        #	wrapped_psp <= -self.max_v_val,
-        #	v_psp_updated + 2 * self.max_v_val,
-        #	wrapped_psp,
-        #)
-        #self.v_psp[:] = wrapped_psp
-        # --> Instead of wrapping, we better do clipping (as for voltage
-        # below)
-        neg_v_limit = -np.int32(self.max_v_val) + 1
-        pos_v_limit = np.int32(self.max_v_val) - 1
-        self.v_psp[:] = np.clip(v_psp_updated, neg_v_limit, pos_v_limit)
+        np.add(buf, activation_in, out=buf)
+        # Overflows beyond 24-bit are handled by clipping (as for voltage below)
+        self.v_psp[:] = saturate24(buf, out=buf)
         
         # Update membrane voltage (decay similar to postsynaptic potential)
         # -----------------------------------------------------------------
         decay_const_v = self.delta_v + self.dm_offset
-        v_decayed = np.int64(self.v) * (self.decay_unity - decay_const_v)
-        v_decayed = np.sign(v_decayed) * np.right_shift(
-        	np.abs(v_decayed), self.decay_shift
-        )
-        v_increase = np.int64(self.v_psp + self.effective_bias) * decay_const_v
-        v_increase = np.sign(v_increase) * np.right_shift(
-        	np.abs(v_increase), self.decay_shift
-        )
-        v_updated = np.int32(v_decayed + v_increase)
-        non_ref = self.t_rp_steps_end < self.time_step
-        self.v[non_ref] = np.clip(v_updated[non_ref], neg_v_limit, pos_v_limit)
+        decay_round_toward_zero(self.v, decay_const_v, out=buf, scratch=scratch)
+        np.add(self.v_psp, self.effective_bias, out=tmp)
+        mul_shift_toward_zero(tmp, decay_const_v, out=tmp, scratch=scratch)
+        np.add(buf, tmp, out=buf)
+        saturate24(buf, out=buf)
+        # Only update non-refractory neurons
+        self.refractory.copy_non_refractory(self.v, buf, self.t_rp_steps_end, self.time_step)
 
     def spiking_post_processing(self, spike_vector: np.ndarray):
         """Post processing after spiking; including reset of membrane voltage
         and starting of refractory period.
         """
-        self.v[spike_vector] = self.v_rs
+        np.copyto(self.v, self.v_rs, casting='unsafe', where=spike_vector)
         self.t_rp_steps_end[spike_vector] = (self.time_step + self.t_rp_steps)
+        self.refractory.add(spike_vector)
 
     def run_spk(self):
         """The run function that performs the actual computation during
@@ -199,8 +216,10 @@ class AbstractPyLifModelFixed(PyLoihiProcessModel):
         # Receive synaptic input
         a_in_data = self.a_in.recv()
 
-        # Compute effective bias
-        self.scale_bias()
+        # Compute effective bias (if bias might have changed)
+        if self.bias_changed:
+            self.scale_bias()
+            self.bias_changed = False
 
         # Compute subthreshold and spiking dynamics
         self.subthr_dynamics(activation_in=a_in_data)
@@ -221,7 +240,7 @@ class PyLifModelFloat(AbstractPyLifModelFloat):
     """
 
     s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, float)
-    v_th: float = LavaPyType(float, float)
+    v_th: np.ndarray = LavaPyType(np.ndarray, float)
 
     def __init__(self, proc_params):
         super(PyLifModelFloat, self).__init__(proc_params)
@@ -251,7 +270,7 @@ class PyLifModelFixed(AbstractPyLifModelFixed):
     """
 
     s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.int32, precision=24)
-    v_th: int = LavaPyType(int, np.int32, precision=17)
+    v_th: np.ndarray = LavaPyType(np.ndarray, np.int32, precision=17)
 
     def __init__(self, proc_params):
         super(PyLifModelFixed, self).__init__(proc_params)
@@ -261,3 +280,125 @@ class PyLifModelFixed(AbstractPyLifModelFixed):
     def spiking_activation(self):
         """Spike when voltage exceeds threshold."""
         return self.v > self.v_th
+
+
+@implements(proc=LIF_rp_v_input, protocol=LoihiProtocol)
+@tag("floating_pt_compact")
+class PyLifModelFloatCompact(PyLifModelFloat):
+    """Variant of `PyLifModelFloat` that sends the spikes as `np.uint8` instead of
+    float, which reduces the data transferred per timestep. The receiving
+    synapse process models cast the spikes to `bool` anyway.
+    """
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.uint8, precision=1)
+
+
+@implements(proc=LIF_rp_v_input, protocol=LoihiProtocol)
+@tag("fixed_pt_compact")
+class PyLifModelFixedCompact(PyLifModelFixed):
+    """Variant of `PyLifModelFixed` that sends the spikes as `np.uint8` instead of
+    `np.int32`, which reduces the data transferred per timestep. The receiving
+    synapse process models cast the spikes to `bool` anyway.
+    """
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.uint8, precision=1)
+
+
+@implements(proc=LIF_rp_v_input, protocol=LoihiProtocol)
+@tag("floating_pt_jit")
+class PyLifModelFloatJit(PyLifModelFloat):
+    """Variant of `PyLifModelFloat` that computes the sub-threshold dynamics,
+    threshold, reset and refractory period in one JIT-compiled loop over the
+    neurons (see `lif_rp_v_input_float_step()`). Falls back to the NumPy
+    implementation of `PyLifModelFloat` if numba is not installed.
+    """
+
+    def __init__(self, proc_params):
+        super(PyLifModelFloatJit, self).__init__(proc_params)
+        if not NUMBA_AVAILABLE:
+            self.logger.warning(f"numba is not installed, process '{proc_params._parameters['name']}' "
+                                f"falls back to the NumPy implementation of PyLifModelFloat")
+
+    def run_spk(self):
+        """The run function that performs the actual computation during
+        execution orchestrated by a PyLoihiProcessModel using the
+        LoihiProtocol.
+        """
+        if not NUMBA_AVAILABLE:
+            super().run_spk()
+            return
+        a_in_data = self.a_in.recv()
+
+        # The refractory neurons are determined from `t_rp_steps_end` in the
+        # kernel, so `self.refractory` is not used
+        size = self.v.size
+        s_out_buff = np.empty(self.v.shape, dtype=bool)
+        lif_rp_v_input_float_step(self.v_psp.reshape(-1), self.v.reshape(-1), self.t_rp_steps_end.reshape(-1),
+                                  per_neuron(a_in_data, size), per_neuron(self.bias_mant, size),
+                                  per_neuron(self.delta_psp, size), per_neuron(self.delta_v, size),
+                                  per_neuron(self.v_th, size), per_neuron(self.v_rs, size),
+                                  self.time_step, self.t_rp_steps, s_out_buff.reshape(-1))
+        self.s_out.send(s_out_buff)
+
+
+@implements(proc=LIF_rp_v_input, protocol=LoihiProtocol)
+@tag("fixed_pt_jit")
+class PyLifModelFixedJit(PyLifModelFixed):
+    """Variant of `PyLifModelFixed` that computes the sub-threshold dynamics,
+    threshold, reset and refractory period in one JIT-compiled loop over the
+    neurons (see `lif_rp_v_input_fixed_step()`), bit-exact with
+    `PyLifModelFixed`. Falls back to the NumPy implementation of
+    `PyLifModelFixed` if numba is not installed.
+    """
+
+    def __init__(self, proc_params):
+        super(PyLifModelFixedJit, self).__init__(proc_params)
+        if not NUMBA_AVAILABLE:
+            self.logger.warning(f"numba is not installed, process '{proc_params._parameters['name']}' "
+                                f"falls back to the NumPy implementation of PyLifModelFixed")
+
+    def run_spk(self):
+        """The run function that performs the actual computation during
+        execution orchestrated by a PyLoihiProcessModel using the
+        LoihiProtocol.
+        """
+        if not NUMBA_AVAILABLE:
+            super().run_spk()
+            return
+        a_in_data = self.a_in.recv()
+
+        # Compute effective bias (if bias might have changed)
+        if self.bias_changed:
+            self.scale_bias()
+            self.bias_changed = False
+
+        # The refractory neurons are determined from `t_rp_steps_end` in the
+        # kernel, so `self.refractory` is not used
+        size = self.v.size
+        s_out_buff = np.empty(self.v.shape, dtype=bool)
+        lif_rp_v_input_fixed_step(self.v_psp.reshape(-1), self.v.reshape(-1), self.t_rp_steps_end.reshape(-1),
+                                  per_neuron(a_in_data, size), per_neuron(self.effective_bias, size),
+                                  per_neuron(self.delta_psp, size), per_neuron(self.delta_v, size),
+                                  per_neuron(self.v_th, size), per_neuron(self.v_rs, size),
+                                  self.ds_offset, self.dm_offset, self.time_step, self.t_rp_steps,
+                                  s_out_buff.reshape(-1))
+        self.s_out.send(s_out_buff)
+
+
+@implements(proc=LIF_rp_v_input, protocol=LoihiProtocol)
+@tag("floating_pt32")
+class PyLifModelFloat32(PyLifModelFloat):
+    """Variant of `PyLifModelFloat` that keeps the state, parameters and
+    spikes in single precision (`np.float32`) instead of double precision,
+    which halves the memory traffic per timestep and the size of the spike
+    messages. Scalar parameters are stored as arrays of shape `(1,)`, so
+    that they do not promote the computation to double precision.
+    """
+    a_in: PyInPort = LavaPyType(PyInPort.VEC_DENSE, np.float32)
+    v_psp: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    v: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    v_rs: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    bias_mant: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    bias_exp: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    delta_psp: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    delta_v: np.ndarray = LavaPyType(np.ndarray, np.float32)
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, np.float32)
+    v_th: np.ndarray = LavaPyType(np.ndarray, np.float32)
@@ -19,7 +19,14 @@ for F2F conversion of the LIF model. A more meaningful table of the forward scal
 
 Note: All the lambda functions must have the same number of arguments (all the parameters required in the scaling)
 """
+import numpy as np
+
 from brian2lava.utils.const import LOIHI2_SPECS
+from brian2lava.preset_mode.lib.model_lib._common.f2f import (
+    batch_ranges, divide_nonzero, max_of_quotients, check_feasible
+)
+from brian2lava.preset_mode.lib.model_lib._common.f2f_cache import memoize_scaling_params
+@memoize_scaling_params
 class ModelScaler:
     process_class = 'LIF_rp_v_input'
     forward_ops = {
@@ -51,6 +58,22 @@ class ModelScaler:
         else:
             return LOIHI2_SPECS.Max_Weights
 
+    @staticmethod
+    def aligned_max_val(var_name):
+        """
+        The largest value of a variable, accounting for the fact that some variables
+        are represented with smaller bit-ranges. Since we're interested in their true
+        value after the alignment, we account for the implied shift here.
+        """
+        max_val = ModelScaler.max_val(var_name)
+        if var_name in ModelScaler.msb_align_act:
+            max_val = max_val * 2**LOIHI2_SPECS.MSB_Alignment_Act
+        elif var_name in ModelScaler.msb_align_decay:
+            max_val = max_val * 2**LOIHI2_SPECS.MSB_Alignment_Decay
+        elif var_name in ModelScaler.msb_align_prob:
+            max_val = max_val * 2**LOIHI2_SPECS.MSB_Alignment_Prob
+        return max_val
+
     @staticmethod
     def min_scaling_params(variables):
         """
@@ -93,25 +116,14 @@ class ModelScaler:
         In most cases we expect vth to be the one that defines the value of A.
         (The other parameters would have to be at least factor of 1/dt larger than vth)
         """
-        from numpy import infty
         alpha_t = 1/variables['dt'][0]
-        overall_max_A, max_A = infty, infty
+        overall_max_A, max_A = np.inf, np.inf
         for var_name, (var_min,var_max) in variables.items():
             # Avoid zero values
             if var_max == 0:
                 continue
-            max_val = ModelScaler.max_val(var_name) 
-            
-            # Account for the fact that some variables are represented with smaller bit-ranges.
-            # Since we're interested in their true value after the alignment, we account for the implied shift
-            # here.
-            if var_name in ModelScaler.msb_align_act:
-                max_val = max_val * 2**LOIHI2_SPECS.MSB_Alignment_Act
-            elif var_name in ModelScaler.msb_align_decay:
-                max_val = max_val * 2**LOIHI2_SPECS.MSB_Alignment_Decay
-            elif var_name in ModelScaler.msb_align_prob:
-                max_val = max_val * 2**LOIHI2_SPECS.MSB_Alignment_Prob
-                
+            max_val = ModelScaler.aligned_max_val(var_name)
+
             if var_name in ['v','v_th','v_rs']:
                 max_A = (max_val-1)/var_max
             elif var_name in ['v_psp','bias']:
@@ -125,6 +137,65 @@ class ModelScaler:
 
         return {'alpha_t': alpha_t, 'A': overall_max_A}
 
+    @staticmethod
+    def batch_min_scaling_params(variables):
+        """
+        Vectorized version of `min_scaling_params()` for many populations at once.
 
+        Parameters
+        ----------
+        variables : dict
+            Maps the variable names to arrays of shape `(n, 2)` with the (min, max)
+            ranges of the variable in each of the `n` populations, with `(0, 0)` for
+            variables that are not defined in a population (see `_common.f2f`).
 
-    
+        Returns
+        -------
+        dict
+            The arrays `alpha_t` and `A` of shape `(n,)`. `A` is NaN for populations in
+            which all relevant minima are zero.
+        """
+        ranges = batch_ranges(variables)
+        min_alpha_t = 1/ranges['dt'][:, 0]
+        terms = [(1, ranges['v'][:, 0]), (min_alpha_t, ranges['v_psp'][:, 0]), (min_alpha_t, ranges['bias'][:, 0])]
+        if 'w' in ranges:
+            terms.append((min_alpha_t, ranges['w'][:, 0]))
+        return {'alpha_t': min_alpha_t, 'A': max_of_quotients(terms)}
+
+    @staticmethod
+    def batch_optimal_scaling_params(variables):
+        """
+        Vectorized version of `optimal_scaling_params()` for many populations at once
+        (see `batch_min_scaling_params()` for the format of `variables`).
+        """
+        return ModelScaler.batch_max_scaling_params(variables)
+
+    @staticmethod
+    def batch_max_scaling_params(variables):
+        """
+        Vectorized version of `max_scaling_params()` for many populations at once
+        (see `batch_min_scaling_params()` for the format of `variables`). Computes the
+        same values, but only loops over the variable names.
+
+        Returns
+        -------
+        dict
+            The arrays `alpha_t` and `A` of shape `(n,)`.
+        """
+        ranges = batch_ranges(variables)
+        alpha_t = 1/ranges['dt'][:, 0]
+        overall_max_A = np.full(alpha_t.shape, np.inf)
+        for var_name, var_range in ranges.items():
+            max_val = ModelScaler.aligned_max_val(var_name)
+            if var_name in ['v','v_th','v_rs']:
+                numerator = max_val-1
+            elif var_name in ['v_psp','bias','w']:
+                numerator = (max_val-1)*alpha_t
+            else:
+                continue
+            # Zero values are skipped
+            np.minimum(overall_max_A, divide_nonzero(numerator, var_range[:, 1], np.inf), out=overall_max_A)
+
+        check_feasible(overall_max_A, ModelScaler.batch_min_scaling_params(ranges)['A'])
+
+        return {'alpha_t': alpha_t, 'A': overall_max_A}
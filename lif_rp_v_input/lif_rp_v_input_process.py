@@ -7,6 +7,7 @@ from lava.magma.core.process.variable import Var
 from lava.magma.core.process.ports.ports import InPort, OutPort
 from lava.magma.core.process.neuron import LearningNeuronProcess
 from brian2.utils.logger import get_logger
+from brian2lava.preset_mode.lib.model_lib._common.parameters import parameter_shape
 
 class AbstractLIF(AbstractProcess):
     """Abstract class for variables common to all neurons with leaky
@@ -18,8 +19,8 @@ class AbstractLIF(AbstractProcess):
         shape: ty.Tuple[int, ...],
         v_psp: ty.Union[float, list, np.ndarray],
         v: ty.Union[float, list, np.ndarray],
-        delta_psp: float,
-        delta_v: float,
+        delta_psp: ty.Union[float, list, np.ndarray],
+        delta_v: ty.Union[float, list, np.ndarray],
         bias_mant: ty.Union[float, list, np.ndarray],
         bias_exp: ty.Union[float, list, np.ndarray],
         name: str,
@@ -44,8 +45,8 @@ class AbstractLIF(AbstractProcess):
         self.s_out = OutPort(shape=shape)
         self.v_psp = Var(shape=shape, init=v_psp)
         self.v = Var(shape=shape, init=v)
-        self.delta_psp = Var(shape=(1,), init=delta_psp)
-        self.delta_v = Var(shape=(1,), init=delta_v)
+        self.delta_psp = Var(shape=parameter_shape(delta_psp, shape), init=delta_psp)
+        self.delta_v = Var(shape=parameter_shape(delta_v, shape), init=delta_v)
         self.bias_exp = Var(shape=shape, init=bias_exp)
         self.bias_mant = Var(shape=shape, init=bias_mant)
 
@@ -68,29 +69,33 @@ class LIF_rp_v_input(AbstractLIF):
         Initial value of the sum of postsynaptic potentials.
     v : float, list, numpy.ndarray, optional
         Initial value of the neurons' voltage (membrane potential).
-    delta_v : float, optional
-        Inverse of decay time constant `tau_v` for voltage decay. Currently, 
-        only a single decay can be set for the entire population of neurons.
-    delta_psp : float, optional
-        Inverse of decay time constant `tau_psp` for postsynaptic potential decay.
-        Currently, only a single decay can be set for the entire population of 
-        neurons.
-    delta_v : float, optional
-        Inverse of decay time-constant for voltage decay. Currently, only a
-        single decay can be set for the entire population of neurons.
+    delta_v : float, list, numpy.ndarray, optional
+        Inverse of decay time constant `tau_v` for voltage decay. Can be
+        specified individually for each neuron.
+    delta_psp : float, list, numpy.ndarray, optional
+        Inverse of decay time constant `tau_psp` for postsynaptic potential
+        decay. Can be specified individually for each neuron.
+    delta_v : float, list, numpy.ndarray, optional
+        Inverse of decay time-constant for voltage decay. Can be specified
+        individually for each neuron.
     bias_mant : float, list, numpy.ndarray, optional
         Mantissa part of neuron bias.
     bias_exp : float, list, numpy.ndarray, optional
         Exponent part of neuron bias, if needed. Mostly for fixed point
         implementations. Ignored for floating point implementations.
-    v_th : float, optional
+    v_th : float, list, numpy.ndarray, optional
         Neuron threshold voltage, exceeding which, the neuron will spike.
-        Currently, only a single threshold can be set for the entire
-        population of neurons.
-    v_rs : float, optional
-        Neuron reset voltage after spike.
+        Can be specified individually for each neuron.
+    v_rs : float, list, numpy.ndarray, optional
+        Neuron reset voltage after spike. Can be specified individually
+        for each neuron.
     t_rp_steps : int, optional
         The duration of the refractory period in timesteps.
+    refractory_sparse_fraction : float, optional
+        Fraction of refractory neurons up to which the process model tracks
+        them as a set of indices and updates the voltage densely (default:
+        0.05). Above it, the voltage is updated under a mask. Both strategies
+        yield the same results.
 
     Example
     -------
@@ -105,12 +110,12 @@ class LIF_rp_v_input(AbstractLIF):
         shape: ty.Tuple[int, ...],
         v_psp: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
         v: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
-        delta_psp: ty.Optional[float] = 0,
-        delta_v: ty.Optional[float] = 0,
+        delta_psp: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
+        delta_v: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
         bias_mant: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
         bias_exp: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
-        v_th: ty.Optional[float] = 100,
-        v_rs: ty.Optional[float] = 0,
+        v_th: ty.Optional[ty.Union[float, list, np.ndarray]] = 100,
+        v_rs: ty.Optional[ty.Union[float, list, np.ndarray]] = 0,
         t_rp_steps: ty.Optional[int] = 1,
         t_rp_steps_end: ty.Optional[ty.Union[int, list, np.ndarray]] = -1,
         #bias: ty.Optional[ty.Union[float, list, np.ndarray]] = 0, # preparation for possible readout
@@ -130,8 +135,8 @@ class LIF_rp_v_input(AbstractLIF):
             **kwargs,
         )
         # Set threshold and reset voltage
-        self.v_th = Var(shape=(1,), init=v_th)
-        self.v_rs = Var(shape=(1,), init=v_rs)
+        self.v_th = Var(shape=parameter_shape(v_th, shape), init=v_th)
+        self.v_rs = Var(shape=parameter_shape(v_rs, shape), init=v_rs)
         self.t_rp_steps = Var(shape=(1,), init=t_rp_steps)
         self.t_rp_steps_end = Var(shape=shape, init=t_rp_steps_end)
         #self.bias = Var(shape=shape, init=0)
@@ -1,6 +1,5 @@
 import numpy as np
 import typing as ty
-from datetime import datetime
 from brian2.utils.logger import get_logger
 from lava.magma.core.sync.protocols.loihi_protocol import LoihiProtocol
 from lava.magma.core.model.py.ports import PyOutPort
@@ -9,67 +8,196 @@ from lava.magma.core.resources import CPU
 from lava.magma.core.decorator import implements, requires, tag
 from lava.magma.core.model.py.model import PyLoihiProcessModel
 
-@implements(proc=ProbSpiker, protocol=LoihiProtocol)
-@requires(CPU)
-@tag("floating_pt")
-class PyProbSpikerModelFloat(PyLoihiProcessModel):
-    """Implementation of floating-point precision
-    probabilistic spiker model.
+from brian2lava.preset_mode.lib.model_lib._common.random import CounterBasedRandom, bernoulli_indices
+from brian2lava.preset_mode.lib.model_lib._common.chunked import ChunkedExecutor, DEFAULT_CHUNK_SIZE
+
+class AbstractPyProbSpikerModel(PyLoihiProcessModel):
+    """Abstract implementation of the probabilistic spiker model. The
+    floating-point and fixed-point variants only differ in the kind of random
+    numbers they draw.
+
+    Specific implementations inherit from here.
     """
     shape: np.ndarray = LavaPyType(np.ndarray, int)
-    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, int)
-    rnd: np.ndarray = LavaPyType(np.ndarray, float)
-    p_spike: np.ndarray = LavaPyType(np.ndarray, float)
+    s_out = None  # This will be an OutPort of different LavaPyTypes
+    # Whether the output port is sparse (i.e., sends values and indices)
+    sparse_output = False
 
     def __init__(self, proc_params):
-        super(PyProbSpikerModelFloat, self).__init__(proc_params)
+        super(AbstractPyProbSpikerModel, self).__init__(proc_params)
         self.logger = get_logger('brian2.devices.lava')
-        self.logger.debug(f"Process '{proc_params._parameters['name']}' initialized with PyProbSpikerModelFloat process model")
+        self.logger.debug(f"Process '{proc_params._parameters['name']}' initialized with {type(self).__name__} process model")
+
+        # Counter-based random number generation, owned by this process model (the
+        # numbers are reproducible given `seed`, and independent of how a population
+        # is split across processes, see `CounterBasedRandom`)
+        seed = proc_params._parameters.get("seed", None)
+        stream = proc_params._parameters.get("rng_stream", None) or proc_params._parameters["name"]
+        if seed is not None and stream is None:
+            # Unnamed processes with the same seed would draw identical numbers
+            raise ValueError(f"{type(self).__name__} requires `rng_stream` or a process name "
+                             f"if `seed` is given.")
+        self.random = CounterBasedRandom(
+            proc_params._parameters["shape"],
+            seed=seed,
+            stream=stream,
+            neuron_offset=proc_params._parameters.get("neuron_offset", 0)
+        )
+
+        # In block mode, the random numbers are drawn for `block_steps` timesteps at once
+        # (which yields the same numbers as drawing them one timestep after the other)
+        self.block_steps = proc_params._parameters.get("block_steps", 1)
+        self.rnd_block = None
+        self.block_start = 0
+
+        # In sparse sampling mode, only the indices of the spiking neurons are sampled
+        # (unless `rnd` is monitored, which requires a random number for every neuron)
+        self.sparse_sampling = proc_params._parameters.get("sparse_sampling", False)
+        self.spike_indices = None
+
+        # In chunked mode, the random numbers are drawn for contiguous chunks of neurons
+        # on a thread pool (which yields the same numbers, see `ChunkedExecutor`)
+        num_threads = proc_params._parameters.get("num_threads", 1)
+        self.chunked = ChunkedExecutor(
+            proc_params._parameters["shape"], num_threads,
+            proc_params._parameters.get("chunk_size", DEFAULT_CHUNK_SIZE)
+        ) if num_threads > 1 else None
+
+    def draw_random_block(self, neurons: slice = None):
+        """Placeholder method for drawing the random numbers of `block_steps` timesteps,
+        starting at the current one (for all neurons or a chunk of neurons)."""
+        raise NotImplementedError(
+            "draw_random_block() cannot be called from "
+            "an abstract ProcessModel"
+        )
+
+    def draw_random_numbers(self):
+        """Draw the random numbers for the current timestep."""
+        k = self.time_step - self.block_start
+        if self.rnd_block is None or not 0 <= k < len(self.rnd_block):
+            if self.chunked is None:
+                self.rnd_block = self.draw_random_block()
+            else:
+                self.rnd_block = np.empty((self.block_steps,) + self.random.shape, dtype=self.rnd_dtype)
+                self.chunked.map(self.draw_random_chunk)
+            self.block_start = self.time_step
+            k = 0
+        return self.rnd_block[k]
 
-        # Use system time to seed the random number generation
-        # TODO The numpy method shall eventually be replaced by a more suitable one
-        np.random.seed(int(datetime.now().timestamp()*1e6) % 2**32)
+    def draw_random_chunk(self, neurons: slice):
+        """Draw the random numbers of a chunk of neurons (in chunked mode)."""
+        rnd_block = self.rnd_block.reshape(self.block_steps, -1)
+        rnd_block[:, neurons] = self.draw_random_block(neurons)
+
+    def rnd_monitored(self):
+        """Whether the variable `rnd` is read by a monitor (via a RefPort)."""
+        return any(var_port.var_name == "rnd" for var_port in self.var_ports)
+
+    def sparse_spiking_activation(self):
+        """Spiking activation function in sparse sampling mode. Samples the indices of
+        the spiking neurons without drawing a random number for every neuron.
+        """
+        spike_indices = bernoulli_indices(self.random.generator(self.time_step), self.p_spike, self.random_unity)
+        self.spike_indices = spike_indices
+        spikes = np.zeros(self.random.shape, dtype=bool)
+        spikes.flat[spike_indices] = True
+        return spikes
 
     def spiking_activation(self):
         """Spiking activation function."""
-        self.rnd = np.random.rand(self.shape[0])
+        if self.sparse_sampling and not self.rnd_monitored():
+            return self.sparse_spiking_activation()
+        self.spike_indices = None
+        self.rnd = self.draw_random_numbers()
         return self.rnd < self.p_spike
 
+    def send_spikes(self, spike_vector: np.ndarray):
+        """Send the spikes via the output port. A sparse output port gets the values
+        and (flat) indices of the spiking neurons.
+        """
+        if not self.sparse_output:
+            self.s_out.send(spike_vector)
+            return
+        if self.spike_indices is not None:
+            spike_indices = self.spike_indices
+        else:
+            spike_indices = np.flatnonzero(spike_vector)
+        self.s_out.send(np.ones(spike_indices.size, dtype=int), spike_indices)
+
     def run_spk(self):
         """The run function that performs the actual computation."""
-        self.s_out.send(self.spiking_activation())
+        self.send_spikes(self.spiking_activation())
 
-@implements(proc=ProbSpiker, protocol=LoihiProtocol)
-@requires(CPU)
-@tag("fixed_pt")
-class PyProbSpikerModelFixed(PyLoihiProcessModel):
-    """Implementation of fixed-point precision
+class AbstractPyProbSpikerModelFloat(AbstractPyProbSpikerModel):
+    """Abstract implementation of floating-point precision
     probabilistic spiker model.
+
+    Specific implementations inherit from here.
+    """
+    rnd: np.ndarray = LavaPyType(np.ndarray, float)
+    p_spike: np.ndarray = LavaPyType(np.ndarray, float)
+    # The random numbers are uniformly distributed in [0, 1)
+    rnd_dtype = float
+    random_unity = 1.0
+
+    def draw_random_block(self, neurons: slice = None):
+        """Draw uniformly distributed random numbers in [0, 1)."""
+        return self.random.uniform(self.time_step, self.block_steps, neurons)
+
+class AbstractPyProbSpikerModelFixed(AbstractPyProbSpikerModel):
+    """Abstract implementation of fixed-point precision
+    probabilistic spiker model.
+
+    Specific implementations inherit from here.
     """
-    shape: np.ndarray = LavaPyType(np.ndarray, int)
-    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, int)
     rnd: np.ndarray = LavaPyType(np.ndarray, int)
     p_spike: np.ndarray = LavaPyType(np.ndarray, int)
+    # MSB alignment of random numbers by 24 bits
+    # --> probability is accordingly prepared by Brian2Lava
+    random_bits = 24
+    rnd_dtype = np.int64
+    random_unity = 2**random_bits
 
-    def __init__(self, proc_params):
-        super(PyProbSpikerModelFixed, self).__init__(proc_params)
-        self.logger = get_logger('brian2.devices.lava')
-        self.logger.debug(f"Process '{proc_params._parameters['name']}' initialized with PyProbSpikerModelFixed process model")
+    def draw_random_block(self, neurons: slice = None):
+        """Draw uniformly distributed random integers in [0, `random_unity`)."""
+        return self.random.integers(self.time_step, self.random_bits, self.block_steps, neurons)
 
-        # Use system time to seed the random number generation
-        # TODO The numpy method shall eventually be replaced by a more suitable one
-        np.random.seed(int(datetime.now().timestamp()*1e6) % 2**32)
-        
-        # MSB alignment of random numbers by 24 bits
-        # --> probability is accordingly prepared by Brian2Lava 
-        self.random_unity = 2**24
+@implements(proc=ProbSpiker, protocol=LoihiProtocol)
+@requires(CPU)
+@tag("floating_pt")
+class PyProbSpikerModelFloat(AbstractPyProbSpikerModelFloat):
+    """Implementation of floating-point precision
+    probabilistic spiker model.
+    """
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, int)
 
-    def spiking_activation(self):
-        """Spiking activation function."""
-        self.rnd = np.random.randint(0, self.random_unity, size=self.shape[0])
-        return self.rnd < self.p_spike
-        #return np.ones(self.shape[0], dtype=bool) # spiking all the time
+@implements(proc=SparseProbSpiker, protocol=LoihiProtocol)
+@requires(CPU)
+@tag("floating_pt")
+class PySparseProbSpikerModelFloat(AbstractPyProbSpikerModelFloat):
+    """Implementation of floating-point precision
+    probabilistic spiker model, which sends the indices of the
+    spiking neurons via a sparse output port.
+    """
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_SPARSE, int)
+    sparse_output = True
 
-    def run_spk(self):
-        """The run function that performs the actual computation."""
-        self.s_out.send(self.spiking_activation())
+@implements(proc=ProbSpiker, protocol=LoihiProtocol)
+@requires(CPU)
+@tag("fixed_pt")
+class PyProbSpikerModelFixed(AbstractPyProbSpikerModelFixed):
+    """Implementation of fixed-point precision
+    probabilistic spiker model.
+    """
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, int)
+
+@implements(proc=SparseProbSpiker, protocol=LoihiProtocol)
+@requires(CPU)
+@tag("fixed_pt")
+class PySparseProbSpikerModelFixed(AbstractPyProbSpikerModelFixed):
+    """Implementation of fixed-point precision
+    probabilistic spiker model, which sends the indices of the
+    spiking neurons via a sparse output port.
+    """
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_SPARSE, int)
+    sparse_output = True
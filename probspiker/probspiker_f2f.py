@@ -6,7 +6,10 @@ A dictionary containing lambda functions to perform the variable-wise scaling
 for F2F conversion of the probspiker. Since this is only based on probabilities,
 the F2F will just act as the identity operator. 
 """
+import numpy as np
+
 from brian2lava.utils.const import LOIHI2_SPECS
+from brian2lava.preset_mode.lib.model_lib._common.f2f import batch_ranges
 class ModelScaler:
     process_class = 'ProbSpiker'
     forward_ops = {
@@ -61,6 +64,26 @@ class ModelScaler:
 
         return {'alpha_t': 1, 'A': 1}
 
+    @staticmethod
+    def batch_min_scaling_params(variables):
+        """
+        Vectorized version of `min_scaling_params()` for many populations at once,
+        with `variables` mapping the variable names to arrays of shape `(n, 2)` with
+        the (min, max) ranges in each of the `n` populations (see `_common.f2f`).
+        """
+        num_populations = len(next(iter(batch_ranges(variables).values())))
+        return {'alpha_t': np.ones(num_populations), 'A': np.ones(num_populations)}
 
+    @staticmethod
+    def batch_optimal_scaling_params(variables):
+        """
+        Vectorized version of `optimal_scaling_params()` for many populations at once.
+        """
+        return ModelScaler.batch_max_scaling_params(variables)
 
-    
+    @staticmethod
+    def batch_max_scaling_params(variables):
+        """
+        Vectorized version of `max_scaling_params()` for many populations at once.
+        """
+        return ModelScaler.batch_min_scaling_params(variables)
@@ -6,9 +6,10 @@ from lava.magma.core.process.process import LogConfig, AbstractProcess
 from lava.magma.core.process.variable import Var
 from lava.magma.core.process.ports.ports import OutPort
 
-class ProbSpiker(AbstractProcess):
-    """Probabilistic spiker neuron. Spiking follows a Poisson process with a given
-    probability. Does not use any synaptic input.
+class AbstractProbSpiker(AbstractProcess):
+    """Abstract probabilistic spiker neuron. Spiking follows a Poisson process with
+    a given probability. Does not use any synaptic input. Specific variants (with
+    dense or sparse output port) inherit from here.
 
     Parameters
     ----------
@@ -20,6 +21,36 @@ class ProbSpiker(AbstractProcess):
     p_spike : float, list of float, ndarray of float
         The probability that a spike occurs in the duration of a timestep. Can be
         specified individually for each neuron.
+    seed : int, optional
+        Seed of the counter-based random number generator. If not given, fresh
+        entropy is used (and the spiking is not reproducible).
+    rng_stream : str, optional
+        Name of the random stream, by default the name of the process. The
+        random numbers of a neuron in a timestep only depend on `seed`,
+        `rng_stream`, the neuron index, and the timestep. If `seed` is given,
+        either `rng_stream` or `name` is required, since unnamed processes
+        would otherwise draw identical numbers.
+    neuron_offset : int, optional
+        Index of the first neuron of this process within the random stream.
+        Allows to split a population across several processes (using the same
+        `seed` and `rng_stream`) without changing the random numbers.
+    sparse_sampling : bool, optional
+        If `True`, only the indices of the spiking neurons are sampled in each
+        timestep (by drawing the number of spikes from a binomial distribution),
+        instead of drawing a random number for every neuron. This is much faster
+        for low spiking probabilities. The variable `rnd` is then not updated,
+        unless it is monitored. In this mode, splitting a population across
+        processes (see `neuron_offset`) changes the drawn spikes.
+    block_steps : int, optional
+        If larger than 1, the process model draws the random numbers for this
+        number of timesteps at once and then uses them one timestep after the
+        other. This reduces the computational overhead per timestep and does
+        not change the sequence of random numbers.
+    num_threads : int, optional
+        If larger than 1, the random numbers are drawn for contiguous chunks of
+        neurons on this number of threads. Does not change the random numbers.
+    chunk_size : int, optional
+        Number of neurons per chunk if `num_threads` is larger than 1.
     name : str
         Name of the current process.
     log_config : LogConfig
@@ -51,4 +82,20 @@ class ProbSpiker(AbstractProcess):
                 shape = {shape}
                 rnd = {self.rnd.init}
                 p_spike = {self.p_spike.init}"""
-        self.logger.debug(msg_var_par)
\ No newline at end of file
+        self.logger.debug(msg_var_par)
+
+
+class ProbSpiker(AbstractProbSpiker):
+    """Probabilistic spiker neuron. Spiking follows a Poisson process with a given
+    probability. Does not use any synaptic input. See `AbstractProbSpiker` for the
+    parameters.
+    """
+
+
+class SparseProbSpiker(AbstractProbSpiker):
+    """Probabilistic spiker neuron whose process models send the spikes via a
+    sparse output port (i.e., as the values and indices of the spiking neurons
+    instead of a dense vector of all neurons). This reduces the data transferred
+    per timestep for low spiking probabilities. See `AbstractProbSpiker` for the
+    parameters.
+    """
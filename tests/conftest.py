@@ -0,0 +1,159 @@
+"""
+Shared fixtures of the tests of the model library.
+
+The process and process model files of a model are not importable on their own, since
+the process models refer to the process classes without importing them. As in
+Brian2Lava, they are therefore loaded by executing the concatenated files of the model
+directory.
+"""
+import glob
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_common_module(name: str):
+    """Load a module of `_common` from its file (which only works for modules that
+    don't import other modules of the library)."""
+    spec = importlib.util.spec_from_file_location(f"_common_{name}", os.path.join(REPO_DIR, "_common", f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_model(model_dir: str, directory: str = None):
+    """
+    Load the processes and process models of a model.
+
+    Parameters
+    ----------
+    model_dir : str
+        Name of the model directory (e.g. `'lif'`).
+    directory : str, optional
+        The directory that the process models take as their own, e.g. to load the
+        stimulus of `lif_predef_stim_versatile` from. By default, the model directory.
+
+    Returns
+    -------
+    dict
+        The namespace with the classes of the model.
+    """
+    pytest.importorskip("lava")
+    pytest.importorskip("brian2")
+    pytest.importorskip("brian2lava")
+    path = os.path.join(REPO_DIR, model_dir)
+    files = sorted(glob.glob(os.path.join(path, "*process.py"))) + \
+        sorted(glob.glob(os.path.join(path, "*process_model.py")))
+    code = "".join("\n" + open(file).read() for file in files)
+    namespace = {"__file__": os.path.join(directory or path, "model.py"), "__name__": f"model_lib_{model_dir}"}
+    exec(compile(code, path, "exec"), namespace)
+    return namespace
+
+
+@pytest.fixture(scope="session")
+def fixed_point():
+    return load_common_module("fixed_point")
+
+
+@pytest.fixture(scope="session")
+def lif_model():
+    return load_model("lif")
+
+
+@pytest.fixture(scope="session")
+def process_params():
+    """Create the process parameters as passed by Lava to the constructor of a process model."""
+    pytest.importorskip("lava")
+    from lava.magma.core.process.process import ProcessParameters
+    return lambda **parameters: ProcessParameters(parameters)
+
+
+class InPort:
+    """Replaces the input port of a process model, returning the same input in every timestep."""
+
+    def __init__(self, data=0):
+        self.data = data
+
+    def recv(self):
+        return self.data
+
+
+class OutPort:
+    """Replaces the output port of a process model and records the sent spikes (as dense
+    boolean arrays, also if they are sent as values and indices via a sparse port)."""
+
+    def __init__(self, shape):
+        self.shape = shape
+        self.spikes = []
+
+    def send(self, data, *indices):
+        if indices:
+            spikes = np.zeros(self.shape, dtype=bool)
+            spikes.flat[indices[0]] = np.asarray(data) != 0
+        else:
+            spikes = np.array(data, dtype=bool).reshape(self.shape)
+        self.spikes.append(spikes)
+
+
+def create_model(model_class, state: dict, **parameters):
+    """
+    Create a process model as the Lava runtime would, with the given values of its Vars
+    and with stand-ins of its ports.
+
+    Parameters
+    ----------
+    model_class : type
+        The process model class.
+    state : dict
+        The values of the Vars (arrays are copied).
+    **parameters
+        The process parameters, including `shape`.
+
+    Returns
+    -------
+    PyLoihiProcessModel
+        The process model.
+    """
+    pytest.importorskip("lava")
+    from lava.magma.core.process.process import ProcessParameters
+    parameters.setdefault("name", model_class.__name__)
+    model = model_class(ProcessParameters(parameters))
+    for name, value in state.items():
+        setattr(model, name, value.copy() if isinstance(value, np.ndarray) else value)
+    model.a_in = InPort()
+    model.s_out = OutPort(parameters["shape"])
+    return model
+
+
+def run_model(model, num_steps: int, inputs=None, on_step=None):
+    """
+    Run a process model (see `create_model()`) for a number of timesteps.
+
+    Parameters
+    ----------
+    model : PyLoihiProcessModel
+        The process model.
+    num_steps : int
+        The number of timesteps.
+    inputs : callable, optional
+        Returns the synaptic input for a timestep (counted from 1).
+    on_step : callable, optional
+        Called with the model before each timestep, e.g. to set Vars at runtime.
+
+    Returns
+    -------
+    numpy.ndarray
+        The spikes of all timesteps (along the first axis).
+    """
+    for _ in range(num_steps):
+        model.time_step += 1
+        if inputs is not None:
+            model.a_in.data = inputs(model.time_step)
+        if on_step is not None:
+            on_step(model)
+        model.run_spk()
+    return np.array(model.s_out.spikes[-num_steps:])
@@ -0,0 +1,55 @@
+"""
+The fused chunked update of the fixed-point ATRLIF model must be bit-identical to the
+unfused reference implementation, for any number of threads and chunk size.
+"""
+import numpy as np
+import pytest
+
+from conftest import create_model, load_model, run_model
+
+MAX_STATE = 2**23 - 1
+NUM_NEURONS = 2000
+NUM_STEPS = 100
+
+
+@pytest.fixture(scope="module")
+def atrlif_model():
+    return load_model("atrlif")
+
+
+def random_state(rng):
+    """Random 24-bit states (some at the saturation limits) and per-neuron parameters."""
+    state = {name: rng.integers(-MAX_STATE, MAX_STATE + 1, NUM_NEURONS).astype(np.int32)
+             for name in ("j", "v", "theta", "r")}
+    state["v"][:2] = [MAX_STATE, -MAX_STATE]
+    for name in ("delta_j", "delta_v", "delta_theta", "delta_r", "theta_0", "theta_step"):
+        # Include the extreme values 0 and 4095
+        state[name] = np.append(rng.integers(0, 4096, NUM_NEURONS - 2), [0, 4095]).astype(np.uint16)
+    state["bias_mant"] = rng.integers(-4096, 4096, NUM_NEURONS).astype(np.int16)
+    state["bias_exp"] = rng.integers(0, 8, NUM_NEURONS).astype(np.int16)
+    state["s"] = np.zeros(NUM_NEURONS, dtype=bool)
+    return state
+
+
+@pytest.mark.parametrize("narrow_buffers", [False, True])
+@pytest.mark.parametrize("num_threads, chunk_size", [(1, 2**14), (1, 37), (3, 37)])
+def test_fused_matches_unfused(atrlif_model, narrow_buffers, num_threads, chunk_size):
+    rng = np.random.default_rng(19)
+    state = random_state(rng)
+    # Large inputs drive j and v into wrapping and saturation
+    inputs = (rng.integers(-2**15, 2**15, (NUM_STEPS + 1, NUM_NEURONS)) *
+              rng.integers(1, 64, (NUM_STEPS + 1, NUM_NEURONS))).astype(np.int32)
+    model_class = atrlif_model["PyATRLIFModelFixed"]
+    unfused = create_model(model_class, state, shape=(NUM_NEURONS,), fused_kernel=False,
+                           narrow_buffers=narrow_buffers)
+    fused = create_model(model_class, state, shape=(NUM_NEURONS,), narrow_buffers=narrow_buffers,
+                         num_threads=num_threads, chunk_size=chunk_size)
+    assert unfused.chunked is None and fused.chunked is not None
+    num_spikes = 0
+    for _ in range(NUM_STEPS):
+        spikes = run_model(unfused, 1, inputs.__getitem__)
+        np.testing.assert_array_equal(run_model(fused, 1, inputs.__getitem__), spikes)
+        for name in ("j", "v", "theta", "r"):
+            np.testing.assert_array_equal(getattr(fused, name), getattr(unfused, name), err_msg=name)
+        num_spikes += np.count_nonzero(spikes)
+    assert 0 < num_spikes < NUM_STEPS * NUM_NEURONS
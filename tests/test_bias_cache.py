@@ -0,0 +1,96 @@
+"""
+The fixed-point LIF-family models compute the effective bias only in the first timestep
+and after a Var update. Setting `bias_mant` or `bias_exp` at runtime must still give the
+same results as recomputing the effective bias in every timestep.
+"""
+import numpy as np
+import pytest
+
+from conftest import create_model, load_model, run_model
+
+NUM_NEURONS = 200
+NUM_STEPS = 60
+UPDATE_STEP = 30
+
+
+def lif_state(rng):
+    return {
+        "j": np.zeros(NUM_NEURONS, dtype=np.int32),
+        "v": np.zeros(NUM_NEURONS, dtype=np.int32),
+        "delta_j": rng.integers(0, 4096, NUM_NEURONS).astype(np.uint16),
+        "delta_v": rng.integers(0, 4096, NUM_NEURONS).astype(np.uint16),
+        "bias_mant": rng.integers(-4096, 4096, NUM_NEURONS).astype(np.int16),
+        "bias_exp": rng.integers(0, 8, NUM_NEURONS).astype(np.int16),
+        "v_th": 2**16,
+        "v_rs": 0,
+        "dt": 1,
+    }
+
+
+def lif_delta_v_input_state(rng):
+    return {
+        "v": np.zeros(NUM_NEURONS, dtype=np.int32),
+        "delta_v": rng.integers(0, 4096, NUM_NEURONS).astype(np.uint16),
+        "bias_mant": rng.integers(-4096, 4096, NUM_NEURONS).astype(np.int16),
+        "bias_exp": rng.integers(0, 8, NUM_NEURONS).astype(np.int16),
+        "v_th": 2**16,
+        "v_rs": 0,
+    }
+
+
+def atrlif_state(rng):
+    return {
+        "j": np.zeros(NUM_NEURONS, dtype=np.int32),
+        "v": np.zeros(NUM_NEURONS, dtype=np.int32),
+        "theta": np.zeros(NUM_NEURONS, dtype=np.int32),
+        "r": np.zeros(NUM_NEURONS, dtype=np.int32),
+        "s": np.zeros(NUM_NEURONS, dtype=bool),
+        "delta_j": rng.integers(0, 4096, NUM_NEURONS).astype(np.uint16),
+        "delta_v": rng.integers(0, 4096, NUM_NEURONS).astype(np.uint16),
+        "delta_theta": rng.integers(0, 4096, NUM_NEURONS).astype(np.uint16),
+        "delta_r": rng.integers(0, 4096, NUM_NEURONS).astype(np.uint16),
+        "theta_0": np.full(NUM_NEURONS, 2**11, dtype=np.uint16),
+        "theta_step": np.full(NUM_NEURONS, 2**10, dtype=np.uint16),
+        "bias_mant": rng.integers(-4096, 4096, NUM_NEURONS).astype(np.int16),
+        "bias_exp": rng.integers(0, 8, NUM_NEURONS).astype(np.int16),
+    }
+
+
+@pytest.mark.parametrize("model_dir, model_name, make_state", [
+    ("lif", "PyLifModelBitAcc", lif_state),
+    ("lif_delta_v_input", "PyLifModelFixed", lif_delta_v_input_state),
+    ("atrlif", "PyATRLIFModelFixed", atrlif_state),
+])
+def test_bias_set_at_runtime(model_dir, model_name, make_state):
+    model_class = load_model(model_dir)[model_name]
+    rng = np.random.default_rng(7)
+    state = make_state(rng)
+    new_bias_mant = rng.integers(-4096, 4096, NUM_NEURONS).astype(np.int16)
+    new_bias_exp = rng.integers(0, 8, NUM_NEURONS).astype(np.int16)
+    inputs = rng.integers(-2**10, 2**10, (NUM_STEPS + 1, NUM_NEURONS)).astype(np.int16)
+
+    def set_bias(model):
+        """Set the bias at runtime, as Lava does it (including the update hook)."""
+        if model.time_step == UPDATE_STEP:
+            model.bias_mant[:] = new_bias_mant
+            model.bias_exp[:] = new_bias_exp
+            model.on_var_update()
+
+    def set_bias_and_recompute(model):
+        """Set the bias and recompute the effective bias in every timestep."""
+        set_bias(model)
+        model.bias_changed = True
+
+    cached = create_model(model_class, state, shape=(NUM_NEURONS,))
+    recomputed = create_model(model_class, state, shape=(NUM_NEURONS,))
+    spikes_cached = run_model(cached, NUM_STEPS, inputs.__getitem__, set_bias)
+    spikes_recomputed = run_model(recomputed, NUM_STEPS, inputs.__getitem__, set_bias_and_recompute)
+    np.testing.assert_array_equal(spikes_cached, spikes_recomputed)
+    np.testing.assert_array_equal(cached.v, recomputed.v)
+    assert spikes_cached[:UPDATE_STEP - 1].any() and spikes_cached[UPDATE_STEP - 1:].any()
+
+    # The runtime update has to change the effective bias
+    unchanged = create_model(model_class, state, shape=(NUM_NEURONS,))
+    spikes_unchanged = run_model(unchanged, NUM_STEPS, inputs.__getitem__)
+    np.testing.assert_array_equal(spikes_unchanged[:UPDATE_STEP - 1], spikes_cached[:UPDATE_STEP - 1])
+    assert not np.array_equal(unchanged.v, cached.v)
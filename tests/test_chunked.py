@@ -0,0 +1,91 @@
+"""
+Chunked multithreaded execution must give the same results as the default execution,
+also if the chunk size does not divide the number of neurons.
+"""
+import numpy as np
+import pytest
+
+from conftest import create_model, load_model, run_model
+
+NUM_NEURONS = 1000
+NUM_STEPS = 50
+CHUNKED = dict(num_threads=3, chunk_size=37)
+
+
+def assert_chunked_matches_default(model_class, state, inputs=None, **parameters):
+    parameters["shape"] = (NUM_NEURONS,)
+    default = create_model(model_class, state, **parameters)
+    chunked = create_model(model_class, state, **parameters, **CHUNKED)
+    expected = run_model(default, NUM_STEPS, inputs)
+    np.testing.assert_array_equal(run_model(chunked, NUM_STEPS, inputs), expected)
+    for name in state:
+        np.testing.assert_array_equal(getattr(chunked, name), getattr(default, name), err_msg=name)
+    assert expected.any()
+    return default, chunked
+
+
+@pytest.mark.parametrize("fixed", [False, True])
+def test_lif(lif_model, fixed):
+    rng = np.random.default_rng(14)
+    if fixed:
+        state = {
+            "j": np.zeros(NUM_NEURONS, dtype=np.int32), "v": np.zeros(NUM_NEURONS, dtype=np.int32),
+            "delta_j": rng.integers(0, 4096, NUM_NEURONS).astype(np.uint16),
+            "delta_v": rng.integers(0, 4096, NUM_NEURONS).astype(np.uint16),
+            "bias_mant": rng.integers(-4096, 4096, NUM_NEURONS).astype(np.int16),
+            "bias_exp": rng.integers(0, 8, NUM_NEURONS).astype(np.int16),
+            "v_th": rng.integers(2**10, 2**17, NUM_NEURONS).astype(np.int32), "v_rs": 0, "dt": 1,
+        }
+        inputs = rng.integers(-2**10, 2**10, (NUM_STEPS + 1, NUM_NEURONS)).astype(np.int16)
+    else:
+        state = {
+            "j": np.zeros(NUM_NEURONS), "v": np.zeros(NUM_NEURONS),
+            "delta_j": rng.random(NUM_NEURONS) * 0.5, "delta_v": rng.random(NUM_NEURONS) * 0.5,
+            "bias_mant": rng.random(NUM_NEURONS) * 0.1, "bias_exp": np.zeros(NUM_NEURONS),
+            "v_th": rng.random(NUM_NEURONS) + 0.1, "v_rs": 0.0, "dt": 0.5,
+        }
+        inputs = rng.random((NUM_STEPS + 1, NUM_NEURONS)) * 0.1
+    model_class = lif_model["PyLifModelBitAcc" if fixed else "PyLifModelFloat"]
+    assert_chunked_matches_default(model_class, state, inputs.__getitem__)
+
+
+@pytest.mark.parametrize("model_name, parameters", [
+    ("PyLifModelFloat", {}),
+    ("PyLifModelFixed", {}),
+    ("PyLifModelFixed", {"integer_noise": True}),
+])
+def test_lif_predef_stim_versatile_with_noise(tmp_path, model_name, parameters):
+    rng = np.random.default_rng(15)
+    fixed = model_name == "PyLifModelFixed"
+    # Stimulus in neuron-major layout, as stored by Brian2Lava
+    np.save(tmp_path / "bias_for_all_times.npy", rng.uniform(0, 200 if fixed else 0.2, (NUM_NEURONS, NUM_STEPS + 2)))
+    model_class = load_model("lif_predef_stim_versatile", directory=str(tmp_path))[model_name]
+    if fixed:
+        state = {
+            "v": np.zeros(NUM_NEURONS, dtype=np.int32), "v_rs": np.zeros(NUM_NEURONS, dtype=np.int32),
+            "v_rev": 0, "sigma_bg": 50,
+            "delta_v_ind": rng.integers(100, 1000, NUM_NEURONS).astype(np.uint16),
+            "bias_exp": np.full(NUM_NEURONS, 6, dtype=np.int16),
+            "v_th": np.full(NUM_NEURONS, 2**13, dtype=np.int32),
+        }
+    else:
+        state = {
+            "v": np.zeros(NUM_NEURONS), "v_rs": np.zeros(NUM_NEURONS), "v_rev": 0.0, "sigma_bg": 0.05,
+            "delta_v_ind": rng.random(NUM_NEURONS) * 0.3, "bias_exp": np.zeros(NUM_NEURONS),
+            "v_th": np.full(NUM_NEURONS, 0.1),
+        }
+    state["bias_mant"] = np.zeros(NUM_NEURONS, dtype=np.int16 if fixed else float)
+    assert_chunked_matches_default(model_class, state, noise_seed=16, **parameters)
+
+
+@pytest.mark.parametrize("model_name", ["PyProbSpikerModelFloat", "PyProbSpikerModelFixed"])
+@pytest.mark.parametrize("block_steps", [1, 8])
+def test_probspiker(model_name, block_steps):
+    model_class = load_model("probspiker")[model_name]
+    p_spike = np.random.default_rng(17).random(NUM_NEURONS) * 0.2
+    if model_name == "PyProbSpikerModelFixed":
+        p_spike = (p_spike * 2**24).astype(np.int64)
+    default, chunked = assert_chunked_matches_default(
+        model_class, {"p_spike": p_spike}, seed=18, rng_stream="probspiker", block_steps=block_steps
+    )
+    np.testing.assert_array_equal(chunked.rnd, default.rnd)
@@ -0,0 +1,360 @@
+"""
+Tests of the F2F scalers: the hand-coded ones (`<model>/<model>_f2f.py`), the ones
+generated from `model.json` (`_common/generic_f2f.py`), the memoization of their results
+(`_common/f2f_cache.py`) and the range calibration (`_common/f2f_calibration.py`).
+"""
+import importlib.util
+import inspect
+import json
+import os
+import textwrap
+
+import numpy as np
+import pytest
+
+from conftest import REPO_DIR, create_model, load_model, run_model
+
+pytest.importorskip("brian2lava")
+generic_f2f = pytest.importorskip("brian2lava.preset_mode.lib.model_lib._common.generic_f2f")
+
+# Models whose scaler is generated from `model.json`, with the file of the scaler
+GENERATED_SCALERS = {
+    'lif_delta_v_input': 'lif_delta_v_input_f2f.py',
+    'lif_delta_v_input_v_rev': 'lif_delta_v_input_v_rev_f2f.py',
+    'lif_delta_v_input_v_rev_tau_v_ind': 'f2f.py',
+    'lif_predef_stim_versatile': 'f2f.py',
+    'lif_rp_delta_v_input': 'lif_rp_delta_v_input_f2f.py',
+    'lif_v_input_v_rev': 'lif_v_input_v_rev_f2f.py',
+    'timespiker': 'timespiker_f2f.py',
+}
+# Names that the converter handles itself instead of passing them to the process
+CONVERTER_NAMES = {'dt', 'w', 'bias'}
+
+
+def f2f_module(name: str):
+    """Import a shared F2F module (`_common/<name>.py`)."""
+    return importlib.import_module(f"brian2lava.preset_mode.lib.model_lib._common.{name}")
+
+
+def load_scaler(model_dir: str, file_name: str):
+    """Load the `ModelScaler` of a model, with the MSB-aligned and constant names set
+    as by the converter."""
+    path = os.path.join(REPO_DIR, model_dir, file_name)
+    spec = importlib.util.spec_from_file_location(f"{model_dir}_f2f", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    scaler = module.ModelScaler
+    with open(os.path.join(REPO_DIR, model_dir, "model.json")) as f:
+        model = json.load(f)
+    for name in ('msb_align_act', 'msb_align_decay', 'msb_align_prob'):
+        setattr(scaler, name, set(model.get(name, [])))
+    scaler.const = {name for name in scaler.forward_ops if name.startswith('v_')} - scaler.variables
+    return scaler
+
+
+@pytest.fixture(autouse=True)
+def memory_cache(monkeypatch):
+    """Keep the memoized scaling parameters out of the on-disk store."""
+    monkeypatch.setattr(f2f_module('f2f_cache').SCALING_CACHE, 'cache_dir', None)
+
+
+def test_generated_lif_scaler_matches_hand_coded():
+    hand_coded = load_scaler('lif', 'lif_f2f.py')
+    generated = generic_f2f.make_model_scaler(os.path.join(REPO_DIR, 'lif', 'model.json'))
+    for name in ('msb_align_act', 'msb_align_decay', 'msb_align_prob', 'const'):
+        setattr(generated, name, getattr(hand_coded, name))
+    assert generated.forward_ops.keys() == hand_coded.forward_ops.keys()
+    for name, op in hand_coded.forward_ops.items():
+        assert generated.forward_ops[name](1234.5, 6.75) == op(1234.5, 6.75)
+    assert generated.variables == hand_coded.variables
+    assert generated.mant_exp == hand_coded.mant_exp
+
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        variables = {'dt': (1e-3, 1e-3)}
+        for name in ['v', 'v_th', 'v_rs', 'j', 'bias', 'w']:
+            var_min = rng.uniform(0.5, 1)
+            variables[name] = (var_min, var_min * rng.uniform(1, 3))
+        for method in ('min_scaling_params', 'max_scaling_params'):
+            expected = getattr(hand_coded, method)(variables)
+            result = getattr(generated, method)(variables)
+            assert result['alpha_t'] == expected['alpha_t']
+            assert result['A'] == pytest.approx(expected['A'], rel=1e-14)
+
+
+@pytest.mark.parametrize("model_dir", sorted(GENERATED_SCALERS))
+def test_generated_scaler_only_scales_process_parameters(model_dir):
+    scaler = load_scaler(model_dir, GENERATED_SCALERS[model_dir])
+    with open(os.path.join(REPO_DIR, model_dir, "model.json")) as f:
+        process_name = json.load(f)['process_name']
+    process = load_model(model_dir)[process_name]
+    process_params = set(inspect.signature(process.__init__).parameters)
+    assert set(scaler.forward_ops) - CONVERTER_NAMES <= process_params
+
+    # The scaled values fit into their bit-ranges
+    variables = {'dt': (1e-4, 1e-4)}
+    variables.update({name: (-0.07, 0.05) for name in scaler.forward_ops if name != 'dt'})
+    result = scaler.max_scaling_params(variables)
+    for name in scaler.forward_ops:
+        if name != 'dt':
+            scaled = scaler.forward_ops[name](result['alpha_t'], result['A']) * 0.07
+            assert scaled <= scaler.aligned_max_val(name) - 1
+
+
+def atrlif_ranges(rng, with_decays=True):
+    """Random ranges of the ATRLIF parameters and initial values, as (min, max) of the
+    magnitudes like the converter passes them."""
+    variables = {'dt': (1e-4, 1e-4)}
+    for name, scale in [('v', 1e-2), ('j', 1e2), ('theta', 1e-2), ('r', 1e-2), ('theta_0', 1e-2),
+                        ('theta_step', 1e-3), ('bias', 1e1), ('w', 1e1)]:
+        var_max = scale*rng.uniform(0.5, 2)
+        variables[name] = (var_max*rng.uniform(0.1, 1), var_max)
+    if with_decays:
+        for name in ['j', 'v', 'theta', 'r']:
+            delta = rng.uniform(0.01, 0.5)
+            variables[f'delta_{name}'] = (delta, delta)
+    return variables
+
+
+@pytest.fixture
+def atrlif_scaler():
+    return load_scaler('atrlif', 'atrlif_f2f.py')
+
+
+def test_atrlif_decays_reach_scaler(atrlif_scaler):
+    process = load_model('atrlif')['ATRLIF']
+    process_params = set(inspect.signature(process.__init__).parameters)
+    decays = {name for name in atrlif_scaler.forward_ops if name.startswith('delta_')}
+    assert decays == {'delta_j', 'delta_v', 'delta_theta', 'delta_r'}
+    assert set(atrlif_scaler.forward_ops) - CONVERTER_NAMES <= process_params
+    # The decays are not scaled
+    assert all(atrlif_scaler.forward_ops[name](1e4, 1e6) == 1 for name in decays)
+
+
+def test_atrlif_optimal_scaling_without_decays(atrlif_scaler):
+    rng = np.random.default_rng(1)
+    for _ in range(100):
+        variables = atrlif_ranges(rng, with_decays=False)
+        assert atrlif_scaler.optimal_scaling_params(variables) == atrlif_scaler.max_scaling_params(variables)
+
+
+def test_atrlif_optimal_scaling_with_decays(atrlif_scaler):
+    rng = np.random.default_rng(2)
+    for _ in range(100):
+        variables = atrlif_ranges(rng)
+        result = atrlif_scaler.optimal_scaling_params(variables)
+        bounds = atrlif_scaler.reachable_bounds(f2f_module('f2f').stack_variable_ranges([variables]))
+        for name, bound in bounds.items():
+            scaled = atrlif_scaler.forward_ops[name](result['alpha_t'], result['A']) * bound[0]
+            assert scaled <= (atrlif_scaler.aligned_max_val(name) - 1)*(1 + 1e-12)
+
+
+def test_atrlif_assumptions_in_cache_key(atrlif_scaler, monkeypatch):
+    variables = atrlif_ranges(np.random.default_rng(3))
+    A = atrlif_scaler.optimal_scaling_params(variables)['A']
+    # A larger input rate raises the bound of j (and v and r), which must not hit the cached result
+    monkeypatch.setattr(atrlif_scaler, 'max_input_rate', 10**5)
+    assert atrlif_scaler.optimal_scaling_params(variables)['A'] < A
+    monkeypatch.setattr(atrlif_scaler, 'max_input_rate', 1)
+    assert atrlif_scaler.optimal_scaling_params(variables)['A'] == A
+
+
+# A minimal scaler, which counts the computations of its scaling parameters
+COUNTING_SCALER = """
+class ModelScaler:
+    process_class = 'Counting'
+    msb_align_act = {'v'}
+    msb_align_decay = set()
+    msb_align_prob = set()
+    variables = {'v'}
+    const = set()
+    num_computed = 0
+
+    @staticmethod
+    def max_scaling_params(variables):
+        ModelScaler.num_computed += 1
+        return {'alpha_t': 1., 'A': %r / variables['v'][1]}
+
+    min_scaling_params = optimal_scaling_params = max_scaling_params
+"""
+
+
+def load_counting_scaler(path, A=1.):
+    """Write the counting scaler (computing `A`) to `path`, load it and memoize it."""
+    with open(path, 'w') as f:
+        f.write(textwrap.dedent(COUNTING_SCALER % A))
+    spec = importlib.util.spec_from_file_location("counting_f2f", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return f2f_module('f2f_cache').memoize_scaling_params(module.ModelScaler)
+
+
+def test_on_disk_store_is_opt_in(monkeypatch):
+    path = os.path.join(REPO_DIR, '_common', 'f2f_cache.py')
+    for value, cache_dir in [(None, None), ('', None), ('/tmp/f2f', '/tmp/f2f')]:
+        if value is None:
+            monkeypatch.delenv('BRIAN2LAVA_F2F_CACHE_DIR', raising=False)
+        else:
+            monkeypatch.setenv('BRIAN2LAVA_F2F_CACHE_DIR', value)
+        spec = importlib.util.spec_from_file_location("f2f_cache_copy", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        assert module.SCALING_CACHE.cache_dir == cache_dir
+
+
+def test_store_round_trip(tmp_path, monkeypatch):
+    f2f_cache = f2f_module('f2f_cache')
+    variables = {'v': (0.5, 2.)}
+    cache = f2f_cache.ScalingCache(str(tmp_path / 'store'))
+    monkeypatch.setattr(f2f_cache, 'SCALING_CACHE', cache)
+    scaler = load_counting_scaler(tmp_path / 'scaler.py')
+    assert scaler.max_scaling_params(variables) == {'alpha_t': 1., 'A': 0.5}
+    assert scaler.max_scaling_params(variables) == {'alpha_t': 1., 'A': 0.5}
+    assert scaler.num_computed == 1
+    assert not os.path.exists(cache.path)
+    cache.flush()
+
+    # A new process reads the result from the store
+    monkeypatch.setattr(f2f_cache, 'SCALING_CACHE', f2f_cache.ScalingCache(cache.cache_dir))
+    scaler = load_counting_scaler(tmp_path / 'scaler.py')
+    assert scaler.max_scaling_params(variables) == {'alpha_t': 1., 'A': 0.5}
+    assert scaler.num_computed == 0
+    assert scaler.min_scaling_params(variables) == {'alpha_t': 1., 'A': 0.5}
+    assert scaler.num_computed == 1
+
+    f2f_cache.SCALING_CACHE.clear()
+    assert not os.path.exists(cache.path)
+
+
+def test_changed_source_invalidates_store(tmp_path, monkeypatch):
+    f2f_cache = f2f_module('f2f_cache')
+    variables = {'v': (0.5, 2.)}
+    cache = f2f_cache.ScalingCache(str(tmp_path / 'store'))
+    monkeypatch.setattr(f2f_cache, 'SCALING_CACHE', cache)
+    assert load_counting_scaler(tmp_path / 'scaler.py').max_scaling_params(variables)['A'] == 0.5
+    cache.flush()
+
+    monkeypatch.setattr(f2f_cache, 'SCALING_CACHE', f2f_cache.ScalingCache(cache.cache_dir))
+    scaler = load_counting_scaler(tmp_path / 'scaler.py', A=3.)
+    assert scaler.max_scaling_params(variables)['A'] == 1.5
+    assert scaler.num_computed == 1
+
+
+@pytest.mark.parametrize("name", ['msb_align_act', 'msb_align_decay', 'msb_align_prob'])
+def test_msb_alignment_in_cache_key(tmp_path, monkeypatch, name):
+    f2f_cache = f2f_module('f2f_cache')
+    monkeypatch.setattr(f2f_cache, 'SCALING_CACHE', f2f_cache.ScalingCache())
+    scaler = load_counting_scaler(tmp_path / 'scaler.py')
+    variables = {'v': (0.5, 2.)}
+    scaler.max_scaling_params(variables)
+    key = f2f_cache.scaling_key(scaler, 'hash', f2f_cache.freeze_specs(), 'max_scaling_params', variables)
+    monkeypatch.setattr(scaler, name, getattr(scaler, name) ^ {'v', 'w'})
+    assert f2f_cache.scaling_key(scaler, 'hash', f2f_cache.freeze_specs(), 'max_scaling_params',
+                                 variables) != key
+    scaler.max_scaling_params(variables)
+    assert scaler.num_computed == 2
+
+
+def test_specs_in_cache_key(tmp_path, monkeypatch):
+    f2f_cache = f2f_module('f2f_cache')
+    variables = {'v': (0.5, 2.)}
+    cache = f2f_cache.ScalingCache(str(tmp_path / 'store'))
+    monkeypatch.setattr(f2f_cache, 'SCALING_CACHE', cache)
+    load_counting_scaler(tmp_path / 'scaler.py').max_scaling_params(variables)
+    cache.flush()
+
+    # The specifications are frozen when the scaler is memoized
+    specs = f2f_cache.LOIHI2_SPECS
+    monkeypatch.setattr(specs, 'Max_Variables', specs.Max_Variables // 2)
+    monkeypatch.setattr(f2f_cache, 'SCALING_CACHE', f2f_cache.ScalingCache(cache.cache_dir))
+    scaler = load_counting_scaler(tmp_path / 'scaler.py')
+    scaler.max_scaling_params(variables)
+    assert scaler.num_computed == 1
+
+
+def test_calibrated_ranges_are_magnitudes():
+    calibration = f2f_module('f2f_calibration')
+    recorder = calibration.RangeRecorder(['j', 'v', 'x'])
+    recorder.record({'j': [5., -2e5, 0.], 'v': [0., 0.], 'x': []})
+    recorder.record({'j': [-3., 7.], 'v': [0.], 'x': []})
+    assert recorder.ranges() == {'j': (3., 2e5), 'v': (0., 0.)}
+    # The percentile covers the negative values as well
+    percentile_max = recorder.ranges(percentile=90)['j'][1]
+    assert 2e5 <= percentile_max < 4e5
+    # Magnitudes are merged, ignoring zero minima, and scaled by the magnitude of the factor
+    ranges = calibration.calibrated_ranges({'j': (1., 10.), 'v': (0.01, 0.05)}, recorder.ranges(),
+                                           scales={'j': -2.})
+    assert ranges == {'j': (1., 4e5), 'v': (0.01, 0.05)}
+
+
+def test_negative_excursion_shrinks_A():
+    calibration = f2f_module('f2f_calibration')
+    scaler = load_scaler('lif', 'lif_f2f.py')
+    variables = {'dt': (1e-4, 1e-4), 'v': (0.01, 0.02), 'v_th': (0.02, 0.02), 'v_rs': (0.01, 0.01),
+                 'j': (1., 10.), 'bias': (1., 1.), 'w': (1., 5.)}
+    recorder = calibration.RangeRecorder(['j'])
+    recorder.record({'j': [-2e5, 5.]})
+    ranges = calibration.calibrated_ranges(variables, recorder.ranges())
+    assert ranges['j'] == (1., 2e5)
+    A = scaler.optimal_scaling_params(variables)['A']
+    result = scaler.optimal_scaling_params(ranges)
+    assert result['A'] < A
+    # The excursion fits into the bit-range of j
+    assert scaler.forward_ops['j'](result['alpha_t'], result['A'])*2e5 <= scaler.aligned_max_val('j') - 1
+
+
+CALIBRATION_NEURONS = 200
+CALIBRATION_STEPS = 30
+
+
+def predef_model(directory, **parameters):
+    """Floating-point `lif_predef_stim_versatile` process model with background noise."""
+    rng = np.random.default_rng(20)
+    np.save(os.path.join(directory, "bias_for_all_times.npy"),
+            rng.uniform(0, 0.2, (CALIBRATION_NEURONS, 3 * CALIBRATION_STEPS)))
+    model_class = load_model("lif_predef_stim_versatile", directory=str(directory))["PyLifModelFloat"]
+    state = {
+        "v": np.zeros(CALIBRATION_NEURONS), "v_rs": np.zeros(CALIBRATION_NEURONS), "v_rev": 0.0,
+        "sigma_bg": 0.05, "delta_v_ind": rng.random(CALIBRATION_NEURONS) * 0.3,
+        "bias_mant": np.zeros(CALIBRATION_NEURONS), "bias_exp": np.zeros(CALIBRATION_NEURONS),
+        "v_th": np.full(CALIBRATION_NEURONS, 0.1),
+    }
+    return create_model(model_class, state, shape=(CALIBRATION_NEURONS,), noise_seed=21, **parameters)
+
+
+def probspiker_model(**parameters):
+    """Floating-point `probspiker` process model."""
+    model_class = load_model("probspiker")["PyProbSpikerModelFloat"]
+    state = {"p_spike": np.random.default_rng(22).random(CALIBRATION_NEURONS) * 0.2,
+             "rnd": np.zeros(CALIBRATION_NEURONS)}
+    return create_model(model_class, state, shape=(CALIBRATION_NEURONS,), seed=23, rng_stream="probspiker",
+                        **parameters)
+
+
+@pytest.mark.parametrize("make_model, var_names", [
+    (lambda directory: predef_model(directory), ['v']),
+    (lambda directory: predef_model(directory, noise_block_steps=8, stimulus_prefetch_steps=7), ['v']),
+    (lambda directory: probspiker_model(block_steps=8), ['rnd']),
+    (lambda directory: probspiker_model(num_threads=3, chunk_size=37), ['rnd']),
+], ids=["predef", "predef_blocks", "probspiker_blocks", "probspiker_chunked"])
+def test_calibration_restores_state(tmp_path, make_model, var_names):
+    calibration = f2f_module('f2f_calibration')
+    expected_model = make_model(tmp_path)
+    expected = run_model(expected_model, 2 * CALIBRATION_STEPS)
+    assert expected.any()
+
+    model = make_model(tmp_path)
+    # The simulation might have started already
+    run_model(model, 5)
+    ports = model.a_in, model.s_out
+    attributes = dict(vars(model))
+    recorder = calibration.calibrate_ranges(model, var_names, CALIBRATION_STEPS)
+    assert recorder.num_steps == CALIBRATION_STEPS + 1
+    assert (model.a_in, model.s_out) == ports
+    # Rebound attributes (e.g. `bias_mant` or `rnd`) are bound to the original objects again
+    assert all(vars(model)[name] is value for name, value in attributes.items())
+    # The actual simulation continues with the same state and random numbers
+    spikes = run_model(model, 2 * CALIBRATION_STEPS - 5)
+    np.testing.assert_array_equal(spikes, expected[5:])
+    for name in var_names:
+        np.testing.assert_array_equal(getattr(model, name), getattr(expected_model, name))
@@ -0,0 +1,116 @@
+"""
+The helpers of `_common/fixed_point.py` must be bit-identical to the expressions that the
+process models used before (sign/abs/right_shift for rounding toward zero, clip for
+saturation, np.where for wrapping and bias scaling), for int64 and int32 buffers.
+"""
+import numpy as np
+import pytest
+
+MAX_STATE = 2**23
+# The boundaries of the 24-bit range and their neighbours
+BOUNDARIES = np.array([0, 1, -1, MAX_STATE - 2, MAX_STATE - 1, MAX_STATE, MAX_STATE + 1,
+                       -MAX_STATE + 1, -MAX_STATE, -MAX_STATE - 1, 2 * MAX_STATE - 1, -2 * MAX_STATE + 1])
+
+
+def reference_shift(x, shift=12):
+    return np.sign(x) * np.right_shift(np.abs(x), shift)
+
+
+def reference_decay(x, decay_const):
+    return reference_shift(np.int64(x) * (4096 - decay_const))
+
+
+def states(rng, size=100000, limit=MAX_STATE):
+    """Random states in `(-limit, limit)` (including the 24-bit boundaries if they lie
+    within) as int32 array."""
+    x = rng.integers(-limit + 1, limit, size)
+    boundaries = BOUNDARIES[np.abs(BOUNDARIES) < limit]
+    return np.concatenate([x, boundaries]).astype(np.int32)
+
+
+def test_shift_toward_zero(fixed_point):
+    rng = np.random.default_rng(0)
+    x = np.concatenate([rng.integers(-2**40, 2**40, 100000), BOUNDARIES * 4096, BOUNDARIES])
+    for shift in (1, 12, 20):
+        expected = reference_shift(x, shift)
+        result = fixed_point.shift_toward_zero(x.copy(), shift)
+        np.testing.assert_array_equal(result, expected)
+        # With a preallocated scratch buffer
+        result = fixed_point.shift_toward_zero(x.copy(), shift, scratch=np.empty_like(x))
+        np.testing.assert_array_equal(result, expected)
+
+
+@pytest.mark.parametrize("dtype", [np.int64, np.int32])
+def test_mul_shift_toward_zero(fixed_point, dtype):
+    rng = np.random.default_rng(1)
+    # The int32 path requires |x| < 2**24
+    x = states(rng, limit=2 * MAX_STATE)
+    factors = [0, 1, 2047, 4095, 4096, rng.integers(0, 4097, x.size)]
+    for factor in factors:
+        expected = reference_shift(np.int64(x) * factor)
+        out, scratch = np.empty(x.shape, dtype=dtype), np.empty(x.shape, dtype=dtype)
+        result = fixed_point.mul_shift_toward_zero(x, factor, out=out, scratch=scratch)
+        assert result.dtype == dtype
+        np.testing.assert_array_equal(result, expected)
+        # Without scratch buffer
+        np.testing.assert_array_equal(fixed_point.mul_shift_toward_zero(x, factor, out=out), expected)
+        # In place (`out` is `x`)
+        x_inplace = x.astype(dtype)
+        fixed_point.mul_shift_toward_zero(x_inplace, factor, out=x_inplace, scratch=scratch)
+        np.testing.assert_array_equal(x_inplace, expected)
+    # Default int64 output
+    result = fixed_point.mul_shift_toward_zero(x, 4095)
+    assert result.dtype == np.int64
+    np.testing.assert_array_equal(result, reference_shift(np.int64(x) * 4095))
+
+
+@pytest.mark.parametrize("dtype", [np.int64, np.int32])
+def test_decay_round_toward_zero(fixed_point, dtype):
+    rng = np.random.default_rng(2)
+    x = states(rng)
+    for decay_const in (0, 1, 4095, 4096, rng.integers(0, 4097, x.size)):
+        out, scratch = np.empty(x.shape, dtype=dtype), np.empty(x.shape, dtype=dtype)
+        result = fixed_point.decay_round_toward_zero(x, decay_const, out=out, scratch=scratch)
+        np.testing.assert_array_equal(result, reference_decay(x, decay_const))
+
+
+@pytest.mark.parametrize("dtype", [np.int64, np.int32])
+def test_saturate24(fixed_point, dtype):
+    rng = np.random.default_rng(3)
+    x = np.concatenate([rng.integers(-2**30, 2**30, 100000), BOUNDARIES]).astype(dtype)
+    expected = np.clip(x, -np.int32(MAX_STATE) + 1, np.int32(MAX_STATE) - 1)
+    np.testing.assert_array_equal(fixed_point.saturate24(x), expected)
+    # In place
+    x_inplace = x.copy()
+    fixed_point.saturate24(x_inplace, out=x_inplace)
+    np.testing.assert_array_equal(x_inplace, expected)
+    assert np.abs(expected).max() == MAX_STATE - 1
+
+
+@pytest.mark.parametrize("dtype", [np.int64, np.int32])
+def test_wrap24(fixed_point, dtype):
+    rng = np.random.default_rng(4)
+    # Sums of two 24-bit values and an input, as in the current update
+    x = np.concatenate([rng.integers(-2 * MAX_STATE + 1, 2 * MAX_STATE, 100000), BOUNDARIES]).astype(dtype)
+    wrapped = np.where(x > MAX_STATE, x - 2 * MAX_STATE, x)
+    expected = np.where(wrapped <= -MAX_STATE, x + 2 * MAX_STATE, wrapped)
+    np.testing.assert_array_equal(fixed_point.wrap24(x), expected)
+    # Into a separate buffer and in place
+    out = np.empty_like(x)
+    np.testing.assert_array_equal(fixed_point.wrap24(x, out=out), expected)
+    x_inplace = x.copy()
+    fixed_point.wrap24(x_inplace, out=x_inplace)
+    np.testing.assert_array_equal(x_inplace, expected)
+    assert np.all(np.abs(expected) <= MAX_STATE)
+
+
+def test_scale_bias(fixed_point):
+    rng = np.random.default_rng(5)
+    bias_mant = np.concatenate([rng.integers(-4096, 4096, 10000), [-4096, -1, 0, 1, 4095]]).astype(np.int16)
+    for bias_exp in (rng.integers(0, 8, bias_mant.size), rng.integers(-7, 8, bias_mant.size)):
+        bias_exp = bias_exp.astype(np.int16)
+        mant = bias_mant.copy().astype(np.int32)
+        expected = np.where(bias_exp >= 0, np.left_shift(mant, bias_exp), np.right_shift(mant, -bias_exp))
+        result = fixed_point.scale_bias(bias_mant, bias_exp)
+        assert result.dtype == np.int32
+        np.testing.assert_array_equal(result, expected)
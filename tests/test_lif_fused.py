@@ -0,0 +1,53 @@
+"""
+The fused sub-threshold dynamics of the fixed-point LIF model must be bit-identical to
+the unfused reference implementation.
+"""
+import numpy as np
+import pytest
+
+MAX_STATE = 2**23 - 1
+
+
+def make_models(lif_model, process_params, rng, num_neurons, narrow_buffers):
+    """Two `PyLifModelBitAcc` models with the same random state, using the fused and
+    the unfused sub-threshold dynamics, respectively."""
+    state = {
+        "j": rng.integers(-MAX_STATE, MAX_STATE + 1, num_neurons).astype(np.int32),
+        "v": rng.integers(-MAX_STATE, MAX_STATE + 1, num_neurons).astype(np.int32),
+        # Include the extreme decays 0 and 4095
+        "delta_j": np.append(rng.integers(0, 4096, num_neurons - 2), [0, 4095]).astype(np.uint16),
+        "delta_v": np.append(rng.integers(0, 4096, num_neurons - 2), [4095, 0]).astype(np.uint16),
+        "bias_mant": rng.integers(-4096, 4096, num_neurons).astype(np.int16),
+        "bias_exp": rng.integers(0, 8, num_neurons).astype(np.int16),
+        "v_th": int(rng.integers(0, 2**17)),
+        "v_rs": 0,
+        "dt": 1,
+    }
+    models = []
+    for fused_kernel in (True, False):
+        model = lif_model["PyLifModelBitAcc"](process_params(
+            shape=(num_neurons,), name="lif", fused_kernel=fused_kernel, narrow_buffers=narrow_buffers
+        ))
+        for name, value in state.items():
+            setattr(model, name, value.copy() if isinstance(value, np.ndarray) else value)
+        model.scale_bias()
+        models.append(model)
+    return models
+
+
+@pytest.mark.parametrize("narrow_buffers", [False, True])
+def test_fused_matches_unfused(lif_model, process_params, narrow_buffers):
+    rng = np.random.default_rng(42)
+    num_neurons = 1000
+    fused, unfused = make_models(lif_model, process_params, rng, num_neurons, narrow_buffers)
+    saturated = 0
+    for _ in range(200):
+        # Large inputs drive j and v into saturation at +-(2**23 - 1)
+        activation_in = rng.integers(-2**15, 2**15, num_neurons).astype(np.int32) * \
+            rng.integers(1, 64, num_neurons)
+        fused.subthr_dynamics_fused(activation_in)
+        unfused.subthr_dynamics_unfused(activation_in)
+        np.testing.assert_array_equal(fused.j, unfused.j)
+        np.testing.assert_array_equal(fused.v, unfused.v)
+        saturated += np.count_nonzero(np.abs(fused.v) == MAX_STATE)
+    assert saturated > 0
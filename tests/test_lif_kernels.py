@@ -0,0 +1,78 @@
+"""
+The fixed-point kernels of the JIT variants must be bit-identical to the NumPy process
+models. The kernels are run as plain Python functions (which `jit` returns unchanged if
+numba is not installed), by letting the variants take them to be compiled.
+"""
+import numpy as np
+import pytest
+
+from conftest import create_model, load_model, run_model
+
+MAX_STATE = 2**23 - 1
+NUM_NEURONS = 300
+NUM_STEPS = 100
+
+
+def random_state(rng, names):
+    """Random 24-bit states, with some neurons at the saturation limits."""
+    state = {}
+    for name in names:
+        state[name] = rng.integers(-MAX_STATE, MAX_STATE + 1, NUM_NEURONS).astype(np.int32)
+        state[name][:4] = [MAX_STATE, -MAX_STATE, 0, MAX_STATE]
+    return state
+
+
+def random_decays(rng, names):
+    """Random 12-bit decays, including the extremes 0 and 4095."""
+    return {name: np.append(rng.integers(0, 4096, NUM_NEURONS - 2), [0, 4095]).astype(np.uint16)
+            for name in names}
+
+
+def random_bias(rng):
+    return {"bias_mant": rng.integers(-4096, 4096, NUM_NEURONS).astype(np.int16),
+            "bias_exp": rng.integers(0, 8, NUM_NEURONS).astype(np.int16)}
+
+
+def lif_state(rng):
+    return {**random_state(rng, ["j", "v"]), **random_decays(rng, ["delta_j", "delta_v"]), **random_bias(rng),
+            "v_th": rng.integers(0, 2**17, NUM_NEURONS).astype(np.int32), "v_rs": 0, "dt": 1}
+
+
+def lif_rp_v_input_state(rng):
+    return {**random_state(rng, ["v_psp", "v"]), **random_decays(rng, ["delta_psp", "delta_v"]),
+            **random_bias(rng), "v_th": rng.integers(0, 2**17, NUM_NEURONS).astype(np.int32), "v_rs": 100,
+            "t_rp_steps": 3, "t_rp_steps_end": rng.integers(-1, 5, NUM_NEURONS)}
+
+
+def atrlif_state(rng):
+    return {**random_state(rng, ["j", "v", "theta", "r"]),
+            **random_decays(rng, ["delta_j", "delta_v", "delta_theta", "delta_r"]), **random_bias(rng),
+            "s": np.zeros(NUM_NEURONS, dtype=bool),
+            "theta_0": rng.integers(0, 4096, NUM_NEURONS).astype(np.uint16),
+            "theta_step": rng.integers(0, 4096, NUM_NEURONS).astype(np.uint16)}
+
+
+@pytest.mark.parametrize("model_dir, model_name, make_state", [
+    ("lif", "PyLifModelBitAcc", lif_state),
+    ("lif_rp_v_input", "PyLifModelFixed", lif_rp_v_input_state),
+    ("atrlif", "PyATRLIFModelFixed", atrlif_state),
+])
+def test_jit_kernel_matches_numpy(model_dir, model_name, make_state):
+    model = load_model(model_dir)
+    model["NUMBA_AVAILABLE"] = True
+    rng = np.random.default_rng(13)
+    state = make_state(rng)
+    # Large inputs drive the states into saturation
+    inputs = (rng.integers(-2**15, 2**15, (NUM_STEPS + 1, NUM_NEURONS)) *
+              rng.integers(1, 64, (NUM_STEPS + 1, NUM_NEURONS))).astype(np.int32)
+    numpy_model = create_model(model[model_name], state, shape=(NUM_NEURONS,))
+    jit_model = create_model(model[f"{model_name}Jit"], state, shape=(NUM_NEURONS,))
+    saturated = 0
+    for _ in range(NUM_STEPS):
+        spikes = run_model(numpy_model, 1, inputs.__getitem__)
+        np.testing.assert_array_equal(run_model(jit_model, 1, inputs.__getitem__), spikes)
+        for name in state:
+            np.testing.assert_array_equal(getattr(jit_model, name), getattr(numpy_model, name), err_msg=name)
+            saturated += np.count_nonzero(np.abs(getattr(numpy_model, name)) == MAX_STATE)
+    assert np.count_nonzero(numpy_model.s_out.spikes) > 0
+    assert saturated > 0
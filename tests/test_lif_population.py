@@ -0,0 +1,63 @@
+"""
+A fused `LIFPopulation` must behave exactly like separate `LIF` processes for its groups.
+"""
+import numpy as np
+import pytest
+
+from conftest import create_model, load_model, run_model
+
+NUM_STEPS = 100
+
+FLOAT_GROUPS = [
+    dict(shape=(50,), delta_j=0.1, delta_v=0.05, v_th=1.0, v_rs=0.0, dt=0.5),
+    dict(shape=(10, 3), delta_j=0.3, delta_v=0.2, v_th=0.5, v_rs=-0.2, dt=1.0),
+    dict(shape=(1,), delta_j=0.0, delta_v=1.0, v_th=0.05, v_rs=0.5, dt=0.1),
+]
+FIXED_GROUPS = [
+    dict(shape=(50,), delta_j=400, delta_v=200, v_th=2**12, v_rs=0, dt=1),
+    dict(shape=(10, 3), delta_j=1200, delta_v=800, v_th=2**10, v_rs=100, dt=1),
+    dict(shape=(1,), delta_j=0, delta_v=4095, v_th=2**14, v_rs=-50, dt=1),
+]
+
+
+@pytest.mark.parametrize("precision", ["Float", "BitAcc"])
+def test_population_matches_separate_processes(lif_model, precision):
+    fixed = precision == "BitAcc"
+    rng = np.random.default_rng(11)
+    groups = [dict(group) for group in (FIXED_GROUPS if fixed else FLOAT_GROUPS)]
+    for group in groups:
+        if fixed:
+            group["bias_mant"] = rng.integers(-4096, 4096, group["shape"])
+            group["bias_exp"] = rng.integers(0, 8, group["shape"])
+        else:
+            group["bias_mant"] = rng.random(group["shape"]) * 0.2
+            group["bias_exp"] = np.zeros(group["shape"])
+    population = lif_model["LIFPopulation"](groups=groups)
+    num_neurons = population.group_offsets[-1]
+    if fixed:
+        inputs = rng.integers(-2**9, 2**10, (NUM_STEPS + 1, num_neurons)).astype(np.int16)
+    else:
+        inputs = rng.random((NUM_STEPS + 1, num_neurons)) * 0.1
+
+    # Cast the values of the population's Vars to the types of the process model
+    model_class = lif_model[f"PyLifPopulationModel{precision}"]
+    dtypes = {"j": np.int32, "v": np.int32, "delta_j": np.uint16, "delta_v": np.uint16, "bias_mant": np.int16,
+              "bias_exp": np.int16, "v_th": np.int32, "v_rs": np.int32, "dt": np.uint16}
+    state = {key: getattr(population, key).init.astype(dtypes[key] if fixed else float)
+             for key in population.group_defaults}
+    fused = create_model(model_class, state, shape=(num_neurons,))
+    spikes = population.split_groups(run_model(fused, NUM_STEPS, inputs.__getitem__))
+    voltages = population.split_groups(fused.v)
+
+    for k, group in enumerate(groups):
+        shape = group["shape"]
+        group_state = {key: value for key, value in group.items() if key != "shape"}
+        group_state["bias_mant"] = group_state["bias_mant"].astype(np.int16 if fixed else float)
+        group_state["bias_exp"] = group_state["bias_exp"].astype(np.int16 if fixed else float)
+        group_state["j"] = np.zeros(shape, dtype=np.int32 if fixed else float)
+        group_state["v"] = np.zeros(shape, dtype=np.int32 if fixed else float)
+        separate = create_model(lif_model[f"PyLifModel{precision}"], group_state, shape=shape)
+        group_inputs = population.split_groups(inputs)[k]
+        np.testing.assert_array_equal(spikes[k], run_model(separate, NUM_STEPS, group_inputs.__getitem__))
+        np.testing.assert_array_equal(voltages[k], separate.v)
+        assert spikes[k].any()
@@ -0,0 +1,104 @@
+"""
+A process with per-neuron decays, thresholds and resets must behave exactly like several
+processes with the corresponding scalar parameters.
+"""
+import numpy as np
+import pytest
+
+from conftest import create_model, load_model, run_model
+
+NUM_STEPS = 100
+GROUP_SIZES = (60, 40)
+
+
+def lif_float_state(size, rng):
+    return {"j": np.zeros(size), "v": np.zeros(size), "bias_mant": rng.random(size) * 0.1,
+            "bias_exp": np.zeros(size), "dt": 1.0}
+
+
+def lif_fixed_state(size, rng):
+    return {"j": np.zeros(size, dtype=np.int32), "v": np.zeros(size, dtype=np.int32),
+            "bias_mant": rng.integers(0, 4096, size).astype(np.int16),
+            "bias_exp": rng.integers(0, 4, size).astype(np.int16), "dt": 1}
+
+
+def atrlif_float_state(size, rng):
+    return {"j": np.zeros(size), "v": np.zeros(size), "theta": np.zeros(size), "r": np.zeros(size),
+            "s": np.zeros(size, dtype=bool), "bias_mant": rng.random(size) * 0.1, "bias_exp": np.zeros(size)}
+
+
+def atrlif_fixed_state(size, rng):
+    return {"j": np.zeros(size, dtype=np.int32), "v": np.zeros(size, dtype=np.int32),
+            "theta": np.zeros(size, dtype=np.int32), "r": np.zeros(size, dtype=np.int32),
+            "s": np.zeros(size, dtype=bool), "bias_mant": rng.integers(0, 4096, size).astype(np.int16),
+            "bias_exp": rng.integers(0, 4, size).astype(np.int16)}
+
+
+def lif_rp_v_input_fixed_state(size, rng):
+    return {"v_psp": np.zeros(size, dtype=np.int32), "v": np.zeros(size, dtype=np.int32),
+            "bias_mant": rng.integers(0, 4096, size).astype(np.int16),
+            "bias_exp": rng.integers(0, 4, size).astype(np.int16),
+            "t_rp_steps": 2, "t_rp_steps_end": np.full(size, -1)}
+
+
+# Model, state of a group, and the parameters with their values for the two groups
+CASES = {
+    "lif-float": ("lif", "PyLifModelFloat", lif_float_state, float, {
+        "delta_j": (0.1, 0.3), "delta_v": (0.05, 0.2), "v_th": (0.5, 0.3), "v_rs": (0.0, -0.1),
+    }),
+    "lif-fixed": ("lif", "PyLifModelBitAcc", lif_fixed_state, np.int16, {
+        "delta_j": (400, 1200), "delta_v": (200, 800), "v_th": (2**12, 2**10), "v_rs": (0, 100),
+    }),
+    "atrlif-float": ("atrlif", "PyATRLIFModelFloat", atrlif_float_state, float, {
+        "delta_j": (0.1, 0.3), "delta_v": (0.05, 0.2), "delta_theta": (0.1, 0.5), "delta_r": (0.2, 0.4),
+        "theta_0": (0.5, 0.3), "theta_step": (0.1, 0.02),
+    }),
+    "atrlif-fixed": ("atrlif", "PyATRLIFModelFixed", atrlif_fixed_state, np.int16, {
+        "delta_j": (400, 1200), "delta_v": (200, 800), "delta_theta": (400, 2000), "delta_r": (800, 1600),
+        "theta_0": (2**10, 2**9), "theta_step": (2**8, 2**6),
+    }),
+    "lif_rp_v_input-fixed": ("lif_rp_v_input", "PyLifModelFixed", lif_rp_v_input_fixed_state, np.int16, {
+        "delta_psp": (400, 1200), "delta_v": (200, 800), "v_th": (2**12, 2**10), "v_rs": (0, 100),
+    }),
+}
+DTYPES = {"v_th": np.int32, "v_rs": np.int32}
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_per_neuron_matches_scalar_processes(case):
+    model_dir, model_name, make_state, input_dtype, parameters = CASES[case]
+    model_class = load_model(model_dir)[model_name]
+    rng = np.random.default_rng(12)
+    states = [make_state(size, rng) for size in GROUP_SIZES]
+    num_neurons = sum(GROUP_SIZES)
+    if input_dtype is float:
+        inputs = rng.random((NUM_STEPS + 1, num_neurons)) * 0.1
+    else:
+        inputs = rng.integers(-2**9, 2**10, (NUM_STEPS + 1, num_neurons)).astype(input_dtype)
+
+    def parameter(name, value):
+        dtype = float if input_dtype is float else DTYPES.get(name, np.uint16)
+        return np.asarray(value, dtype=dtype)
+
+    # One process with per-neuron parameters
+    state = {name: np.concatenate([group_state[name] for group_state in states])
+             if isinstance(value, np.ndarray) else value for name, value in states[0].items()}
+    for name, values in parameters.items():
+        state[name] = np.concatenate([np.full(size, parameter(name, value))
+                                      for size, value in zip(GROUP_SIZES, values)])
+    per_neuron = create_model(model_class, state, shape=(num_neurons,))
+    spikes = run_model(per_neuron, NUM_STEPS, inputs.__getitem__)
+
+    # One process per group, with parameters of shape (1,)
+    start = 0
+    for k, size in enumerate(GROUP_SIZES):
+        group_state = dict(states[k])
+        for name, values in parameters.items():
+            group_state[name] = parameter(name, [values[k]])
+        scalar = create_model(model_class, group_state, shape=(size,))
+        group_inputs = inputs[:, start:start + size]
+        group_spikes = run_model(scalar, NUM_STEPS, group_inputs.__getitem__)
+        np.testing.assert_array_equal(spikes[:, start:start + size], group_spikes)
+        np.testing.assert_array_equal(per_neuron.v[start:start + size], scalar.v)
+        assert group_spikes.any()
+        start += size
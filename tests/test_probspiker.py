@@ -0,0 +1,133 @@
+"""
+The execution modes of the probabilistic spiker models must draw the same random numbers
+and emit the same spikes as the default mode, also if Vars are set at runtime.
+"""
+import types
+
+import numpy as np
+import pytest
+
+from conftest import create_model, load_model, run_model
+
+NUM_NEURONS = 1000
+NUM_STEPS = 50
+UPDATE_STEP = 23
+UNITY = {"PyProbSpikerModelFloat": 1.0, "PyProbSpikerModelFixed": 2**24}
+
+
+@pytest.fixture(scope="module")
+def probspiker_model():
+    return load_model("probspiker")
+
+
+def run_probspiker(model_class, p_spike, num_steps=NUM_STEPS, **parameters):
+    """Run the model, recording the random numbers, and double `p_spike` at runtime."""
+    parameters.setdefault("shape", (NUM_NEURONS,))
+    parameters.setdefault("seed", 1234)
+    parameters.setdefault("rng_stream", "probspiker")
+    model = create_model(model_class, {"p_spike": p_spike, "rnd": np.zeros(parameters["shape"])}, **parameters)
+
+    def set_p_spike(model):
+        if model.time_step == UPDATE_STEP:
+            model.p_spike *= 2
+            model.on_var_update()
+
+    spikes, rnd = [], []
+    for _ in range(num_steps):
+        spikes.append(run_model(model, 1, on_step=set_p_spike)[0])
+        rnd.append(np.copy(model.rnd))
+    return np.array(spikes), np.array(rnd)
+
+
+def p_spike_of(model_name, rng):
+    p_spike = rng.random(NUM_NEURONS) * 0.2
+    if UNITY[model_name] != 1.0:
+        p_spike = (p_spike * UNITY[model_name]).astype(np.int64)
+    return p_spike
+
+
+@pytest.mark.parametrize("model_name", ["PyProbSpikerModelFloat", "PyProbSpikerModelFixed"])
+@pytest.mark.parametrize("block_steps", [7, 100])
+def test_block_steps_match_default(probspiker_model, model_name, block_steps):
+    model_class = probspiker_model[model_name]
+    p_spike = p_spike_of(model_name, np.random.default_rng(5))
+    expected, expected_rnd = run_probspiker(model_class, p_spike)
+    spikes, rnd = run_probspiker(model_class, p_spike, block_steps=block_steps)
+    np.testing.assert_array_equal(rnd, expected_rnd)
+    np.testing.assert_array_equal(spikes, expected)
+    assert expected[UPDATE_STEP:].mean() > 1.5 * expected[:UPDATE_STEP - 1].mean()
+
+
+@pytest.mark.parametrize("model_name", ["PyProbSpikerModelFloat", "PyProbSpikerModelFixed"])
+def test_split_population_matches_whole(probspiker_model, model_name):
+    model_class = probspiker_model[model_name]
+    p_spike = p_spike_of(model_name, np.random.default_rng(6))
+    expected, expected_rnd = run_probspiker(model_class, p_spike)
+    split = 400
+    shards = [
+        run_probspiker(model_class, p_spike[:split], shape=(split,)),
+        run_probspiker(model_class, p_spike[split:], shape=(NUM_NEURONS - split,), neuron_offset=split),
+    ]
+    np.testing.assert_array_equal(np.concatenate([rnd for _, rnd in shards], axis=1), expected_rnd)
+    np.testing.assert_array_equal(np.concatenate([spikes for spikes, _ in shards], axis=1), expected)
+
+
+def test_streams_of_processes_differ(probspiker_model):
+    model_class = probspiker_model["PyProbSpikerModelFloat"]
+    p_spike = np.full(NUM_NEURONS, 0.5)
+    _, rnd_a = run_probspiker(model_class, p_spike, rng_stream=None, name="probspiker_a")
+    _, rnd_b = run_probspiker(model_class, p_spike, rng_stream=None, name="probspiker_b")
+    _, rnd_b_again = run_probspiker(model_class, p_spike, rng_stream=None, name="probspiker_b")
+    assert not np.array_equal(rnd_a, rnd_b)
+    np.testing.assert_array_equal(rnd_b, rnd_b_again)
+
+    # Without a name, the stream has to be given explicitly
+    with pytest.raises(ValueError, match="rng_stream"):
+        run_probspiker(model_class, p_spike, rng_stream=None, name=None)
+    run_probspiker(model_class, p_spike, rng_stream=None, name=None, seed=None)
+
+
+@pytest.mark.parametrize("model_name", ["PyProbSpikerModelFloat", "PyProbSpikerModelFixed"])
+def test_sparse_sampling(probspiker_model, model_name):
+    model_class = probspiker_model[model_name]
+    rng = np.random.default_rng(8)
+    # Half of the neurons with a lower probability, to include the acceptance step
+    p = np.where(np.arange(NUM_NEURONS) < NUM_NEURONS // 2, 0.01, 0.04)
+    p_spike = p if UNITY[model_name] == 1.0 else (p * UNITY[model_name]).astype(np.int64)
+    num_steps = 2000
+    spikes, _ = run_probspiker(model_class, p_spike, num_steps, sparse_sampling=True)
+    spikes_again, _ = run_probspiker(model_class, p_spike, num_steps, sparse_sampling=True)
+    np.testing.assert_array_equal(spikes, spikes_again)
+    # The rates before and after doubling `p_spike`, with a tolerance of 5 standard deviations
+    for steps, p_step in ((slice(0, UPDATE_STEP - 1), p), (slice(UPDATE_STEP - 1, None), 2 * p)):
+        for neurons in (slice(0, NUM_NEURONS // 2), slice(NUM_NEURONS // 2, None)):
+            trials = spikes[steps, neurons].size
+            expected = p_step[neurons][0]
+            assert abs(spikes[steps, neurons].mean() - expected) < 5 * np.sqrt(expected / trials)
+
+
+@pytest.mark.parametrize("model_name", ["PyProbSpikerModelFloat", "PyProbSpikerModelFixed"])
+def test_sparse_sampling_with_monitored_rnd(probspiker_model, model_name):
+    """If `rnd` is monitored, a random number is drawn for every neuron as by default."""
+    model_class = probspiker_model[model_name]
+    p_spike = p_spike_of(model_name, np.random.default_rng(9))
+    expected, expected_rnd = run_probspiker(model_class, p_spike)
+    model = create_model(model_class, {"p_spike": p_spike}, shape=(NUM_NEURONS,), seed=1234,
+                         rng_stream="probspiker", sparse_sampling=True)
+    model.var_ports = [types.SimpleNamespace(var_name="rnd")]
+    spikes = run_model(model, UPDATE_STEP - 1)
+    np.testing.assert_array_equal(spikes, expected[:UPDATE_STEP - 1])
+    np.testing.assert_array_equal(model.rnd, expected_rnd[UPDATE_STEP - 2])
+
+
+
+@pytest.mark.parametrize("precision", ["Float", "Fixed"])
+@pytest.mark.parametrize("sparse_sampling", [False, True])
+def test_sparse_output_matches_dense(probspiker_model, precision, sparse_sampling):
+    p_spike = p_spike_of(f"PyProbSpikerModel{precision}", np.random.default_rng(10))
+    expected, _ = run_probspiker(probspiker_model[f"PyProbSpikerModel{precision}"], p_spike,
+                                 sparse_sampling=sparse_sampling)
+    spikes, _ = run_probspiker(probspiker_model[f"PySparseProbSpikerModel{precision}"], p_spike,
+                               sparse_sampling=sparse_sampling)
+    np.testing.assert_array_equal(spikes, expected)
+    assert expected.any()
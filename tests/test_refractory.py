@@ -0,0 +1,98 @@
+"""
+`RefractoryTracker` must determine the same refractory neurons whether it tracks them as
+a set of indices or as a dense mask.
+"""
+import numpy as np
+import pytest
+
+from conftest import load_common_module
+
+NUM_NEURONS = 100
+
+
+@pytest.fixture(scope="module")
+def refractory():
+    return load_common_module("refractory")
+
+
+def refractory_indices(tracker, t_rp_steps_end, time_step):
+    """The sorted, unique flat indices of the neurons that the tracker determines as
+    refractory, or `None` if it uses the dense mask."""
+    indices = tracker.update(t_rp_steps_end, time_step)
+    return None if indices is None else np.unique(indices)
+
+
+def test_switch_to_mask_above_max_sparse(refractory):
+    tracker = refractory.RefractoryTracker((NUM_NEURONS,), sparse_fraction=0.05)
+    assert tracker.max_sparse == 5
+    t_rp_steps_end = np.full(NUM_NEURONS, -1)
+    t_rp_steps_end[:5] = 10
+    np.testing.assert_array_equal(refractory_indices(tracker, t_rp_steps_end, 1), np.arange(5))
+
+    t_rp_steps_end[5] = 10
+    tracker.invalidate()
+    assert tracker.update(t_rp_steps_end, 1) is None
+    np.testing.assert_array_equal(tracker.non_ref, np.arange(NUM_NEURONS) >= 6)
+
+    # Back to indices once enough refractory periods have ended
+    t_rp_steps_end[:2] = 1
+    assert tracker.update(t_rp_steps_end, 2) is not None
+    np.testing.assert_array_equal(refractory_indices(tracker, t_rp_steps_end, 2), np.arange(2, 6))
+
+
+def test_add_beyond_max_sparse(refractory):
+    tracker = refractory.RefractoryTracker((NUM_NEURONS,), sparse_fraction=0.05)
+    t_rp_steps_end = np.full(NUM_NEURONS, -1)
+    assert refractory_indices(tracker, t_rp_steps_end, 1).size == 0
+
+    spikes = np.zeros(NUM_NEURONS, dtype=bool)
+    spikes[[3, 50]] = True
+    t_rp_steps_end[spikes] = 5
+    tracker.add(spikes)
+    np.testing.assert_array_equal(refractory_indices(tracker, t_rp_steps_end, 2), [3, 50])
+
+    spikes[:] = False
+    spikes[[10, 20, 30, 40]] = True
+    t_rp_steps_end[spikes] = 6
+    tracker.add(spikes)
+    assert tracker.indices is None
+    assert tracker.update(t_rp_steps_end, 3) is None
+    np.testing.assert_array_equal(np.flatnonzero(~tracker.non_ref), [3, 10, 20, 30, 40, 50])
+
+
+def test_invalidate_after_external_write(refractory):
+    tracker = refractory.RefractoryTracker((NUM_NEURONS,), sparse_fraction=0.05)
+    t_rp_steps_end = np.full(NUM_NEURONS, -1)
+    t_rp_steps_end[7] = 10
+    np.testing.assert_array_equal(refractory_indices(tracker, t_rp_steps_end, 1), [7])
+
+    # A write from outside (e.g. `Var.set()`) is only noticed after `invalidate()`
+    t_rp_steps_end[[7, 42]] = [-1, 10]
+    np.testing.assert_array_equal(refractory_indices(tracker, t_rp_steps_end, 2), [])
+    tracker.invalidate()
+    np.testing.assert_array_equal(refractory_indices(tracker, t_rp_steps_end, 2), [42])
+
+
+@pytest.mark.parametrize("firing_rate", [0.002, 0.02, 0.2])
+def test_copy_non_refractory_sparse_matches_mask(refractory, firing_rate):
+    rng = np.random.default_rng(3)
+    num_neurons = 10000
+    t_rp_steps = 4
+    # The defaults switch between indices and mask, the others always use one of them
+    trackers = [
+        refractory.RefractoryTracker((num_neurons,)),
+        refractory.RefractoryTracker((num_neurons,), sparse_fraction=1.),
+        refractory.RefractoryTracker((num_neurons,), sparse_fraction=0.),
+    ]
+    states = [np.zeros(num_neurons) for _ in trackers]
+    t_rp_steps_ends = [np.full(num_neurons, -1) for _ in trackers]
+    for time_step in range(1, 100):
+        updated = rng.random(num_neurons)
+        spikes = rng.random(num_neurons) < firing_rate
+        for tracker, state, t_rp_steps_end in zip(trackers, states, t_rp_steps_ends):
+            tracker.copy_non_refractory(state, updated.copy(), t_rp_steps_end, time_step)
+            t_rp_steps_end[spikes] = time_step + t_rp_steps
+            tracker.add(spikes)
+        np.testing.assert_array_equal(states[0], states[2])
+        np.testing.assert_array_equal(states[1], states[2])
+    assert trackers[1].indices is not None
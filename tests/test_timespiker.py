@@ -0,0 +1,88 @@
+"""
+The execution modes of the time-specific spiker models must emit the same spikes as the
+default mode, also if Vars are set at runtime.
+"""
+import numpy as np
+import pytest
+
+from conftest import create_model, load_model, run_model
+
+NUM_NEURONS = 500
+NUM_STEPS = 100
+UPDATE_STEP = 37
+
+
+@pytest.fixture(scope="module")
+def timespiker_model():
+    return load_model("timespiker")
+
+
+def make_state(rng):
+    return {
+        "t_rp_steps": 3,
+        "t_rp_steps_end": np.full(NUM_NEURONS, -1),
+        "t_spike_steps": rng.integers(-5, NUM_STEPS, NUM_NEURONS),
+    }
+
+
+def run_timespiker(model_class, state, rng_seed, **parameters):
+    """Run the model and set `t_spike_steps` and `t_rp_steps_end` of some neurons at
+    runtime, as Lava does it (including the update hook)."""
+    rng = np.random.default_rng(rng_seed)
+    changed = rng.choice(NUM_NEURONS, 50, replace=False)
+
+    def set_vars(model):
+        if model.time_step == UPDATE_STEP:
+            model.t_spike_steps[changed] = rng.integers(0, NUM_STEPS, changed.size)
+            model.t_rp_steps_end[changed[:10]] = UPDATE_STEP + 5
+            model.on_var_update()
+
+    model = create_model(model_class, state, shape=(NUM_NEURONS,), **parameters)
+    return run_model(model, NUM_STEPS, on_step=set_vars), model
+
+
+@pytest.mark.parametrize("model_name", ["PyTimeSpikerModelFloat", "PyTimeSpikerModelFixed"])
+@pytest.mark.parametrize("parameters", [{"block_steps": 8}, {"block_steps": 1000}, {"spike_schedule": True}])
+def test_modes_match_default(timespiker_model, model_name, parameters):
+    state = make_state(np.random.default_rng(1))
+    model_class = timespiker_model[model_name]
+    expected, expected_model = run_timespiker(model_class, state, 2)
+    spikes, model = run_timespiker(model_class, state, 2, **parameters)
+    np.testing.assert_array_equal(spikes, expected)
+    np.testing.assert_array_equal(model.t_rp_steps_end, expected_model.t_rp_steps_end)
+    assert expected[:UPDATE_STEP].any() and expected[UPDATE_STEP:].any()
+
+
+@pytest.mark.parametrize("model_name", ["PyTimeSpikerModelFixed", "PySparseTimeSpikerModelFixed"])
+def test_schedule_mode_reuses_spike_vector(timespiker_model, model_name):
+    state = make_state(np.random.default_rng(3))
+    default = create_model(timespiker_model["PyTimeSpikerModelFixed"], state, shape=(NUM_NEURONS,))
+    expected = run_model(default, NUM_STEPS)
+    model = create_model(timespiker_model[model_name], state, shape=(NUM_NEURONS,), spike_schedule=True)
+    sent = []
+    send_spikes = model.send_spikes
+
+    def record_spike_vector(spike_vector):
+        sent.append(spike_vector)
+        send_spikes(spike_vector)
+
+    model.send_spikes = record_spike_vector
+    spikes = run_model(model, NUM_STEPS)
+    np.testing.assert_array_equal(spikes, expected)
+    if model.sparse_output:
+        # Only the indices of the spiking neurons are sent, without a dense vector
+        assert all(spike_vector is None for spike_vector in sent)
+    else:
+        assert all(spike_vector is sent[0] for spike_vector in sent)
+
+
+@pytest.mark.parametrize("precision", ["Float", "Fixed"])
+@pytest.mark.parametrize("parameters", [{}, {"spike_schedule": True}])
+def test_variants_match(timespiker_model, precision, parameters):
+    """The input-less and sparse variants emit the same spikes as `TimeSpiker`."""
+    state = make_state(np.random.default_rng(4))
+    expected, _ = run_timespiker(timespiker_model[f"PyTimeSpikerModel{precision}"], state, 5)
+    for variant in ("Inputless", "Sparse"):
+        model_class = timespiker_model[f"Py{variant}TimeSpikerModel{precision}"]
+        spikes, _ = run_timespiker(model_class, state, 5, **parameters)
+        np.testing.assert_array_equal(spikes, expected)
@@ -8,75 +8,196 @@ from lava.magma.core.resources import CPU
 from lava.magma.core.decorator import implements, requires, tag
 from lava.magma.core.model.py.model import PyLoihiProcessModel
 
-@implements(proc=TimeSpiker, protocol=LoihiProtocol)
-@requires(CPU)
-@tag("floating_pt")
-class PyTimeSpikerModelFloat(PyLoihiProcessModel):
-    """Implementation of floating-point precision
-    time-specific spiker model.
+from brian2lava.preset_mode.lib.model_lib._common.spike_schedule import SpikeSchedule, periodic_spike_block
+
+class AbstractPyTimeSpikerModel(PyLoihiProcessModel):
+    """Abstract implementation of the time-specific spiker model, which is the
+    same in floating-point and fixed-point precision.
+
+    Specific implementations inherit from here.
     """
     shape: np.ndarray = LavaPyType(np.ndarray, int)
-    a_in: PyInPort = LavaPyType(PyInPort.VEC_DENSE, float)
-    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, int)
+    s_out = None  # This will be an OutPort of different LavaPyTypes
     t_rp_steps: int = LavaPyType(int, int)
     t_rp_steps_end: np.ndarray = LavaPyType(np.ndarray, int)
     t_spike_steps: np.ndarray = LavaPyType(np.ndarray, int)
+    # Whether the output port is sparse (i.e., sends values and indices)
+    sparse_output = False
 
     def __init__(self, proc_params):
-        super(PyTimeSpikerModelFloat, self).__init__(proc_params)
+        super(AbstractPyTimeSpikerModel, self).__init__(proc_params)
         self.logger = get_logger('brian2.devices.lava')
-        self.logger.debug(f"Process '{proc_params._parameters['name']}' initialized with PyTimeSpikerModelFloat process model")
+        self.logger.debug(f"Process '{proc_params._parameters['name']}' initialized with {type(self).__name__} process model")
+
+        # In block mode, the spikes are computed for `block_steps` timesteps at once
+        self.block_steps = proc_params._parameters.get("block_steps", 1)
+        self.spike_block = None
+        self.block_start = 0
+        # In schedule mode, the neurons are kept in an event queue, which only touches
+        # the spiking neurons in each timestep
+        self.spike_schedule = proc_params._parameters.get("spike_schedule", False)
+        self.schedule = None
+        self.schedule_step = None
+        self.spike_indices = None
+        # Dense spike vector of schedule mode, allocated once and then only updated at
+        # the neurons that spiked in the previous or spike in the current timestep
+        self.schedule_spikes = None
+
+    def on_var_update(self):
+        """Discard the precomputed spikes, since Vars might have been set at runtime."""
+        self.spike_block = None
+        self.schedule = None
+
+    def schedule_spiking_activation(self):
+        """Spiking activation function in schedule mode. The spiking neurons are taken
+        from an event queue, which is (re)built from the current state if necessary.
+        Returns a dense spike vector that is reused in every timestep, or `None` for a
+        sparse output port, which only needs `spike_indices`.
+        """
+        if self.schedule is None or self.time_step != self.schedule_step + 1:
+            self.schedule = SpikeSchedule(self.time_step, self.t_spike_steps, self.t_rp_steps_end,
+                                          self.t_rp_steps)
+        self.schedule_step = self.time_step
+        previous_indices = self.spike_indices
+        self.spike_indices = self.schedule.spike_indices(self.time_step)
+        if self.sparse_output:
+            # Only the indices are sent, so no dense spike vector is needed
+            return None
+        if self.schedule_spikes is None:
+            self.schedule_spikes = np.zeros(np.shape(self.t_spike_steps), dtype=bool)
+        elif previous_indices is not None:
+            self.schedule_spikes.flat[previous_indices] = False
+        self.schedule_spikes.flat[self.spike_indices] = True
+        return self.schedule_spikes
+
+    def block_spiking_activation(self):
+        """Spiking activation function in block mode. The spikes are computed for
+        `block_steps` timesteps at once and then emitted one timestep after the other.
+        """
+        k = self.time_step - self.block_start
+        if self.spike_block is None or not 0 <= k < self.block_steps:
+            self.spike_block = periodic_spike_block(self.time_step, self.block_steps, self.t_spike_steps,
+                                                    self.t_rp_steps_end, self.t_rp_steps)
+            self.block_start = self.time_step
+            k = 0
+        return self.spike_block[k]
 
     def spiking_activation(self):
         """Spiking activation function."""
+        if self.spike_schedule:
+            return self.schedule_spiking_activation()
+        if self.block_steps > 1:
+            return self.block_spiking_activation()
         non_ref = self.t_rp_steps_end < self.time_step
         return np.logical_and(self.time_step > self.t_spike_steps, non_ref)
     
     def spiking_post_processing(self, spike_vector: np.ndarray):
         """Post processing after spiking; starting of refractory period.
         """
+        if self.spike_schedule:
+            np.put(self.t_rp_steps_end, self.spike_indices, self.time_step + self.t_rp_steps)
+            return
         self.t_rp_steps_end[spike_vector] = (self.time_step + self.t_rp_steps)
 
+    def send_spikes(self, spike_vector: np.ndarray):
+        """Send the spikes via the output port. A sparse output port gets the values
+        and (flat) indices of the spiking neurons.
+        """
+        if not self.sparse_output:
+            self.s_out.send(spike_vector)
+            return
+        if self.spike_schedule:
+            spike_indices = np.sort(self.spike_indices)
+        else:
+            spike_indices = np.flatnonzero(spike_vector)
+        self.s_out.send(np.ones(spike_indices.size, dtype=int), spike_indices)
+
     def run_spk(self):
         """The run function that performs the actual computation."""
-        _ = self.a_in.recv()
         s_out_buff = self.spiking_activation()
         self.spiking_post_processing(spike_vector=s_out_buff)
-        self.s_out.send(s_out_buff)
+        self.send_spikes(s_out_buff)
+
+class AbstractPyTimeSpikerModelFloat(AbstractPyTimeSpikerModel):
+    """Abstract implementation of floating-point precision
+    time-specific spiker model.
+
+    Specific implementations inherit from here.
+    """
+
+class AbstractPyTimeSpikerModelFixed(AbstractPyTimeSpikerModel):
+    """Abstract implementation of fixed-point precision
+    time-specific spiker model.
+
+    Specific implementations inherit from here.
+    """
+
+@implements(proc=TimeSpiker, protocol=LoihiProtocol)
+@requires(CPU)
+@tag("floating_pt")
+class PyTimeSpikerModelFloat(AbstractPyTimeSpikerModelFloat):
+    """Implementation of floating-point precision
+    time-specific spiker model.
+    """
+    a_in: PyInPort = LavaPyType(PyInPort.VEC_DENSE, float)
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, int)
+
+    def run_spk(self):
+        """The run function that performs the actual computation."""
+        _ = self.a_in.recv()
+        super().run_spk()
+
+@implements(proc=InputlessTimeSpiker, protocol=LoihiProtocol)
+@requires(CPU)
+@tag("floating_pt")
+class PyInputlessTimeSpikerModelFloat(AbstractPyTimeSpikerModelFloat):
+    """Implementation of floating-point precision
+    time-specific spiker model without input port.
+    """
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, int)
+
+@implements(proc=SparseTimeSpiker, protocol=LoihiProtocol)
+@requires(CPU)
+@tag("floating_pt")
+class PySparseTimeSpikerModelFloat(AbstractPyTimeSpikerModelFloat):
+    """Implementation of floating-point precision
+    time-specific spiker model without input port, which sends
+    the indices of the spiking neurons via a sparse output port.
+    """
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_SPARSE, int)
+    sparse_output = True
 
 @implements(proc=TimeSpiker, protocol=LoihiProtocol)
 @requires(CPU)
 @tag("fixed_pt")
-class PyTimeSpikerModelFixed(PyLoihiProcessModel):
+class PyTimeSpikerModelFixed(AbstractPyTimeSpikerModelFixed):
     """Implementation of fixed-point precision
     time-specific spiker model.
     """
-    shape: np.ndarray = LavaPyType(np.ndarray, int)
     a_in: PyInPort = LavaPyType(PyInPort.VEC_DENSE, np.int16, precision=16)
     s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, int)
-    t_rp_steps: int = LavaPyType(int, int)
-    t_rp_steps_end: np.ndarray = LavaPyType(np.ndarray, int)
-    t_spike_steps: np.ndarray = LavaPyType(np.ndarray, int)
-
-    def __init__(self, proc_params):
-        super(PyTimeSpikerModelFixed, self).__init__(proc_params)
-        self.logger = get_logger('brian2.devices.lava')
-        self.logger.debug(f"Process '{proc_params._parameters['name']}' initialized with PyTimeSpikerModelFixed process model")
-
-    def spiking_activation(self):
-        """Spiking activation function."""
-        #return np.zeros(self.shape)
-        non_ref = self.t_rp_steps_end < self.time_step
-        return np.logical_and(self.time_step > self.t_spike_steps, non_ref)
-    
-    def spiking_post_processing(self, spike_vector: np.ndarray):
-        """Post processing after spiking; starting of refractory period.
-        """
-        self.t_rp_steps_end[spike_vector] = (self.time_step + self.t_rp_steps)
 
     def run_spk(self):
         """The run function that performs the actual computation."""
         _ = self.a_in.recv()
-        s_out_buff = self.spiking_activation()
-        self.spiking_post_processing(spike_vector=s_out_buff)
-        self.s_out.send(s_out_buff)
+        super().run_spk()
+
+@implements(proc=InputlessTimeSpiker, protocol=LoihiProtocol)
+@requires(CPU)
+@tag("fixed_pt")
+class PyInputlessTimeSpikerModelFixed(AbstractPyTimeSpikerModelFixed):
+    """Implementation of fixed-point precision
+    time-specific spiker model without input port.
+    """
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_DENSE, int)
+
+@implements(proc=SparseTimeSpiker, protocol=LoihiProtocol)
+@requires(CPU)
+@tag("fixed_pt")
+class PySparseTimeSpikerModelFixed(AbstractPyTimeSpikerModelFixed):
+    """Implementation of fixed-point precision
+    time-specific spiker model without input port, which sends
+    the indices of the spiking neurons via a sparse output port.
+    """
+    s_out: PyOutPort = LavaPyType(PyOutPort.VEC_SPARSE, int)
+    sparse_output = True
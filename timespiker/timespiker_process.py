@@ -6,9 +6,10 @@ from lava.magma.core.process.process import LogConfig, AbstractProcess
 from lava.magma.core.process.variable import Var
 from lava.magma.core.process.ports.ports import InPort, OutPort
 
-class TimeSpiker(AbstractProcess):
-    """Time-specific spiker neuron. Spiking occurs at given times. Accepts but does
-    not use synaptic input.
+class AbstractTimeSpiker(AbstractProcess):
+    """Abstract time-specific spiker neuron. Spiking occurs at given times.
+    Specific variants (with or without input port, with dense or sparse output
+    port) inherit from here.
 
     Parameters
     ----------
@@ -19,6 +20,15 @@ class TimeSpiker(AbstractProcess):
     t_spike_steps : int, list of int, ndarray of int
         The timestep at which a spike shall occur. Can be specified individually
         for each neuron.
+    spike_schedule : bool, optional
+        If `True`, the process model keeps the neurons in an event queue sorted by
+        the timestep of their first spike. Each timestep then only touches the
+        spiking neurons instead of all neurons. Does not change the results.
+    block_steps : int, optional
+        If larger than 1, the process model computes the spikes for this number
+        of timesteps at once and then emits them one timestep after the other.
+        This reduces the computational overhead per timestep and does not change
+        the results.
     name : str
         Name of the current process.
     log_config : LogConfig
@@ -38,7 +48,6 @@ class TimeSpiker(AbstractProcess):
                          log_config=log_config,
                          **kwargs)
         self.logger = get_logger('brian2.devices.lava')
-        self.a_in = InPort(shape=shape)
         self.s_out = OutPort(shape=shape)
         self.t_rp_steps = Var(shape=(1,), init=t_rp_steps)
         self.t_rp_steps_end = Var(shape=shape, init=t_rp_steps_end)
@@ -54,4 +63,32 @@ class TimeSpiker(AbstractProcess):
                 t_rp_steps = {self.t_rp_steps.init} (computed from t_rp)
                 t_spike_steps = {self.t_spike_steps.init}"""
         self.logger.debug(msg_var_par)
-        print(msg_var_par)
\ No newline at end of file
+        print(msg_var_par)
+
+
+class TimeSpiker(AbstractTimeSpiker):
+    """Time-specific spiker neuron. Spiking occurs at given times. Accepts but does
+    not use synaptic input. See `AbstractTimeSpiker` for the parameters.
+    """
+    def __init__(self,
+                 *,
+                 shape: ty.Tuple[int, ...] = (1,),
+                 **kwargs) -> None:
+        super().__init__(shape=shape, **kwargs)
+        self.a_in = InPort(shape=shape)
+
+
+class InputlessTimeSpiker(AbstractTimeSpiker):
+    """Time-specific spiker neuron without input port, which cannot be the
+    target of synapses. This avoids receiving unused synaptic input in every
+    timestep. See `AbstractTimeSpiker` for the parameters.
+    """
+
+
+class SparseTimeSpiker(AbstractTimeSpiker):
+    """Time-specific spiker neuron without input port, whose process models
+    send the spikes via a sparse output port (i.e., as the values and indices
+    of the spiking neurons instead of a dense vector of all neurons). This
+    reduces the data transferred per timestep for sparse spiking. See
+    `AbstractTimeSpiker` for the parameters.
+    """